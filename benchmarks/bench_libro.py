@@ -0,0 +1,180 @@
+"""Benchmarks de las rutas críticas del libro, sin Streamlit.
+
+Genera libros sintéticos con los 10 tipos de transacción y mide tiempo y pico
+de memoria de cada caso en varios tamaños (líneas del diario). El resultado es
+un JSON que se puede guardar por commit y comparar:
+
+    python -m benchmarks.bench_libro --tamanos 1000 10000 100000 --salida base.json
+    python -m benchmarks.bench_libro --backend sqlite --salida sqlite.json
+    python -m benchmarks.bench_libro --backend bitacora --salida bitacora.json
+    python -m benchmarks.bench_libro --comparar base.json nuevo.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from contabilidad import (
+    REGLAS_CONTABLES, TIPOS_TRANSACCION, LibroBitacora, LibroDiario, LibroSQLite, contabilizar_lote,
+    generar_asiento_contable, generar_balanza, generar_estado_resultados, arqueo_caja,
+    arqueo_lote,
+)
+
+TAMANOS = [1_000, 10_000, 100_000]
+LINEAS_POR_TIPO = np.array([len(REGLAS_CONTABLES[t]["debe"]) + len(REGLAS_CONTABLES[t]["haber"])
+                            for t in TIPOS_TRANSACCION])
+
+def lote_sintetico(num_lineas, semilla=0, inicio="2023-01-01", dias=730):
+    """Lote con asientos de tipos al azar hasta juntar `num_lineas` líneas,
+    con fechas ordenadas dentro de `dias` días y montos de $1 a $50,000."""
+    rng = np.random.default_rng(semilla)
+    estimado = int(num_lineas / LINEAS_POR_TIPO.min()) + 1
+    tipos = rng.integers(0, len(TIPOS_TRANSACCION), estimado)
+    n = int(np.searchsorted(np.cumsum(LINEAS_POR_TIPO[tipos]), num_lineas)) + 1
+    tipos = np.array(TIPOS_TRANSACCION, dtype=object)[tipos[:n]]
+    fechas = np.datetime64(inicio) + np.sort(rng.integers(0, dias, n))
+    montos = rng.integers(100, 5_000_000, n) / 100
+    montos2 = rng.integers(100, 5_000_000, n) / 100
+    return contabilizar_lote(tipos, fechas, montos, montos2)
+
+BACKENDS = {"memoria": lambda ruta: LibroDiario(), "sqlite": LibroSQLite, "bitacora": LibroBitacora}
+
+def crear_libro_sintetico(num_lineas, backend="memoria", semilla=0, ruta=None):
+    libro = BACKENDS[backend](ruta)
+    libro.append_lote(lote_sintetico(num_lineas, semilla))
+    return libro
+
+def medir(funcion, repeticiones):
+    """Tiempos de `repeticiones` llamadas y pico de memoria de una llamada
+    aparte (tracemalloc frena la ejecución, así que no se mezcla con el tiempo)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "repeticiones": repeticiones,
+        "segundos_min": min(tiempos),
+        "segundos_mediana": statistics.median(tiempos),
+        "pico_bytes": pico,
+    }
+
+def casos(libro):
+    """(nombre, función) de cada ruta medida. obtener_df_diario y
+    procesar_mayor_mejorado se miden por lo que calculan al fallar la caché."""
+    mayor = libro.mayor()
+    desde, hasta = date(2023, 7, 1), date(2024, 6, 30)    # mitad central del libro sintético
+    montos_cajas = np.random.default_rng(1).integers(0, 5_000_000, 1_000)
+
+    def un_asiento():
+        for _ in range(100):
+            generar_asiento_contable("10/04/2025", "Venta", [("Bancos", 1160.0)],
+                                     [("Ventas", 1000.0), ("IVA Trasladado", 160.0)])
+
+    def abrir():
+        LibroBitacora(libro.ruta).cerrar(punto_control=False)
+
+    return [
+        *([("abrir bitácora", abrir)] if isinstance(libro, LibroBitacora) else []),
+        ("generar_asiento_contable x100", un_asiento),
+        ("obtener_df_diario", libro.diario_df),
+        ("procesar_mayor_mejorado", libro.mayor),
+        ("procesar_mayor_mejorado periodo", lambda: libro.mayor(desde, hasta)),
+        ("generar_balanza", lambda: generar_balanza(mayor)),
+        ("generar_estado_resultados", lambda: generar_estado_resultados(mayor)),
+        ("arqueo_caja", lambda: arqueo_caja(1_234_550)),
+        ("arqueo_lote 1000 cajas", lambda: arqueo_lote(montos_cajas)),
+    ]
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutar(tamanos, backend="memoria", repeticiones=5, progreso=print):
+    resultados = []
+    for num_lineas in tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "bench.db")
+            inicio = time.perf_counter()
+            libro = crear_libro_sintetico(num_lineas, backend, ruta=ruta)
+            carga = time.perf_counter() - inicio
+            resultados.append({"caso": "carga contabilizar_lote + append_lote", "lineas": libro.num_lineas,
+                               "repeticiones": 1, "segundos_min": carga, "segundos_mediana": carga,
+                               "pico_bytes": None})
+            for nombre, funcion in casos(libro):
+                r = medir(funcion, repeticiones)
+                resultados.append({"caso": nombre, "lineas": libro.num_lineas, **r})
+                progreso(f"{backend:8} {libro.num_lineas:>9,} {nombre:38} {r['segundos_mediana'] * 1000:10.3f} ms"
+                         f" {r['pico_bytes'] / 2**20:9.2f} MiB")
+            if backend == "sqlite":
+                libro.con.close()
+            elif backend == "bitacora":
+                libro.cerrar()
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "resultados": resultados,
+    }
+
+def comparar(base, nuevo):
+    """Tabla de la mediana de `nuevo` contra `base` por caso y tamaño."""
+    clave = lambda r: (r["caso"], r["lineas"])
+    antes = {clave(r): r for r in base["resultados"]}
+    filas = []
+    for r in nuevo["resultados"]:
+        b = antes.get(clave(r))
+        if b:
+            filas.append({"caso": r["caso"], "lineas": r["lineas"],
+                          "base_ms": b["segundos_mediana"] * 1000,
+                          "nuevo_ms": r["segundos_mediana"] * 1000,
+                          "razon": r["segundos_mediana"] / b["segundos_mediana"]})
+    return pd.DataFrame(filas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS,
+                        help="líneas del diario por libro sintético")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="memoria")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por omisión, la salida estándar)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"),
+                        help="compara dos archivos de resultados en lugar de medir")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        base, nuevo = (json.load(open(ruta, encoding="utf-8")) for ruta in args.comparar)
+        print(comparar(base, nuevo).to_string(index=False, float_format="{:,.3f}".format))
+        return 0
+
+    informe = ejecutar(args.tamanos, args.backend, args.repeticiones,
+                       progreso=lambda linea: print(linea, file=sys.stderr))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(informe, sys.stdout, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Motor contable de S4AI sin dependencias de interfaz.
+
+Se puede importar desde trabajos por lotes o pruebas sin iniciar Streamlit;
+``python -m contabilidad`` genera reportes desde un archivo de libro.
+"""
+from .dinero import (
+    TASA_IVA, dividir_redondeando, a_centavos, a_pesos, formato_pesos, en_pesos,
+    sumar_por, calcular_iva, separar_iva,
+)
+from .libro import IndiceFechas, CuboMensual, LibroDiario, LibroSQLite, crear_libro
+from .bitacora import REGISTRO, LibroBitacora
+from .cache import CacheReportes
+from .compartido import LibroCompartido
+from .asientos import (
+    REGLAS_CONTABLES, TIPOS_TRANSACCION, generar_asiento_contable, componentes_regla,
+    contabilizar, aplicar_regla, contabilizar_lote, registrar_compra,
+)
+from .importacion import COLUMNAS_IMPORTACION, importar_transacciones
+from .exportacion import (
+    REPORTES_EXPORTABLES, FORMATOS_EXPORTACION, bloques_reporte, exportar_csv, exportar_xlsx,
+    exportar_reporte, exportar_estado_pdf,
+)
+from .consolidacion import (
+    EMPRESA_PREDETERMINADA, cargar_empresas, reportes_entidad, crear_pool, eliminacion,
+    aplicar_eliminaciones, sumar_mayores, consolidar, tabla_consolidacion,
+)
+from .catalogo import (
+    NATURALEZAS, CATALOGO_BASE, CATALOGO, COLUMNAS_ROLLUP, CatalogoCuentas, balanza_por_nivel,
+)
+from .cadena import SEMILLA, ESLABON, CadenaHash, eslabon
+from .auditoria import MAX_HALLAZGOS, COLUMNAS_HALLAZGOS, verificar_cadena, auditar
+from .series import PUNTOS_GRAFICA, SERIES_SALDOS, lttb, series_saldos, reducir_serie
+from .reportes import (
+    ETIQUETAS_ESTADO, generar_balanza, generar_estado_resultados, generar_estado_comparativo,
+)
+from .iva import (
+    CUENTAS_IVA, TIPO_POR_CONCEPTO, COLUMNAS_LIQUIDACION, COLUMNAS_IVA_TIPO, IndiceIVA, montos_iva,
+    liquidacion_iva, iva_por_tipo,
+)
+from .arqueo import DENOMINACIONES, SIN_LIMITE, arqueo_lote, arqueo_caja
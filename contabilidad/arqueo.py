@@ -0,0 +1,140 @@
+"""Arqueo de caja: desglose por denominación en centavos.
+
+El desglose se intenta primero con un paso greedy vectorizado para todas las
+cajas. Sólo las cajas cuyo faltante todavía podría reducirse (denominaciones
+limitadas o un subconjunto como 50 y 20, donde el greedy no es exacto) pasan
+por el solucionador exacto de sumas alcanzables.
+"""
+import numpy as np
+
+# Denominaciones en centavos, de mayor a menor
+DENOMINACIONES = np.array([100_000, 50_000, 20_000, 10_000, 5_000, 2_000,
+                           1_000, 500, 200, 100, 50], dtype=np.int64)
+SIN_LIMITE = np.iinfo(np.int64).max
+MAX_SUMAS_EXACTO = 20_000_000    # sumas que revisa el solucionador exacto por caja
+
+def _alcanzables(alcanzable, unidad, cantidad):
+    """Sumas alcanzables agregando hasta `cantidad` piezas de `unidad`, en
+    potencias de dos (1, 2, 4, …): un corrimiento por pieza."""
+    alcanzable = alcanzable.copy()
+    pieza = 1
+    while cantidad > 0:
+        k = min(pieza, cantidad)
+        paso = k * unidad
+        if paso < len(alcanzable):
+            alcanzable[paso:] |= alcanzable[:-paso].copy()
+        cantidad -= k
+        pieza *= 2
+    return alcanzable
+
+def _exacto(monto, limite, denominaciones):
+    """Conteos que cubren lo más posible de `monto` sin pasarse, respetando
+    `limite`; entre soluciones del mismo monto prefiere las denominaciones
+    grandes. None si el problema rebasa MAX_SUMAS_EXACTO."""
+    g = int(np.gcd.reduce(denominaciones))
+    unidades = denominaciones // g
+    total = int(monto) // g
+    tope = np.minimum(limite, total // unidades)
+    conteos = np.zeros(len(denominaciones), dtype=np.int64)
+
+    # La mayor denominación que alcanza para todo el monto fija las demás: de
+    # otra d no hacen falta más de u/mcd(d, u) - 1 piezas, porque esas se
+    # cambian por piezas de la grande sin alterar la suma
+    libres = np.flatnonzero(limite >= total // unidades)
+    grande = int(libres[np.argmax(unidades[libres])]) if len(libres) and total else None
+    if grande is not None:
+        u = unidades[grande]
+        tope = np.minimum(tope, u // np.gcd(unidades, u) - 1)
+        tope[grande] = 0
+    resto = [k for k in np.argsort(unidades) if tope[k] > 0]
+    n = min(total, int(sum(int(tope[k]) * int(unidades[k]) for k in resto)))
+    if n + 1 > MAX_SUMAS_EXACTO:
+        return None
+
+    tablas = [np.zeros(n + 1, dtype=bool)]
+    tablas[0][0] = True
+    for k in resto:
+        tablas.append(_alcanzables(tablas[-1], int(unidades[k]), int(tope[k])))
+    sumas = np.flatnonzero(tablas[-1])
+    if grande is not None:
+        cubierto = sumas + (total - sumas) // unidades[grande] * unidades[grande]
+    else:
+        cubierto = sumas
+    # El mayor monto cubierto; a igual monto, más piezas de la denominación grande
+    suma = int(sumas[np.flatnonzero(cubierto == cubierto.max())[0]])
+    if grande is not None:
+        conteos[grande] = (total - suma) // unidades[grande]
+
+    # Reconstrucción de mayor a menor denominación con las tablas previas
+    for i in range(len(resto), 0, -1):
+        k, previa = resto[i - 1], tablas[i - 1]
+        candidatos = suma - unidades[k] * np.arange(min(tope[k], suma // unidades[k]) + 1)[::-1]
+        c = len(candidatos) - 1 - int(np.flatnonzero(previa[candidatos])[0])
+        conteos[k] = c
+        suma -= c * int(unidades[k])
+    return conteos
+
+def arqueo_lote(montos, disponibles=None, minimo_uno=True, denominaciones=DENOMINACIONES):
+    """Desglose de varias cajas a la vez, en enteros.
+
+    `montos` son los centavos de cada caja (no negativos). `disponibles`
+    limita lo que hay en cada caja: una matriz (cajas × denominaciones) o un
+    solo renglón para todas, booleana (se acepta o no la denominación) o
+    entera (unidades máximas). Con `minimo_uno` se pone primero una unidad de
+    cada denominación disponible, salvo en las cajas donde eso ya rebasa el
+    monto o impide completarlo exacto. Devuelve (conteos, faltante): la matriz
+    de unidades por denominación y los centavos que no se pueden cubrir con
+    ninguna combinación disponible."""
+    montos = np.atleast_1d(np.asarray(montos, dtype=np.int64))
+    if np.any(montos < 0):
+        raise ValueError("Los montos del arqueo no pueden ser negativos")
+    denominaciones = np.asarray(denominaciones, dtype=np.int64)
+    forma = (len(montos), len(denominaciones))
+    if disponibles is None:
+        limite = np.full(forma, SIN_LIMITE, dtype=np.int64)
+    else:
+        disponibles = np.broadcast_to(np.asarray(disponibles), forma)
+        limite = np.where(disponibles, SIN_LIMITE, 0) if disponibles.dtype == bool \
+            else disponibles.astype(np.int64)
+        if np.any(limite < 0):
+            raise ValueError("Las unidades disponibles no pueden ser negativas")
+
+    conteos = np.zeros(forma, dtype=np.int64)
+    base = (limite > 0).astype(np.int64)
+    if minimo_uno:
+        cabe = base @ denominaciones <= montos
+        conteos[cabe] = base[cabe]
+    restante = montos - conteos @ denominaciones
+
+    # Greedy por columna: una operación por denominación para todas las cajas
+    for k, d in enumerate(denominaciones):
+        extra = np.minimum(restante // d, limite[:, k] - conteos[:, k])
+        conteos[:, k] += extra
+        restante -= extra * d
+
+    # Cajas donde el greedy no completó: búsqueda exacta, con y sin la unidad
+    # mínima. Toda combinación suma un múltiplo del mcd de las denominaciones
+    # disponibles, así que un faltante menor que ese mcd ya es el mínimo
+    mcd = np.gcd.reduce(np.where(limite > 0, denominaciones, 0), axis=1)
+    for i in np.flatnonzero((mcd > 0) & (restante >= mcd)):
+        opciones = []
+        if minimo_uno and base[i] @ denominaciones <= montos[i]:
+            extra = _exacto(montos[i] - base[i] @ denominaciones, limite[i] - base[i], denominaciones)
+            if extra is not None:
+                opciones.append(base[i] + extra)
+        sin_base = _exacto(montos[i], limite[i], denominaciones)
+        if sin_base is not None:
+            opciones.append(sin_base)
+        if opciones:
+            # La de menor faltante; a igual faltante, la que respeta la unidad mínima
+            mejor = min(opciones, key=lambda c: montos[i] - c @ denominaciones)
+            if montos[i] - mejor @ denominaciones < restante[i]:
+                conteos[i] = mejor
+                restante[i] = montos[i] - mejor @ denominaciones
+    return conteos, restante
+
+def arqueo_caja(monto, disponibles=None, minimo_uno=True):
+    """Desglose de una sola caja como dict {denominación: cantidad}, en centavos,
+    con al menos una unidad de cada denominación cuando el monto lo permite."""
+    conteos, _ = arqueo_lote([monto], disponibles, minimo_uno)
+    return {int(d): int(c) for d, c in zip(DENOMINACIONES, conteos[0]) if c}
@@ -0,0 +1,190 @@
+"""Generación de asientos: una transacción o miles con el motor de reglas."""
+import numpy as np
+import pandas as pd
+
+from .dinero import TASA_IVA, a_centavos, calcular_iva, separar_iva, sumar_por
+
+def generar_asiento_contable(fecha, concepto, cuentas_debe, cuentas_haber, en_centavos=False):
+    # Los montos llegan en pesos salvo que se indique lo contrario
+    if not en_centavos:
+        cuentas_debe = [(c, a_centavos(m)) for c, m in cuentas_debe]
+        cuentas_haber = [(c, a_centavos(m)) for c, m in cuentas_haber]
+
+    # Calcular totales
+    total_debe = sum(monto for _, monto in cuentas_debe)
+    total_haber = sum(monto for _, monto in cuentas_haber)
+    
+    # Validar balance (exacto, en centavos)
+    if total_debe != total_haber:
+        raise ValueError("El asiento no está balanceado")
+    
+    # Construir estructura del asiento (una posición por línea, montos en centavos)
+    asiento = {
+        'Fecha': fecha,
+        'Cuentas': [],
+        'Debe': [],
+        'Haber': [],
+        'Concepto': concepto
+    }
+    
+    # Procesar cuentas en Debe
+    for cuenta, monto in cuentas_debe:
+        asiento['Cuentas'].append(cuenta)
+        asiento['Debe'].append(int(monto))
+        asiento['Haber'].append(0)
+    
+    # Procesar cuentas en Haber
+    for cuenta, monto in cuentas_haber:
+        asiento['Cuentas'].append(cuenta)
+        asiento['Debe'].append(0)
+        asiento['Haber'].append(int(monto))
+    
+    return asiento
+
+# Reglas de contabilización
+# Cada tipo indica si el monto capturado es el neto ('neto') o el total con
+# IVA ('total'), y qué componente (neto, iva, total, monto2) va a cada cuenta.
+# monto2 sólo lo usa la apertura (saldo en Bancos). etiqueta/etiqueta2 son
+# los campos del formulario.
+REGLAS_CONTABLES = {
+    "Apertura de Cuentas": {
+        "concepto": "Apertura de cuentas", "base": "neto", "tasa": 0.0,
+        "etiqueta": "Monto en Caja", "etiqueta2": "Monto en Bancos",
+        "debe":  [("Caja", "neto"), ("Bancos", "monto2")],
+        "haber": [("Capital Social", "total")]},
+    "Compra de Mercancía": {
+        "concepto": "Compra de mercancía", "base": "neto", "tasa": TASA_IVA,
+        "etiqueta": "Monto Compras",
+        "debe":  [("Compras", "neto"), ("IVA Acreditable", "iva")],
+        "haber": [("Bancos", "total")]},
+    "Descuento Pronto Pago Compras": {
+        "concepto": "Descuento Pronto Pago Compras 10%", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Bancos (10% Pronto Pago)",
+        "debe":  [("Bancos", "total")],
+        "haber": [("Descuentos s/compras", "neto"), ("IVA Acreditable", "iva")]},
+    "Venta al Contado": {
+        "concepto": "Venta de mercancía al contado", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Bancos",
+        "debe":  [("Bancos", "total")],
+        "haber": [("Ventas", "neto"), ("IVA Trasladado", "iva")]},
+    "Descuento Pronto Pago Ventas": {
+        "concepto": "Descuento Pronto Pago Ventas", "base": "neto", "tasa": TASA_IVA,
+        "etiqueta": "Monto Descuento (Excluyendo IVA)",
+        "debe":  [("Descuentos s/ventas", "neto"), ("IVA Trasladado", "iva")],
+        "haber": [("Bancos", "total")]},
+    "Devolución de Compras": {
+        "concepto": "Devolución de compras", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Bancos Devolución",
+        "debe":  [("Bancos", "total")],
+        "haber": [("Devoluciones s/compras", "neto"), ("IVA Acreditable", "iva")]},
+    "Devolución de Ventas": {
+        "concepto": "Devolución de ventas", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Bancos Devolución",
+        "debe":  [("Devoluciones s/ventas", "neto"), ("IVA Trasladado", "iva")],
+        "haber": [("Bancos", "total")]},
+    "Rebajas en Compras": {
+        "concepto": "Rebajas en compras", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Rebaja (bancos)",
+        "debe":  [("Bancos", "total")],
+        "haber": [("Rebajas s/compras", "neto"), ("IVA Acreditable", "iva")]},
+    "Rebajas en Ventas": {
+        "concepto": "Rebajas en ventas", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Rebaja (bancos)",
+        "debe":  [("Rebajas s/ventas", "neto"), ("IVA Trasladado", "iva")],
+        "haber": [("Bancos", "total")]},
+    "Pago Gastos Generales": {
+        "concepto": "Pago Gastos Generales", "base": "total", "tasa": TASA_IVA,
+        "etiqueta": "Monto Gastos (bancos)",
+        "debe":  [("Gastos Generales", "neto"), ("IVA Acreditable", "iva")],
+        "haber": [("Bancos", "total")]},
+}
+
+TIPOS_TRANSACCION = list(REGLAS_CONTABLES)
+
+def componentes_regla(regla, monto, monto2=0):
+    """Neto, IVA y total en centavos según la base de la regla. Funciona igual
+    con enteros que con arreglos int64."""
+    tasa = regla["tasa"]
+    if all(x != "monto2" for _, x in regla["debe"] + regla["haber"]):
+        monto2 = 0 * monto    # la regla no usa monto2
+    if regla["base"] == "neto":
+        neto = monto
+        iva = calcular_iva(neto, tasa)
+        total = neto + iva + monto2
+    else:
+        total = monto
+        neto, iva = separar_iva(total, tasa)
+    return {"neto": neto, "iva": iva, "total": total, "monto2": monto2}
+
+def contabilizar(tipo, fecha, monto, monto2=0.0, regla=None):
+    """Genera el asiento de una transacción del tipo indicado (montos en pesos)."""
+    regla = regla or REGLAS_CONTABLES[tipo]
+    comp = componentes_regla(regla, a_centavos(monto), a_centavos(monto2))
+    return generar_asiento_contable(
+        fecha=fecha,
+        concepto=regla["concepto"],
+        cuentas_debe=[(c, comp[x]) for c, x in regla["debe"]],
+        cuentas_haber=[(c, comp[x]) for c, x in regla["haber"]],
+        en_centavos=True
+    )
+
+def aplicar_regla(regla, montos, montos2=None):
+    """Aplica una regla a un arreglo de montos en centavos en una sola operación.
+    Devuelve arreglos por línea (asiento, cuenta, debe, haber) con las líneas
+    agrupadas por asiento en el orden de la regla."""
+    montos = np.asarray(montos, dtype=np.int64)
+    n = len(montos)
+    montos2 = np.zeros(n, dtype=np.int64) if montos2 is None else np.asarray(montos2, dtype=np.int64)
+    comp = componentes_regla(regla, montos, montos2)
+    lineas = [(c, x, True) for c, x in regla["debe"]] + [(c, x, False) for c, x in regla["haber"]]
+    valores = np.column_stack([comp[x] for _, x, _ in lineas]).ravel()
+    es_debe = np.tile([d for _, _, d in lineas], n)
+    return (
+        np.repeat(np.arange(n), len(lineas)),
+        np.tile(np.array([c for c, _, _ in lineas], dtype=object), n),
+        np.where(es_debe, valores, 0),
+        np.where(es_debe, 0, valores),
+    )
+
+def contabilizar_lote(tipos, fechas, montos, montos2=None):
+    """Genera miles de asientos de una vez, listos para libro.append_lote.
+    `tipos` puede ser un solo tipo o un arreglo con un tipo por monto; el
+    orden de los asientos respeta el de los montos (en pesos)."""
+    montos = a_centavos(np.asarray(montos, dtype=np.float64))
+    n = len(montos)
+    montos2 = np.zeros(n, dtype=np.int64) if montos2 is None else a_centavos(np.asarray(montos2, dtype=np.float64))
+    tipos = np.full(n, tipos, dtype=object) if isinstance(tipos, str) else np.asarray(tipos, dtype=object)
+    fechas = np.asarray(fechas, dtype="datetime64[D]")
+    if fechas.ndim == 0:
+        fechas = np.full(n, fechas)
+
+    partes = []
+    for tipo in pd.unique(tipos):
+        sel = np.flatnonzero(tipos == tipo)
+        rel, cuentas, debe, haber = aplicar_regla(REGLAS_CONTABLES[tipo], montos[sel], montos2[sel])
+        partes.append((sel[rel], cuentas, debe, haber))
+    if not partes:
+        vacio = np.empty(0, dtype=np.int64)
+        return {"Fecha": fechas, "Concepto": [], "Asiento": vacio.astype(np.int64),
+                "Cuentas": vacio.astype(object), "Debe": vacio, "Haber": vacio}
+    rel, cuentas, debe, haber = (np.concatenate(x) for x in zip(*partes))
+    orden = np.argsort(rel, kind="stable")
+    rel, cuentas, debe, haber = rel[orden], cuentas[orden], debe[orden], haber[orden]
+
+    # Validar balance de todos los asientos a la vez (exacto, en centavos)
+    if np.any(sumar_por(rel, debe - haber, n) != 0):
+        raise ValueError("El lote contiene asientos no balanceados")
+
+    return {
+        "Fecha":    fechas,
+        "Concepto": [REGLAS_CONTABLES[t]["concepto"] for t in tipos],
+        "Asiento":  rel,
+        "Cuentas":  cuentas,
+        "Debe":     debe,
+        "Haber":    haber,
+    }
+
+def registrar_compra(fecha, monto_total):
+    # A diferencia del formulario, aquí el monto ya incluye IVA
+    regla = dict(REGLAS_CONTABLES["Compra de Mercancía"], base="total")
+    return contabilizar("Compra de Mercancía", fecha, monto_total, regla=regla)
@@ -0,0 +1,163 @@
+"""Auditoría de integridad del libro.
+
+Revisa todo el diario con operaciones vectorizadas sobre sus columnas:
+cuadre de cada asiento, montos válidos, cuentas existentes y del catálogo,
+fechas de cada asiento y su orden, mayor contra líneas, y la cadena de
+hashes de las escrituras. La cadena se verifica en forma incremental: sólo
+se recalculan los eslabones escritos desde la última verificación correcta.
+"""
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .cadena import SEMILLA, eslabon
+from .catalogo import CATALOGO
+from .dinero import sumar_por
+
+MAX_HALLAZGOS = 1000    # renglones de detalle por tipo de hallazgo
+COLUMNAS_HALLAZGOS = ["Gravedad", "Tipo", "Asiento", "Detalle"]
+
+def verificar_cadena(libro, completo=False, columnas=None):
+    """Recalcula los eslabones de la cadena desde el último verificado (o
+    desde el primero con `completo`). `columnas` evita volver a leer las del
+    libro si ya se tienen todas. Devuelve {"eslabones", "verificados", "roto":
+    número de eslabón o None, "lineas_roto": (i, j), "sin_encadenar"}."""
+    estado = libro.verificacion
+    inicio = 0 if completo else estado["eslabones"]
+    eslabones = libro.eslabones(inicio - 1) if inicio else []
+    if eslabones:
+        # El último eslabón verificado da el punto de partida
+        lineas, anterior = eslabones[0][0], bytes(eslabones[0][1])
+        eslabones = eslabones[1:]
+    else:
+        inicio = 0
+        eslabones = libro.eslabones()
+        lineas, anterior = 0, SEMILLA
+    if columnas is None:
+        total, base = libro.num_lineas, lineas
+        columnas = libro.columnas(base, total)
+    else:
+        total, base = len(columnas["asiento"]), 0
+    resultado = {"eslabones": inicio + len(eslabones), "verificados": 0, "roto": None,
+                 "lineas_roto": None, "sin_encadenar": 0}
+    for k, (fin, guardado) in enumerate(eslabones):
+        if fin <= lineas or fin > total:
+            guardado = None    # eslabón fuera de orden o más allá del libro
+        else:
+            tramo = {c: v[lineas - base:fin - base] for c, v in columnas.items()}
+            calculado = eslabon(anterior, fin, tramo)
+        if guardado is None or calculado != bytes(guardado):
+            resultado["roto"] = inicio + k
+            resultado["lineas_roto"] = (lineas, fin)
+            return resultado
+        resultado["verificados"] += 1
+        lineas, anterior = fin, calculado
+    resultado["sin_encadenar"] = total - lineas
+    estado["eslabones"] = resultado["eslabones"]
+    return resultado
+
+def _agregar(hallazgos, gravedad, tipo, posiciones, asientos, detalle):
+    """Registra los casos en `posiciones`; sólo los primeros MAX_HALLAZGOS
+    llevan renglón de detalle (`detalle(posición)`)."""
+    if not len(posiciones):
+        return
+    muestra = np.asarray(posiciones)[:MAX_HALLAZGOS]
+    hallazgos.append((gravedad, tipo, len(posiciones), pd.DataFrame({
+        "Gravedad": gravedad, "Tipo": tipo,
+        "Asiento": np.asarray(asientos)[muestra], "Detalle": [detalle(i) for i in muestra],
+    }, columns=COLUMNAS_HALLAZGOS)))
+
+def auditar(libro, catalogo=CATALOGO, completo=False, hoy=None):
+    """Audita todo el libro. Devuelve {"lineas", "asientos", "resumen":
+    DataFrame por tipo con su número de casos, "hallazgos": DataFrame con el
+    detalle (hasta MAX_HALLAZGOS por tipo), "cadena": resultado de
+    verificar_cadena, "segundos"}. Gravedad "error" indica un libro
+    inconsistente o alterado; "aviso", algo a revisar."""
+    inicio = time.perf_counter()
+    c = libro.columnas()
+    fecha, cuenta, debe, haber = c["fecha"], c["cuenta"], c["debe"], c["haber"]
+    asiento = c["asiento"] + libro.BASE_ASIENTO    # números como se muestran en el diario
+    hallazgos = []
+
+    # Asientos: tramos contiguos de líneas con el mismo número
+    malos = np.flatnonzero(np.diff(asiento) < 0) + 1
+    _agregar(hallazgos, "error", "Líneas fuera de orden", malos, asiento,
+             lambda i: f"Línea {i + 1} después de una del asiento {asiento[i - 1]}")
+    cortes = np.flatnonzero(np.diff(asiento, prepend=asiento[:1] - 1) != 0)
+    numeros = asiento[cortes]
+    lineas_por_asiento = np.diff(np.append(cortes, len(asiento)))
+
+    # Cuadre por asiento
+    neto = np.add.reduceat(debe - haber, cortes) if len(cortes) else np.empty(0, np.int64)
+    _agregar(hallazgos, "error", "Asiento descuadrado", np.flatnonzero(neto != 0), numeros,
+             lambda k: f"Debe - Haber = {neto[k] / 100:,.2f}")
+    _agregar(hallazgos, "error", "Asiento de una sola línea", np.flatnonzero(lineas_por_asiento < 2), numeros,
+             lambda k: "Un asiento necesita al menos un cargo y un abono")
+
+    # Montos por línea
+    malos = np.flatnonzero((debe < 0) | (haber < 0) | ((debe != 0) & (haber != 0)))
+    _agregar(hallazgos, "error", "Monto inválido", malos, asiento,
+             lambda i: f"Línea {i + 1}: debe {debe[i] / 100:,.2f}, haber {haber[i] / 100:,.2f}")
+
+    # Cuentas: que existan en el libro y estén en el catálogo
+    ids = libro.ids_cuentas()
+    nombres = {cid: nombre for nombre, cid in ids.items()}
+    usadas, primera, inversa, veces = np.unique(cuenta, return_index=True, return_inverse=True,
+                                                return_counts=True)
+    existe = np.isin(usadas, np.fromiter(nombres, dtype=np.int64, count=len(nombres)))
+    _agregar(hallazgos, "error", "Cuenta inexistente", np.flatnonzero(~existe[inversa]), asiento,
+             lambda i: f"Línea {i + 1}: id de cuenta {cuenta[i]}")
+    fuera = [k for k, cid in enumerate(usadas) if existe[k] and nombres[cid] not in catalogo]
+    _agregar(hallazgos, "aviso", "Cuenta fuera del catálogo", fuera, asiento[primera],
+             lambda k: f"{nombres[usadas[k]]} ({veces[k]:,} líneas)")
+
+    # Fechas: una por asiento, válidas y en orden
+    inicial = fecha[cortes]
+    _agregar(hallazgos, "error", "Fechas distintas en un asiento",
+             np.flatnonzero(fecha != np.repeat(inicial, lineas_por_asiento)), asiento,
+             lambda i: f"Línea {i + 1}: {fecha[i]}")
+    _agregar(hallazgos, "aviso", "Fecha inválida o futura",
+             np.flatnonzero(np.isnat(inicial) | (inicial > np.datetime64(hoy or date.today(), 'D'))), numeros,
+             lambda k: str(inicial[k]))
+    maxima = np.maximum.accumulate(inicial) if len(inicial) else inicial
+    _agregar(hallazgos, "aviso", "Fecha anterior a un asiento previo",
+             np.flatnonzero(inicial[1:] < maxima[:-1]) + 1, numeros,
+             lambda k: f"{inicial[k]} después de {maxima[k - 1]}")
+
+    # Mayor incremental contra las líneas
+    de_lineas = {
+        nombres[cid]: (int(d), int(h))
+        for cid, d, h in zip(usadas, sumar_por(inversa, debe, len(usadas)), sumar_por(inversa, haber, len(usadas)))
+        if cid in nombres
+    }
+    diferencias = [(nombre, s["debe"], s["haber"]) + de_lineas.get(nombre, (0, 0))
+                   for nombre, s in libro.mayor_registrado().items()]
+    diferencias = [d for d in diferencias if d[1:3] != d[3:]]
+    _agregar(hallazgos, "error", "Mayor distinto de las líneas", range(len(diferencias)),
+             np.full(len(diferencias), -1),
+             lambda k: "{}: mayor {:,.2f} / {:,.2f}, líneas {:,.2f} / {:,.2f}".format(
+                 diferencias[k][0], *(m / 100 for m in diferencias[k][1:])))
+
+    # Cadena de hashes
+    cadena = verificar_cadena(libro, completo, c)
+    if cadena["roto"] is not None:
+        i, j = cadena["lineas_roto"]
+        _agregar(hallazgos, "error", "Cadena de hashes rota", [0], [asiento[i] if i < len(asiento) else -1],
+                 lambda _: f"Eslabón {cadena['roto'] + 1}: líneas {i + 1} a {j} alteradas o faltantes")
+    elif cadena["sin_encadenar"]:
+        _agregar(hallazgos, "aviso", "Líneas sin encadenar", [0], [asiento[-cadena["sin_encadenar"]]],
+                 lambda _: f"Las últimas {cadena['sin_encadenar']:,} líneas no tienen eslabón")
+
+    resumen = pd.DataFrame([(g, t, n) for g, t, n, _ in hallazgos], columns=["Gravedad", "Tipo", "Casos"])
+    detalle = pd.concat([d for _, _, _, d in hallazgos], ignore_index=True) if hallazgos else \
+        pd.DataFrame(columns=COLUMNAS_HALLAZGOS)
+    return {
+        "lineas": len(asiento),
+        "asientos": len(cortes),
+        "resumen": resumen,
+        "hallazgos": detalle,
+        "cadena": cadena,
+        "segundos": time.perf_counter() - inicio,
+    }
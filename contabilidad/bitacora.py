@@ -0,0 +1,338 @@
+"""Libro en memoria respaldado por una bitácora binaria de sólo agregar.
+
+Archivos junto a `ruta`:
+
+- ``ruta``: un registro de ancho fijo por línea (REGISTRO). El último registro
+  de cada escritura (asiento o lote) lleva ``fin = 1`` y cada registro un valor
+  de control; al abrir se descarta la cola que no llegue completa hasta un fin.
+- ``ruta.nombres``: catálogo de cuentas y conceptos, una línea de texto por
+  nombre nuevo, escrito antes que los registros que lo usan.
+- ``ruta.punto``: punto de control con los totales por cuenta, el índice de
+  fechas, el cubo mensual y el índice de IVA hasta cierta línea.
+- ``ruta.cadena``: un eslabón (ESLABON) de la cadena de hashes por escritura.
+
+Al abrir se carga el punto de control y sólo se reproduce la cola de la
+bitácora; las líneas anteriores se leen con memmap sin copiarlas.
+"""
+import os
+
+import numpy as np
+
+from .cadena import ESLABON, CadenaHash
+from .dinero import sumar_por
+from .libro import LibroDiario
+
+REGISTRO = np.dtype([
+    ('asiento',  '<i8'),
+    ('fecha',    '<M8[D]'),
+    ('debe',     '<i8'),    # centavos
+    ('haber',    '<i8'),
+    ('cuenta',   '<i4'),
+    ('concepto', '<i4'),
+    ('fin',      '<i4'),    # 1 en la última línea de cada escritura
+    ('control',  '<u4'),
+])
+
+_MEZCLA = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                    0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+                    0x27D4EB2F165667C5], dtype=np.uint64)
+_SEMILLA = np.uint64(0x5334414942495441)    # "S4AIBITA"
+
+def _control(registros):
+    """Valor de control de cada registro: distingue registros escritos a
+    medias o llenos de ceros de los completos."""
+    campos = [registros[c].view(np.int64) if c == 'fecha' else registros[c]
+              for c in ('asiento', 'fecha', 'debe', 'haber', 'cuenta', 'concepto', 'fin')]
+    h = np.full(len(registros), _SEMILLA, dtype=np.uint64)
+    for campo, k in zip(campos, _MEZCLA):
+        h = (h ^ campo.astype(np.int64).astype(np.uint64)) * k
+    return (h ^ (h >> np.uint64(32))).astype(np.uint32)
+
+class LibroBitacora(LibroDiario):
+    """LibroDiario que guarda cada asiento en una bitácora binaria y arranca
+    desde el último punto de control."""
+
+    CADA_LINEAS = 100_000      # líneas entre puntos de control automáticos
+
+    def __init__(self, ruta, sincronizar=True, solo_lectura=False):
+        super().__init__()
+        self.ruta = ruta
+        self.sincronizar = sincronizar
+        self._nombres_concepto = []
+        self._id_concepto = {}
+        self._por_escribir = []        # nombres nuevos aún no guardados
+        self._conceptos = self._fechas_asiento = None
+        self._num_asientos = 0
+        self._cargar_nombres(truncar=not solo_lectura)
+        self._cargar_bitacora(truncar=not solo_lectura)
+        guardados = self._cargar_cadena(truncar=not solo_lectura)
+        if solo_lectura:
+            # Otro proceso puede estar escribiendo: no se toca la cola ni se abre para agregar
+            self.solo_lectura = True
+            self._bitacora = self._nombres = self._eslabones = None
+            return
+        self._bitacora = open(ruta, "ab")
+        self._nombres = open(ruta + ".nombres", "a", encoding="utf-8", newline="\n")
+        self._eslabones = open(ruta + ".cadena", "ab")
+        self._guardar_eslabones(guardados)
+
+    # --- apertura ---
+    def _cargar_nombres(self, truncar=True):
+        ruta = self.ruta + ".nombres"
+        if not os.path.exists(ruta):
+            return
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        completo = datos.rfind(b"\n") + 1
+        if truncar and completo < len(datos):
+            os.truncate(ruta, completo)    # nombre escrito a medias
+        for linea in datos[:completo].decode("utf-8").splitlines():
+            tipo, nombre = linea[0], linea[2:]
+            if tipo == "C":
+                LibroDiario.id_cuenta(self, nombre)
+            else:
+                self._id_concepto[nombre] = len(self._nombres_concepto)
+                self._nombres_concepto.append(nombre)
+
+    def _cargar_punto(self):
+        try:
+            return dict(np.load(self.ruta + ".punto"))
+        except (OSError, ValueError):
+            return None
+
+    def _cargar_bitacora(self, truncar=True):
+        total = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        disponibles = total // REGISTRO.itemsize
+        punto = self._cargar_punto()
+        if punto is not None and int(punto["lineas"]) > disponibles:
+            punto = None
+        inicio = int(punto["lineas"]) if punto is not None else 0
+        registros = (np.memmap(self.ruta, dtype=REGISTRO, mode="r", shape=(disponibles,))
+                     if disponibles else np.empty(0, dtype=REGISTRO))
+        # Cola válida: registros con control correcto hasta el último fin
+        cola = registros[inicio:]
+        malos = np.flatnonzero(cola['control'] != _control(cola))
+        cola = cola[:malos[0] if len(malos) else len(cola)]
+        fines = np.flatnonzero(cola['fin'])
+        n = inicio + (fines[-1] + 1 if len(fines) else 0)
+        if truncar and n * REGISTRO.itemsize < total:
+            del registros, cola
+            os.truncate(self.ruta, n * REGISTRO.itemsize)
+            registros = (np.memmap(self.ruta, dtype=REGISTRO, mode="r", shape=(n,))
+                         if n else np.empty(0, dtype=REGISTRO))
+        self._registros = registros[:n]
+        self._lineas_punto = inicio
+        if punto is not None:
+            self._restaurar(punto)
+        if n:
+            # Las columnas apuntan al archivo; la primera escritura las copia a memoria
+            for attr, campo in (('_asiento', 'asiento'), ('_fecha', 'fecha'), ('_cuenta', 'cuenta'),
+                                ('_debe', 'debe'), ('_haber', 'haber')):
+                setattr(self, attr, self._registros[campo])
+            self._n = n
+            if punto is not None and "iva_meses" not in punto:
+                # Punto de control anterior al índice de IVA: se llena con sus líneas
+                self._reproducir_iva(self._registros[:inicio])
+            self._reproducir(self._registros[inicio:])
+
+    def _cargar_cadena(self, truncar=True):
+        """Carga los eslabones que cubren líneas válidas de la bitácora. Las
+        líneas sin eslabón (bitácoras anteriores a la cadena o una caída entre
+        las dos escrituras) se sellan con uno nuevo. Devuelve cuántos eslabones
+        ya estaban guardados."""
+        ruta = self.ruta + ".cadena"
+        datos = open(ruta, "rb").read() if os.path.exists(ruta) else b""
+        eslabones = np.frombuffer(datos[:len(datos) - len(datos) % ESLABON.itemsize], dtype=ESLABON)
+        validos = int(np.searchsorted(eslabones['lineas'], self._n, side='right'))
+        if truncar and validos * ESLABON.itemsize < len(datos):
+            os.truncate(ruta, validos * ESLABON.itemsize)
+        self.cadena = CadenaHash(eslabones[:validos])
+        lineas = self.cadena.ultimo()[0]
+        if lineas < self._n:
+            self.cadena.agregar(self._n, self.columnas(lineas, self._n))
+        return validos
+
+    def _guardar_eslabones(self, desde):
+        # Sin fsync: si se pierde la cola de la cadena, al abrir se vuelve a sellar
+        if desde < len(self.cadena):
+            self._eslabones.write(self.cadena.registros(desde).tobytes())
+            self._eslabones.flush()
+
+    def _restaurar(self, punto):
+        num = len(self.nombres_cuenta)
+        for attr in ('total_debe', 'total_haber'):
+            totales = np.zeros(num, dtype=np.int64)
+            totales[:len(punto[attr])] = punto[attr]
+            setattr(self, attr, totales.tolist())
+        indice = self.indice_fechas
+        indice._fechas = punto["indice_fechas"]
+        indice._dias = len(indice._fechas)
+        indice._acum_debe = punto["indice_debe"]
+        indice._acum_haber = punto["indice_haber"]
+        indice.vigente = bool(punto["indice_vigente"])
+        self.cubo._fila = {int(m): i for i, m in enumerate(punto["cubo_meses"])}
+        self.cubo.debe = punto["cubo_debe"]
+        self.cubo.haber = punto["cubo_haber"]
+        if "iva_meses" in punto:
+            iva = self.indice_iva
+            iva._fila = {int(m): i for i, m in enumerate(punto["iva_meses"])}
+            iva.conceptos = punto["iva_conceptos"].tolist()
+            iva._columna = {c: i for i, c in enumerate(iva.conceptos)}
+            iva.trasladado = punto["iva_trasladado"]
+            iva.acreditable = punto["iva_acreditable"]
+        self.version = int(punto["version"])
+        self._num_asientos = int(punto["asientos"])
+
+    def _reproducir(self, cola):
+        """Suma las líneas de la cola a los totales, al índice y al cubo."""
+        if not len(cola):
+            return
+        num = len(self.nombres_cuenta)
+        ids, debe, haber = cola['cuenta'], cola['debe'], cola['haber']
+        for attr, montos in (('total_debe', debe), ('total_haber', haber)):
+            totales = np.zeros(num, dtype=np.int64)
+            actuales = getattr(self, attr)
+            totales[:len(actuales)] = actuales
+            setattr(self, attr, (totales + sumar_por(ids, montos, num)).tolist())
+        self.indice_fechas.agregar(cola['fecha'], ids, debe, haber, num)
+        self.cubo.agregar(cola['fecha'], ids, debe, haber, num)
+        self._reproducir_iva(cola)
+        self.version += int(np.count_nonzero(cola['fin']))
+        self._num_asientos = int(cola['asiento'][-1]) + 1
+
+    def _reproducir_iva(self, registros):
+        """Suma las líneas de IVA de `registros` al índice de IVA."""
+        iva = registros[self._lineas_iva(registros['cuenta'])]
+        self.indice_iva.agregar(iva['fecha'], np.array(self._nombres_concepto, dtype=object)[iva['concepto']],
+                                np.array(self.nombres_cuenta, dtype=object)[iva['cuenta']],
+                                iva['debe'], iva['haber'])
+
+    # --- datos por asiento, derivados de la bitácora al primer uso ---
+    def _materializar(self):
+        r = self._registros
+        primeras = np.flatnonzero(np.diff(r['asiento'], prepend=-1))
+        self._conceptos = np.array(self._nombres_concepto, dtype=object)[r['concepto'][primeras]].tolist()
+        self._fechas_asiento = list(r['fecha'][primeras])
+
+    @property
+    def conceptos(self):
+        if self._conceptos is None:
+            self._materializar()
+        return self._conceptos
+
+    @conceptos.setter
+    def conceptos(self, valor):
+        self._conceptos = valor
+
+    @property
+    def fechas_asiento(self):
+        if self._fechas_asiento is None:
+            self._materializar()
+        return self._fechas_asiento
+
+    @fechas_asiento.setter
+    def fechas_asiento(self, valor):
+        self._fechas_asiento = valor
+
+    def __len__(self):
+        return self._num_asientos if self._conceptos is None else len(self._conceptos)
+
+    # --- escritura ---
+    def id_cuenta(self, nombre):
+        nuevo = nombre not in self._id_cuenta
+        cid = super().id_cuenta(nombre)
+        if nuevo:
+            self._por_escribir.append(f"C {nombre}\n")
+        return cid
+
+    def id_concepto(self, concepto):
+        cid = self._id_concepto.get(concepto)
+        if cid is None:
+            cid = len(self._nombres_concepto)
+            self._id_concepto[concepto] = cid
+            self._nombres_concepto.append(concepto)
+            self._por_escribir.append(f"K {concepto}\n")
+        return cid
+
+    def _sincronizar(self, archivo):
+        archivo.flush()
+        if self.sincronizar:
+            os.fsync(archivo.fileno())
+
+    def _escribir(self, i, conceptos):
+        """Guarda las líneas [i, _n) en la bitácora como una sola escritura."""
+        j = self._n
+        if j == i:
+            return
+        if self._por_escribir:
+            self._nombres.write("".join(self._por_escribir))
+            self._sincronizar(self._nombres)
+            self._por_escribir = []
+        registros = np.zeros(j - i, dtype=REGISTRO)
+        for campo in ('asiento', 'fecha', 'debe', 'haber', 'cuenta'):
+            registros[campo] = getattr(self, campo)[i:j]
+        registros['concepto'] = conceptos
+        registros['fin'][-1] = 1
+        registros['control'] = _control(registros)
+        self._bitacora.write(registros.tobytes())
+        self._sincronizar(self._bitacora)
+        self._guardar_eslabones(len(self.cadena) - 1)
+        if j - self._lineas_punto >= self.CADA_LINEAS:
+            self.guardar_punto_control()
+
+    def append(self, asiento):
+        i = self._n
+        num = super().append(asiento)
+        self._escribir(i, self.id_concepto(asiento['Concepto']))
+        return num
+
+    def append_lote(self, lote):
+        i = self._n
+        num = super().append_lote(lote)
+        nombres, inversa = np.unique(np.asarray(lote['Concepto'], dtype=object), return_inverse=True)
+        codigos = np.array([self.id_concepto(c) for c in nombres], dtype=np.int32)[inversa]
+        self._escribir(i, codigos[np.asarray(lote['Asiento'], dtype=np.int64)])
+        return num
+
+    def guardar_punto_control(self):
+        """Escribe los totales, el índice de fechas, el cubo mensual y el índice
+        de IVA de todas las líneas guardadas. Se reemplaza el punto anterior de
+        forma atómica."""
+        indice, cubo, iva = self.indice_fechas, self.cubo, self.indice_iva
+        filas = max(len(cubo._fila), 1)
+        meses = np.array(sorted(cubo._fila, key=cubo._fila.get), dtype=np.int64)
+        filas_iva = max(len(iva._fila), 1)
+        temporal = self.ruta + ".punto.tmp"
+        with open(temporal, "wb") as f:
+            np.savez(
+                f,
+                lineas=self._n,
+                asientos=len(self),
+                version=self.version,
+                total_debe=np.asarray(self.total_debe, dtype=np.int64),
+                total_haber=np.asarray(self.total_haber, dtype=np.int64),
+                indice_fechas=indice.fechas,
+                indice_debe=indice._acum_debe[:indice._dias + 1],
+                indice_haber=indice._acum_haber[:indice._dias + 1],
+                indice_vigente=indice.vigente,
+                cubo_meses=meses,
+                cubo_debe=cubo.debe[:filas],
+                cubo_haber=cubo.haber[:filas],
+                iva_meses=np.array(sorted(iva._fila, key=iva._fila.get), dtype=np.int64),
+                iva_conceptos=np.array(iva.conceptos, dtype=str),
+                iva_trasladado=iva.trasladado[:filas_iva],
+                iva_acreditable=iva.acreditable[:filas_iva],
+            )
+            self._sincronizar(f)
+        os.replace(temporal, self.ruta + ".punto")
+        self._lineas_punto = self._n
+
+    def cerrar(self, punto_control=True):
+        """Cierra los archivos, guardando antes un punto de control."""
+        if self.solo_lectura:
+            return
+        if punto_control:
+            self.guardar_punto_control()
+        self._bitacora.close()
+        self._nombres.close()
+        self._eslabones.close()
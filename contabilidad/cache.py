@@ -0,0 +1,92 @@
+"""Caché de reportes derivados, invalidada por la versión del libro."""
+import threading
+from collections import OrderedDict
+
+# Caché de reportes derivados
+class CacheReportes:
+    """Guarda reportes calculados (diario, mayor, estado de resultados) con
+    clave (nombre, versión del libro). Si el libro no cambió entre reruns se
+    reutiliza el resultado; las entradas más viejas salen al llegar al límite.
+    Se puede compartir entre sesiones: el cálculo corre fuera del candado y
+    sólo la consulta y el guardado lo toman. Los reportes pesados se pueden
+    calcular en un hilo aparte con en_segundo_plano()."""
+
+    def __init__(self, max_entradas=32):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+        self._en_curso = {}     # (nombre, params) -> Future del cálculo en segundo plano
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, nombre, version, calcular, params=()):
+        clave = (nombre, version, params)
+        with self._candado:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self._candado:
+            self._datos[clave] = valor
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return valor
+
+    def _ultimo(self, nombre, params):
+        """(versión, valor) más reciente del reporte, o None."""
+        versiones = [k[1] for k in self._datos if k[0] == nombre and k[2] == params]
+        if not versiones:
+            return None
+        version = max(versiones)
+        return version, self._datos[(nombre, version, params)]
+
+    def en_segundo_plano(self, nombre, version, tarea, params, ejecutor):
+        """Como obtener(), pero sin esperar: si no hay un resultado de
+        `version` o posterior, encarga `tarea()` a `ejecutor` (una sola vez
+        por reporte) y devuelve el resultado anterior. `tarea` devuelve
+        (versión con la que calculó, valor). Devuelve (versión, valor), o
+        (None, None) si el reporte nunca se ha calculado. Si la última tarea
+        falló, lanza su excepción."""
+        clave = (nombre, params)
+        with self._candado:
+            ultimo = self._ultimo(nombre, params)
+            if ultimo is not None and ultimo[0] >= version:
+                self._datos.move_to_end((nombre, ultimo[0], params))
+                self.aciertos += 1
+                return ultimo
+            futuro = self._en_curso.get(clave)
+            if futuro is not None and futuro.done():
+                del self._en_curso[clave]
+                if futuro.exception() is not None:
+                    raise futuro.exception()
+                futuro = None
+            if futuro is None:
+                self.fallos += 1
+                self._en_curso[clave] = ejecutor.submit(self._calcular, nombre, params, tarea)
+        return ultimo or (None, None)
+
+    def _calcular(self, nombre, params, tarea):
+        version, valor = tarea()
+        with self._candado:
+            self._datos[(nombre, version, params)] = valor
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def en_curso(self):
+        """Número de reportes que se están calculando en segundo plano."""
+        with self._candado:
+            return sum(not f.done() for f in self._en_curso.values())
+
+    def invalidar(self, nombre=None):
+        """Borra todo el caché, o sólo las entradas de un reporte."""
+        with self._candado:
+            if nombre is None:
+                self._datos.clear()
+            else:
+                for clave in [k for k in self._datos if k[0] == nombre]:
+                    del self._datos[clave]
+
+    def __len__(self):
+        return len(self._datos)
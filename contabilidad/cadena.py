@@ -0,0 +1,60 @@
+"""Cadena de hashes de las escrituras del libro.
+
+Cada escritura (un asiento o un lote) cierra un eslabón: el hash del eslabón
+anterior, el número de líneas del libro al terminar y las columnas de las
+líneas nuevas. Cambiar una línea ya escrita rompe su eslabón y todos los
+siguientes; verificar después de nuevas escrituras sólo recalcula la cola.
+"""
+import hashlib
+
+import numpy as np
+
+SEMILLA = bytes(32)
+COLUMNAS_CADENA = ('asiento', 'fecha', 'cuenta', 'debe', 'haber')
+ESLABON = np.dtype([('lineas', '<i8'), ('hash', 'S32')])
+
+def eslabon(anterior, lineas, columnas):
+    """Hash de una escritura. `columnas` tiene los arreglos de COLUMNAS_CADENA
+    de sus líneas; todos se codifican como enteros de 64 bits."""
+    h = hashlib.blake2b(anterior, digest_size=32)
+    h.update(np.int64(lineas).tobytes())
+    for c in COLUMNAS_CADENA:
+        valores = np.asarray(columnas[c])
+        if c == 'fecha':
+            valores = valores.astype('datetime64[D]').view(np.int64)
+        h.update(np.ascontiguousarray(valores, dtype='<i8').tobytes())
+    return h.digest()
+
+class CadenaHash:
+    """Eslabones en memoria: líneas del libro al cerrar cada uno y su hash."""
+
+    def __init__(self, registros=None):
+        self.lineas = [] if registros is None else registros['lineas'].tolist()
+        self.hashes = [] if registros is None else registros['hash'].tolist()
+
+    def __len__(self):
+        return len(self.lineas)
+
+    def ultimo(self):
+        """(líneas, hash) del último eslabón, o (0, SEMILLA) si no hay."""
+        return (self.lineas[-1], self.hashes[-1]) if self.lineas else (0, SEMILLA)
+
+    def agregar(self, lineas, columnas):
+        """Cierra un eslabón con las líneas nuevas hasta `lineas` y devuelve su hash."""
+        h = eslabon(self.ultimo()[1], lineas, columnas)
+        self.lineas.append(lineas)
+        self.hashes.append(h)
+        return h
+
+    def eslabones(self, desde=0, max_lineas=None):
+        """[(líneas, hash)] a partir del eslabón `desde`, sin pasar de `max_lineas`."""
+        fin = len(self.lineas) if max_lineas is None else \
+            int(np.searchsorted(self.lineas, max_lineas, side='right'))
+        return list(zip(self.lineas[desde:fin], self.hashes[desde:fin]))
+
+    def registros(self, desde=0):
+        """Eslabones a partir de `desde` como arreglo ESLABON para guardarlos."""
+        registros = np.empty(len(self.lineas) - desde, dtype=ESLABON)
+        registros['lineas'] = self.lineas[desde:]
+        registros['hash'] = self.hashes[desde:]
+        return registros
@@ -0,0 +1,193 @@
+"""Catálogo de cuentas: ids enteros, naturaleza y jerarquía de grupos.
+
+Cada cuenta o grupo es un nodo con id entero (su posición en el catálogo),
+código ("1.1.01"), naturaleza (deudora o acreedora) y padre. Al construir el
+catálogo se precalculan los pares (grupo, nodo) de cada nodo con todos sus
+ancestros, así que los totales de todos los niveles salen del mayor por
+cuenta con una sola suma agrupada, sin volver a recorrer las líneas.
+"""
+import numpy as np
+import pandas as pd
+
+from .dinero import sumar_por
+
+NATURALEZAS = ("deudora", "acreedora")
+
+# (código, nombre, naturaleza, código del padre)
+CATALOGO_BASE = [
+    ("1",      "Activo",                  "deudora",   None),
+    ("1.1",    "Activo Circulante",       "deudora",   "1"),
+    ("1.1.01", "Caja",                    "deudora",   "1.1"),
+    ("1.1.02", "Bancos",                  "deudora",   "1.1"),
+    ("1.1.03", "IVA Acreditable",         "deudora",   "1.1"),
+    ("2",      "Pasivo",                  "acreedora", None),
+    ("2.1",    "Pasivo a Corto Plazo",    "acreedora", "2"),
+    ("2.1.01", "IVA Trasladado",          "acreedora", "2.1"),
+    ("3",      "Capital Contable",        "acreedora", None),
+    ("3.1",    "Capital Contribuido",     "acreedora", "3"),
+    ("3.1.01", "Capital Social",          "acreedora", "3.1"),
+    ("4",      "Ingresos",                "acreedora", None),
+    ("4.1",    "Ventas Netas",            "acreedora", "4"),
+    ("4.1.01", "Ventas",                  "acreedora", "4.1"),
+    ("4.1.02", "Descuentos s/ventas",     "deudora",   "4.1"),
+    ("4.1.03", "Devoluciones s/ventas",   "deudora",   "4.1"),
+    ("4.1.04", "Rebajas s/ventas",        "deudora",   "4.1"),
+    ("5",      "Costos",                  "deudora",   None),
+    ("5.1",    "Compras Netas",           "deudora",   "5"),
+    ("5.1.01", "Compras",                 "deudora",   "5.1"),
+    ("5.1.02", "Descuentos s/compras",    "acreedora", "5.1"),
+    ("5.1.03", "Devoluciones s/compras",  "acreedora", "5.1"),
+    ("5.1.04", "Rebajas s/compras",       "acreedora", "5.1"),
+    ("6",      "Gastos",                  "deudora",   None),
+    ("6.1",    "Gastos de Operación",     "deudora",   "6"),
+    ("6.1.01", "Gastos Generales",        "deudora",   "6.1"),
+    ("9",      "Cuentas sin clasificar",  "deudora",   None),
+]
+CODIGO_SIN_CLASIFICAR = "9"
+
+COLUMNAS_ROLLUP = ["Código", "Cuenta", "Nivel", "Naturaleza", "Debe", "Haber",
+                   "Saldo", "Saldo Deudor", "Saldo Acreedor"]
+
+class CatalogoCuentas:
+    """Cuentas y grupos con id entero. Los nodos se agregan en orden: el
+    padre debe existir antes que sus hijos."""
+
+    def __init__(self, entradas=CATALOGO_BASE):
+        self.codigos = []
+        self.nombres = []
+        self.naturalezas = []
+        self.padres = []          # id del padre o -1
+        self.niveles = []         # 1 para los grupos de primer nivel
+        self._id = {}             # nombre -> id
+        self._id_codigo = {}      # código -> id
+        for codigo, nombre, naturaleza, padre in entradas:
+            self._nodo(codigo, nombre, naturaleza, padre)
+        self._precalcular()
+
+    def _nodo(self, codigo, nombre, naturaleza, padre):
+        if naturaleza not in NATURALEZAS:
+            raise ValueError(f"Naturaleza inválida para {nombre}: {naturaleza!r}")
+        if nombre in self._id or codigo in self._id_codigo:
+            raise ValueError(f"Cuenta repetida en el catálogo: {codigo} {nombre}")
+        if padre is not None and padre not in self._id_codigo:
+            raise ValueError(f"El padre {padre} de {nombre} no está en el catálogo")
+        cid = len(self.nombres)
+        pid = -1 if padre is None else self._id_codigo[padre]
+        self.codigos.append(codigo)
+        self.nombres.append(nombre)
+        self.naturalezas.append(naturaleza)
+        self.padres.append(pid)
+        self.niveles.append(1 if pid < 0 else self.niveles[pid] + 1)
+        self._id[nombre] = cid
+        self._id_codigo[codigo] = cid
+        return cid
+
+    def _precalcular(self):
+        """Pares (grupo, nodo) de cada nodo consigo mismo y con sus ancestros."""
+        grupos, miembros = [], []
+        for cid in range(len(self.nombres)):
+            nodo = cid
+            while nodo >= 0:
+                grupos.append(nodo)
+                miembros.append(cid)
+                nodo = self.padres[nodo]
+        self._grupo = np.array(grupos, dtype=np.int64)
+        self._miembro = np.array(miembros, dtype=np.int64)
+        self._signo = np.where(np.array(self.naturalezas) == "deudora", 1, -1).astype(np.int64)
+
+    def agregar(self, codigo, nombre, naturaleza, padre=None):
+        """Agrega una cuenta o grupo y devuelve su id."""
+        cid = self._nodo(codigo, nombre, naturaleza, padre)
+        self._precalcular()
+        return cid
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __contains__(self, nombre):
+        return nombre in self._id
+
+    def id(self, nombre):
+        """Id de la cuenta o grupo, o None si no está en el catálogo."""
+        return self._id.get(nombre)
+
+    def naturaleza(self, nombre):
+        return self.naturalezas[self._id[nombre]]
+
+    def hijos(self, nombre):
+        pid = self._id[nombre]
+        return [self.nombres[i] for i, p in enumerate(self.padres) if p == pid]
+
+    def ruta(self, nombre):
+        """Nombres desde el grupo de primer nivel hasta la cuenta."""
+        ruta, nodo = [], self._id[nombre]
+        while nodo >= 0:
+            ruta.append(self.nombres[nodo])
+            nodo = self.padres[nodo]
+        return ruta[::-1]
+
+    def con_cuentas(self, nombres):
+        """El catálogo si ya tiene todas las `nombres`; si no, una copia con las
+        que faltan bajo "Cuentas sin clasificar" (deudoras)."""
+        faltantes = [n for n in nombres if n not in self._id]
+        if not faltantes:
+            return self
+        copia = CatalogoCuentas(list(zip(self.codigos, self.nombres, self.naturalezas,
+                                         [None if p < 0 else self.codigos[p] for p in self.padres])))
+        base = len(copia.hijos(copia.nombres[copia._id_codigo[CODIGO_SIN_CLASIFICAR]]))
+        for k, nombre in enumerate(faltantes, start=base + 1):
+            copia._nodo(f"{CODIGO_SIN_CLASIFICAR}.{k:02d}", nombre, "deudora", CODIGO_SIN_CLASIFICAR)
+        copia._precalcular()
+        return copia
+
+    def acumular(self, mayor):
+        """(debe, haber) por nodo en centavos: cada grupo suma a todos sus
+        descendientes. `mayor` es {cuenta: {"debe", "haber"}} y todas sus
+        cuentas deben estar en el catálogo (ver con_cuentas)."""
+        n = len(self.nombres)
+        ids = np.array([self._id[c] for c in mayor], dtype=np.int64)
+        propio_debe = sumar_por(ids, [s["debe"] for s in mayor.values()], n)
+        propio_haber = sumar_por(ids, [s["haber"] for s in mayor.values()], n)
+        return (sumar_por(self._grupo, propio_debe[self._miembro], n),
+                sumar_por(self._grupo, propio_haber[self._miembro], n))
+
+    def rollup(self, mayor, nivel=None):
+        """DataFrame en orden de código con los totales de cada cuenta y grupo
+        (COLUMNAS_ROLLUP). "Saldo" va con el signo de la naturaleza del nodo.
+        Con `nivel` sólo quedan los nodos de ese nivel y las cuentas de
+        niveles menores; se omiten los nodos sin movimientos."""
+        catalogo = self.con_cuentas(mayor)
+        debe, haber = catalogo.acumular(mayor)
+        niveles = np.array(catalogo.niveles)
+        neto = debe - haber
+        df = pd.DataFrame({
+            "Código": catalogo.codigos,
+            "Cuenta": catalogo.nombres,
+            "Nivel": niveles,
+            "Naturaleza": catalogo.naturalezas,
+            "Debe": debe,
+            "Haber": haber,
+            "Saldo": neto * catalogo._signo,
+            "Saldo Deudor": np.maximum(neto, 0),
+            "Saldo Acreedor": np.maximum(-neto, 0),
+        }, columns=COLUMNAS_ROLLUP)
+        visibles = (debe != 0) | (haber != 0)
+        if nivel is not None:
+            hojas = np.ones(len(catalogo), dtype=bool)
+            hojas[[p for p in catalogo.padres if p >= 0]] = False
+            visibles &= (niveles == nivel) | (hojas & (niveles < nivel))
+        orden = sorted(np.flatnonzero(visibles), key=lambda i: [int(p) for p in catalogo.codigos[i].split(".")])
+        return df.iloc[orden].reset_index(drop=True)
+
+    @property
+    def nivel_maximo(self):
+        return max(self.niveles, default=0)
+
+CATALOGO = CatalogoCuentas()
+
+def balanza_por_nivel(mayor, nivel, catalogo=CATALOGO):
+    """Balanza de comprobación agrupada al `nivel` del catálogo, con el mismo
+    formato que generar_balanza más el código de cada renglón."""
+    df = catalogo.rollup(mayor, nivel)
+    balanza = df[["Código", "Cuenta", "Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"]].to_dict("records")
+    return balanza, int(df["Saldo Deudor"].sum()), int(df["Saldo Acreedor"].sum())
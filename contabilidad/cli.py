@@ -0,0 +1,111 @@
+"""Reportes por lotes desde la línea de comandos, sin interfaz.
+
+    python -m contabilidad libro.db balanza
+    python -m contabilidad libro.db balanza --nivel 2
+    python -m contabilidad libro.bitacora auditoria
+    python -m contabilidad libro.bitacora mayor
+    python -m contabilidad libro.db diario --formato xlsx --salida diario.xlsx
+    python -m contabilidad libro.db estado --formato pdf --salida estado.pdf
+    python -m contabilidad libro.db iva --desde 01/01/2025 --hasta 31/12/2025
+    python -m contabilidad transacciones.csv estado --desde 01/01/2025 --hasta 31/03/2025
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from .dinero import en_pesos
+from .libro import LibroDiario, crear_libro
+from .auditoria import auditar
+from .catalogo import balanza_por_nivel
+from .iva import COLUMNAS_LIQUIDACION, liquidacion_iva
+from .importacion import importar_transacciones
+from .exportacion import COLUMNAS_MAYOR, REPORTES_EXPORTABLES, bloques_reporte, exportar_reporte, \
+    exportar_estado_pdf
+from .reportes import generar_balanza, generar_estado_resultados, generar_estado_comparativo, \
+    ETIQUETAS_ESTADO
+
+REPORTES = ["diario", "mayor", "balanza", "estado", "comparativo", "auditoria", "iva"]
+
+def abrir_libro(ruta):
+    """Un .db/.sqlite se abre como LibroSQLite y un .bitacora como LibroBitacora,
+    ambos de sólo lectura: la aplicación puede estar escribiendo en el mismo
+    archivo y un reporte no debe truncar la cola ni migrar la base. Un CSV o
+    Parquet de transacciones se importa a un libro en memoria."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in (".db", ".sqlite", ".sqlite3", ".bitacora"):
+        return crear_libro(ruta, solo_lectura=True)
+    libro = LibroDiario()
+    importar_transacciones(libro, ruta, "parquet" if extension == ".parquet" else "csv")
+    return libro
+
+def generar_reporte(libro, reporte, desde=None, hasta=None, meses=12, nivel=None):
+    """DataFrame del reporte pedido, con los montos ya en pesos. La balanza
+    con `nivel` se agrupa a ese nivel del catálogo de cuentas."""
+    if reporte == "diario":
+        df, _, _, _ = libro.consultar_diario(desde, hasta, tam_pagina=max(libro.num_lineas, 1))
+        return en_pesos(df, ["Debe", "Haber"])
+    if reporte == "comparativo":
+        return generar_estado_comparativo(libro, meses) / 100
+    if reporte == "auditoria":
+        return auditar(libro, completo=True)["hallazgos"]
+    if reporte == "iva":
+        return en_pesos(liquidacion_iva(libro, desde, hasta), COLUMNAS_LIQUIDACION[1:])
+    if reporte == "mayor":
+        # Movimientos por cuenta con saldo corrido, los mismos que se exportan
+        # Sin líneas en el periodo no hay bloques
+        bloques = list(bloques_reporte(libro, "mayor", desde, hasta))
+        df = pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame(columns=COLUMNAS_MAYOR)
+        return en_pesos(df, REPORTES_EXPORTABLES["mayor"])
+    mayor = libro.mayor(desde, hasta)
+    if reporte == "balanza" and nivel is not None:
+        balanza, _, _ = balanza_por_nivel(mayor, nivel)
+        df = pd.DataFrame(balanza, columns=["Código", "Cuenta", "Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"])
+        return en_pesos(df, ["Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"])
+    if reporte == "balanza":
+        balanza, _, _ = generar_balanza(mayor)
+        df = pd.DataFrame(balanza, columns=["Cuenta", "Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"])
+        return en_pesos(df, ["Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"])
+    estado = pd.Series(generar_estado_resultados(mayor)).rename(index=ETIQUETAS_ESTADO)
+    return (estado / 100).rename("Monto").to_frame()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m contabilidad", description=__doc__.splitlines()[0])
+    parser.add_argument("libro", help="archivo SQLite o .bitacora del libro, o CSV/Parquet de transacciones")
+    parser.add_argument("reporte", choices=REPORTES)
+    parser.add_argument("--desde", help="fecha inicial dd/mm/aaaa")
+    parser.add_argument("--hasta", help="fecha final dd/mm/aaaa")
+    parser.add_argument("--meses", type=int, default=12, help="meses del comparativo")
+    parser.add_argument("--nivel", type=int, help="nivel del catálogo para agrupar la balanza (1 = grupos)")
+    parser.add_argument("--formato", choices=["csv", "json", "xlsx", "pdf"], default="csv",
+                        help="xlsx para diario, mayor y balanza; pdf para estado")
+    parser.add_argument("--salida", help="archivo de salida (por omisión, la salida estándar)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.libro):
+        parser.error(f"no existe el archivo {args.libro}")
+    if args.formato == "xlsx" and args.reporte not in REPORTES_EXPORTABLES:
+        parser.error("xlsx sólo está disponible para diario, mayor y balanza")
+    if args.formato == "pdf" and args.reporte != "estado":
+        parser.error("pdf sólo está disponible para estado")
+    libro = abrir_libro(args.libro)
+    if args.formato in ("xlsx", "pdf"):
+        # Se escriben en bloques directo del libro, sin armar el DataFrame completo
+        salida = args.salida or sys.stdout.buffer
+        if args.formato == "pdf":
+            exportar_estado_pdf(libro, salida, args.desde, args.hasta)
+        else:
+            exportar_reporte(libro, args.reporte, "xlsx", salida, args.desde, args.hasta)
+        return 0
+    df = generar_reporte(libro, args.reporte, args.desde, args.hasta, args.meses, args.nivel)
+
+    salida = args.salida or sys.stdout
+    indice = args.reporte in ("estado", "comparativo")
+    if args.formato == "json":
+        df.to_json(salida, orient="index" if indice else "records", date_format="iso",
+                   force_ascii=False, indent=2)
+    else:
+        df.to_csv(salida, index=indice)
+    # La auditoría termina con código 1 si encontró errores de integridad
+    return int(args.reporte == "auditoria" and (df["Gravedad"] == "error").any())
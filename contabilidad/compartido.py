@@ -0,0 +1,65 @@
+"""Libro compartido por todas las sesiones de un proceso."""
+import threading
+
+from .libro import LibroSQLite
+
+class LibroCompartido:
+    """Envuelve un libro para usarlo desde varios hilos a la vez.
+
+    Las escrituras pasan por un solo candado (un escritor a la vez) y cada una
+    aumenta `version` y avisa a quien espere con esperar_cambio(). Las lecturas
+    usan instantanea(): un libro de sólo lectura con el estado de una versión,
+    que no cambia aunque otros sigan registrando."""
+
+    def __init__(self, libro):
+        self._libro = libro
+        self._cambio = threading.Condition(threading.Lock())
+        self._version = 0
+        self._ultima = None    # (versión, instantánea) del libro en memoria
+
+    @property
+    def version(self):
+        return self._version
+
+    def version_libro(self):
+        """Versión del libro mismo. Con SQLite es la última línea confirmada en
+        el archivo, así que también cambia con escrituras de otros procesos; se
+        lee sin el candado, para no esperar a un lote o una importación larga."""
+        if isinstance(self._libro, LibroSQLite):
+            return self._libro.version_confirmada()
+        return self._libro.version
+
+    def _escribir(self, escribir):
+        with self._cambio:
+            resultado = escribir()
+            self._version += 1
+            self._cambio.notify_all()
+        return resultado
+
+    def append(self, asiento):
+        return self._escribir(lambda: self._libro.append(asiento))
+
+    def append_lote(self, lote):
+        return self._escribir(lambda: self._libro.append_lote(lote))
+
+    def instantanea(self):
+        """Libro de sólo lectura para todo un run. En memoria se copia una vez
+        por versión y la comparten todas las sesiones; con SQLite cada hilo
+        abre su propia transacción de lectura, que se cierra con
+        terminar_lectura() al acabar el run."""
+        if isinstance(self._libro, LibroSQLite):
+            return self._libro.instantanea()
+        ultima = self._ultima
+        if ultima is not None and ultima[0] == self._version:
+            return ultima[1]
+        with self._cambio:
+            if self._ultima is None or self._ultima[0] != self._version:
+                self._ultima = (self._version, self._libro.instantanea())
+            return self._ultima[1]
+
+    def esperar_cambio(self, version, timeout=None):
+        """Bloquea hasta que la versión sea distinta de `version` o pase el
+        tiempo límite. Devuelve la versión actual."""
+        with self._cambio:
+            self._cambio.wait_for(lambda: self._version != version, timeout)
+            return self._version
@@ -0,0 +1,153 @@
+"""Varias empresas en un despliegue y su estado consolidado.
+
+Cada empresa tiene su propio libro con el mismo catálogo de cuentas. El
+mayor, la balanza y el estado de resultados de cada una se calculan en un
+pool de procesos (un libro por tarea, abierto sólo para lectura), se suman y
+se les aplican las eliminaciones entre compañías.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .libro import crear_libro
+from .reportes import ETIQUETAS_ESTADO, generar_balanza, generar_estado_resultados
+
+EMPRESA_PREDETERMINADA = "Mi Empresa"
+
+def cargar_empresas(texto=None, ruta_predeterminada=None, nombre_predeterminado=None):
+    """{nombre: ruta del libro} a partir de "Nombre=ruta;Otra=ruta2" (variable
+    S4AI_EMPRESAS). Sin configuración hay una sola empresa, con la ruta y el
+    nombre dados (o S4AI_DB y S4AI_EMPRESA)."""
+    texto = os.environ.get("S4AI_EMPRESAS", "") if texto is None else texto
+    empresas = {}
+    for parte in texto.split(";"):
+        if not parte.strip():
+            continue
+        nombre, _, ruta = parte.partition("=")
+        if not nombre.strip():
+            raise ValueError(f"Empresa sin nombre en S4AI_EMPRESAS: {parte!r}")
+        empresas[nombre.strip()] = ruta.strip() or None
+    if not empresas:
+        nombre = nombre_predeterminado or os.environ.get("S4AI_EMPRESA") or EMPRESA_PREDETERMINADA
+        empresas[nombre] = ruta_predeterminada if ruta_predeterminada is not None \
+            else os.environ.get("S4AI_DB") or None
+    return empresas
+
+def reportes_entidad(libro, desde=None, hasta=None):
+    """Mayor, balanza y estado de resultados de un libro, en centavos."""
+    mayor = libro.mayor(desde, hasta)
+    return {
+        "mayor": mayor,
+        "balanza": generar_balanza(mayor),
+        "estado": generar_estado_resultados(mayor),
+    }
+
+def _reportes_archivo(ruta, desde, hasta):
+    # Corre en un proceso del pool: abre su propio lector del archivo
+    return reportes_entidad(crear_libro(ruta, solo_lectura=True), desde, hasta)
+
+def crear_pool(procesos=None):
+    """Pool de procesos para consolidar. Usa "spawn": el proceso principal
+    puede tener hilos (Streamlit) y no conviene copiarlo con fork."""
+    return ProcessPoolExecutor(procesos or os.cpu_count(),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+# Eliminaciones entre compañías
+def eliminacion(concepto, cargo, abono, monto=None):
+    """Regla de eliminación: cargo a `cargo` y abono a `abono` por `monto`
+    centavos. Sin monto se eliminan saldos recíprocos: el menor entre el saldo
+    acreedor de `cargo` y el saldo deudor de `abono` en la suma de empresas
+    (por ejemplo, cuentas por pagar contra cuentas por cobrar entre ellas)."""
+    return {"concepto": concepto, "cargo": cargo, "abono": abono, "monto": monto}
+
+def _mover(mayor, cuenta, monto, cargo):
+    """Carga o abona `monto` restándolo del lado del saldo de la cuenta: los
+    estados leen totales de un solo lado (Ventas en el haber, Compras en el
+    debe) y así reflejan el neto eliminado."""
+    saldo = mayor.setdefault(cuenta, {"debe": 0, "haber": 0})
+    acreedora = saldo["haber"] > saldo["debe"]
+    if cargo:
+        if acreedora:
+            saldo["haber"] -= monto
+        else:
+            saldo["debe"] += monto
+    elif acreedora:
+        saldo["haber"] += monto
+    else:
+        saldo["debe"] -= monto
+
+def aplicar_eliminaciones(mayor, reglas):
+    """Copia del mayor con las eliminaciones aplicadas y la lista de asientos
+    de eliminación (con el monto resuelto de cada regla)."""
+    mayor = {c: dict(s) for c, s in mayor.items()}
+    asientos = []
+    for regla in reglas:
+        monto = regla["monto"]
+        if monto is None:
+            cargo, abono = mayor.get(regla["cargo"]), mayor.get(regla["abono"])
+            monto = 0 if cargo is None or abono is None else max(
+                min(cargo["haber"] - cargo["debe"], abono["debe"] - abono["haber"]), 0)
+        if monto == 0:
+            continue
+        _mover(mayor, regla["cargo"], monto, cargo=True)
+        _mover(mayor, regla["abono"], monto, cargo=False)
+        asientos.append({"Concepto": regla["concepto"], "Cuentas": [regla["cargo"], regla["abono"]],
+                         "Debe": [monto, 0], "Haber": [0, monto]})
+    return mayor, asientos
+
+def sumar_mayores(mayores):
+    """Mayor con la suma por cuenta de varios mayores."""
+    total = {}
+    for mayor in mayores:
+        for cuenta, saldo in mayor.items():
+            t = total.setdefault(cuenta, {"debe": 0, "haber": 0})
+            t["debe"] += saldo["debe"]
+            t["haber"] += saldo["haber"]
+    return total
+
+def consolidar(entidades, reglas=(), desde=None, hasta=None, pool=None):
+    """Reportes por empresa y consolidado. `entidades` es {nombre: ruta o
+    libro}: las rutas se procesan en paralelo en `pool` (o en uno temporal) y
+    los libros ya abiertos en este proceso. Devuelve {"entidades": {nombre:
+    reportes}, "eliminaciones": [asientos], "consolidado": reportes}."""
+    rutas = {n: e for n, e in entidades.items() if isinstance(e, (str, os.PathLike))}
+    propio = pool is None and len(rutas) > 1
+    if propio:
+        pool = crear_pool(min(len(rutas), os.cpu_count() or 1))
+    try:
+        if pool is not None:
+            futuros = {n: pool.submit(_reportes_archivo, r, desde, hasta) for n, r in rutas.items()}
+        else:
+            futuros = {}
+        resultados = {}
+        for nombre, entidad in entidades.items():
+            if nombre in futuros:
+                resultados[nombre] = futuros[nombre].result()
+            elif nombre in rutas:
+                resultados[nombre] = _reportes_archivo(entidad, desde, hasta)
+            else:
+                resultados[nombre] = reportes_entidad(entidad, desde, hasta)
+    finally:
+        if propio:
+            pool.shutdown()
+    mayor, asientos = aplicar_eliminaciones(sumar_mayores(r["mayor"] for r in resultados.values()), reglas)
+    return {
+        "entidades": resultados,
+        "eliminaciones": asientos,
+        "consolidado": {
+            "mayor": mayor,
+            "balanza": generar_balanza(mayor),
+            "estado": generar_estado_resultados(mayor),
+        },
+    }
+
+def tabla_consolidacion(resultado):
+    """Estado de resultados con una columna por empresa, la suma, las
+    eliminaciones y el consolidado (centavos)."""
+    df = pd.DataFrame({nombre: r["estado"] for nombre, r in resultado["entidades"].items()})
+    df["Suma"] = df.sum(axis=1)
+    df["Eliminaciones"] = pd.Series(resultado["consolidado"]["estado"]) - df["Suma"]
+    df["Consolidado"] = pd.Series(resultado["consolidado"]["estado"])
+    return df.rename(index=ETIQUETAS_ESTADO)
@@ -0,0 +1,62 @@
+"""Montos en centavos enteros y reglas de redondeo del IVA."""
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+
+# Dinero en centavos
+# Todos los montos se guardan y suman como enteros de centavos (int64); sólo
+# se convierten a pesos o a texto al mostrarlos.
+def dividir_redondeando(numerador, divisor):
+    """División entera redondeando la mitad lejos de cero. Es la única regla
+    de redondeo del sistema; acepta enteros o arreglos de enteros."""
+    if isinstance(numerador, np.ndarray):
+        return np.sign(numerador) * ((np.abs(numerador) * 2 + divisor) // (2 * divisor))
+    signo = -1 if numerador < 0 else 1
+    return signo * ((abs(int(numerador)) * 2 + divisor) // (2 * divisor))
+
+def a_centavos(monto):
+    """Pesos (número, texto o arreglo) a centavos enteros."""
+    if isinstance(monto, str):
+        return int((Decimal(monto.replace(",", "")) * 100).to_integral_value(ROUND_HALF_UP))
+    if isinstance(monto, (np.ndarray, pd.Series, list)):
+        arr = np.asarray(monto, dtype=np.float64)
+        return (np.sign(arr) * np.floor(np.abs(arr) * 100 + 0.5)).astype(np.int64)
+    return int(math.copysign(math.floor(abs(monto) * 100 + 0.5), monto))
+
+def a_pesos(centavos):
+    """Centavos a pesos (float) para tablas y gráficas."""
+    return centavos / 100
+
+def formato_pesos(centavos):
+    """Texto "$1,234.56" a partir de centavos, sin pasar por float."""
+    centavos = int(centavos)
+    pesos, cent = divmod(abs(centavos), 100)
+    return f"{'-' if centavos < 0 else ''}${pesos:,}.{cent:02d}"
+
+def en_pesos(df, columnas):
+    """Copia de `df` con las columnas en centavos convertidas a pesos."""
+    return df.assign(**{c: a_pesos(df[c]) for c in columnas})
+
+def sumar_por(indices, valores, n):
+    """Suma exacta en int64 de `valores` agrupados por `indices` (0..n-1)."""
+    total = np.zeros(n, dtype=np.int64)
+    np.add.at(total, indices, valores)
+    return total
+
+TASA_IVA = 0.16
+
+def _puntos_base(tasa):
+    return int(round(tasa * 10_000))
+
+# Reglas de redondeo del IVA (montos en centavos)
+def calcular_iva(neto, tasa=TASA_IVA):
+    """IVA de un neto, redondeado al centavo."""
+    return dividir_redondeando(neto * _puntos_base(tasa), 10_000)
+
+def separar_iva(total, tasa=TASA_IVA):
+    """Divide un total con IVA en (neto, iva); el IVA absorbe el redondeo
+    para que neto + iva sea exactamente el total."""
+    neto = dividir_redondeando(total * 10_000, 10_000 + _puntos_base(tasa))
+    return neto, total - neto
@@ -0,0 +1,301 @@
+"""Exportación de Diario, Mayor y Balanza a CSV/XLSX y del Estado de
+Resultados a PDF. El Mayor lleva los movimientos de cada cuenta con su saldo
+corrido; la Balanza, un renglón por cuenta.
+
+Los reportes se recorren en bloques de DataFrame directamente del libro y
+cada bloque se formatea y escribe antes de pedir el siguiente, así que la
+memoria depende del tamaño de bloque y no del libro. `destino` puede ser una
+ruta o un archivo binario abierto.
+"""
+import io
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .consolidacion import sumar_mayores
+from .dinero import formato_pesos
+from .libro import _a_fecha
+from .reportes import ETIQUETAS_ESTADO, generar_balanza, generar_estado_resultados
+
+# Columnas en centavos de cada reporte exportable
+REPORTES_EXPORTABLES = {
+    "diario":  ["Debe", "Haber"],
+    "mayor":   ["Debe", "Haber", "Saldo"],
+    "balanza": ["Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"],
+}
+SIN_TOTAL = ("Saldo",)    # montos corridos: se formatean pero no se suman
+COLUMNAS_MAYOR = ["Cuenta", "Fecha", "Asiento", "Concepto", "Debe", "Haber", "Saldo"]
+FORMATOS_EXPORTACION = {
+    "csv":  "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf":  "application/pdf",
+}
+MAX_FILAS_XLSX = 1_048_575    # filas por hoja de Excel sin contar el encabezado
+
+def _bloques_mayor(libro, desde, hasta, tam_bloque):
+    """Movimientos por cuenta (COLUMNAS_MAYOR) con el saldo corrido debe -
+    haber, que parte del saldo de la cuenta al día anterior a `desde`."""
+    saldo = {}
+    if desde is not None:
+        anterior = libro.mayor(hasta=_a_fecha(desde) - np.timedelta64(1, 'D'))
+        saldo = {c: s["debe"] - s["haber"] for c, s in anterior.items()}
+    for bloque in libro.bloques_mayor(desde, hasta, tam_bloque):
+        if bloque.empty:
+            continue
+        # Las líneas de cada cuenta son contiguas: una suma acumulada para todo
+        # el bloque, ajustada al inicio de cada cuenta
+        cuentas = bloque["Cuenta"].to_numpy(dtype=object)
+        inicios = np.flatnonzero(np.r_[True, cuentas[1:] != cuentas[:-1]])
+        finales = np.r_[inicios[1:], len(cuentas)] - 1
+        acumulado = np.cumsum(bloque["Debe"].to_numpy(np.int64) - bloque["Haber"].to_numpy(np.int64))
+        ajuste = np.array([saldo.get(c, 0) for c in cuentas[inicios]], dtype=np.int64) \
+            - np.r_[0, acumulado][inicios]
+        corrido = acumulado + np.repeat(ajuste, finales - inicios + 1)
+        saldo.update(zip(cuentas[inicios], corrido[finales].tolist()))
+        yield bloque.assign(Saldo=corrido)[COLUMNAS_MAYOR]
+
+def bloques_reporte(libro, reporte, desde=None, hasta=None, tam_bloque=50_000):
+    """DataFrames del reporte con los montos en centavos. Diario y mayor salen
+    del libro bloque por bloque; la balanza tiene un renglón por cuenta."""
+    if reporte == "diario":
+        yield from libro.bloques_diario(desde, hasta, tam_bloque)
+        return
+    if reporte == "mayor":
+        yield from _bloques_mayor(libro, desde, hasta, tam_bloque)
+        return
+    balanza, _, _ = generar_balanza(libro.mayor(desde, hasta))
+    df = pd.DataFrame(balanza, columns=["Cuenta"] + REPORTES_EXPORTABLES["balanza"])
+    for i in range(0, len(df), tam_bloque):
+        yield df.iloc[i:i + tam_bloque]
+
+def _pesos_texto(centavos):
+    """Centavos a texto "1234.56" sin pasar por float."""
+    c = np.asarray(centavos, dtype=np.int64)
+    pesos, cent = np.divmod(np.abs(c), 100)
+    texto = np.char.add(np.char.add(pesos.astype(str), "."), np.char.zfill(cent.astype(str), 2))
+    return np.where(c < 0, np.char.add("-", texto), texto)
+
+def _fechas_texto(fechas):
+    """Fechas a texto dd/mm/aaaa, formateando una vez cada día distinto."""
+    dias, inversa = np.unique(pd.to_datetime(fechas).to_numpy().astype("datetime64[D]"),
+                              return_inverse=True)
+    return pd.DatetimeIndex(dias).strftime("%d/%m/%Y").to_numpy()[inversa]
+
+def _fila_totales(columnas, totales):
+    return pd.DataFrame([{c: totales.get(c, "Totales" if i == 0 else "") for i, c in enumerate(columnas)}])
+
+def _abrir_texto(destino):
+    if isinstance(destino, (str, os.PathLike)):
+        return open(destino, "w", encoding="utf-8", newline=""), True
+    return io.TextIOWrapper(destino, encoding="utf-8", newline=""), False
+
+def exportar_csv(bloques, destino, montos):
+    """Escribe los bloques como CSV con montos en pesos y fechas dd/mm/aaaa,
+    más un renglón final con los totales de `montos` (salvo SIN_TOTAL).
+    Devuelve las filas escritas."""
+    archivo, propio = _abrir_texto(destino)
+    totales = dict.fromkeys((c for c in montos if c not in SIN_TOTAL), 0)
+    filas = 0
+    columnas = None
+    try:
+        for bloque in bloques:
+            columnas = list(bloque.columns)
+            formato = {c: _pesos_texto(bloque[c]) for c in montos}
+            for c in totales:
+                totales[c] += int(bloque[c].sum())
+            if "Fecha" in bloque:
+                formato["Fecha"] = _fechas_texto(bloque["Fecha"])
+            bloque.assign(**formato).to_csv(archivo, index=False, header=filas == 0)
+            filas += len(bloque)
+        if columnas is not None:
+            fila = _fila_totales(columnas, {c: _pesos_texto([t])[0] for c, t in totales.items()})
+            fila.to_csv(archivo, index=False, header=False)
+    finally:
+        if propio:
+            archivo.close()
+        else:
+            archivo.flush()
+            archivo.detach()
+    return filas
+
+def exportar_xlsx(bloques, destino, montos, hoja="Reporte"):
+    """Escribe los bloques en un libro de Excel en modo de memoria constante
+    (cada fila se vuelca a disco al escribir la siguiente). Los montos quedan
+    como números en pesos y las fechas como fechas de Excel; si el reporte no
+    cabe en una hoja continúa en otra. Devuelve las filas escritas."""
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise ImportError("Para exportar a Excel instale xlsxwriter (pip install xlsxwriter)")
+    libro = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    negrita = libro.add_format({"bold": True})
+    formato_monto = libro.add_format({"num_format": "#,##0.00"})
+    formato_fecha = libro.add_format({"num_format": "dd/mm/yyyy"})
+    totales = dict.fromkeys((c for c in montos if c not in SIN_TOTAL), 0)
+    filas = 0
+    hojas = 0
+    hoja_actual = columnas = None
+    fila = MAX_FILAS_XLSX + 1
+
+    def nueva_hoja():
+        nonlocal hojas
+        hojas += 1
+        ws = libro.add_worksheet(hoja if hojas == 1 else f"{hoja} ({hojas})")
+        for k, c in enumerate(columnas):
+            ws.set_column(k, k, 16 if c in montos or c == "Fecha" else 24,
+                          formato_monto if c in montos else formato_fecha if c == "Fecha" else None)
+        ws.write_row(0, 0, columnas, negrita)
+        ws.freeze_panes(1, 0)
+        return ws
+
+    try:
+        for bloque in bloques:
+            columnas = list(bloque.columns)
+            for c in totales:
+                totales[c] += int(bloque[c].sum())
+            datos = {c: bloque[c].tolist() for c in columnas}
+            for c in montos:
+                datos[c] = (bloque[c].to_numpy(dtype=np.int64) / 100).tolist()
+            if "Fecha" in bloque:
+                # Número de serie de Excel: días desde el 30/12/1899
+                dias = (pd.to_datetime(bloque["Fecha"]).to_numpy().astype("datetime64[D]")
+                        - np.datetime64("1899-12-30")).astype(np.int64)
+                datos["Fecha"] = dias.tolist()
+            for valores in zip(*(datos[c] for c in columnas)):
+                if fila > MAX_FILAS_XLSX:
+                    hoja_actual, fila = nueva_hoja(), 1
+                hoja_actual.write_row(fila, 0, valores)
+                fila += 1
+            filas += len(bloque)
+        if columnas is not None:
+            if fila > MAX_FILAS_XLSX:
+                hoja_actual, fila = nueva_hoja(), 1
+            hoja_actual.write(fila, 0, "Totales", negrita)
+            for k, c in enumerate(columnas):
+                if c in totales:
+                    hoja_actual.write_number(fila, k, totales[c] / 100, formato_monto)
+        else:
+            libro.add_worksheet(hoja)
+    finally:
+        libro.close()
+    return filas
+
+def exportar_reporte(libro, reporte, formato, destino, desde=None, hasta=None, tam_bloque=50_000):
+    """Exporta Diario, Mayor o Balanza a CSV o XLSX en bloques."""
+    bloques = bloques_reporte(libro, reporte, desde, hasta, tam_bloque)
+    montos = REPORTES_EXPORTABLES[reporte]
+    if formato == "xlsx":
+        return exportar_xlsx(bloques, destino, montos, hoja=reporte.capitalize())
+    return exportar_csv(bloques, destino, montos)
+
+# Estado de Resultados en PDF
+RENGLONES_TOTAL = ("utilidad_bruta", "perdida_operacion")
+COLUMNAS_MENSUAL = ("ventas_netas", "costo_ventas", "utilidad_bruta", "perdida_operacion")
+
+def _mayor_por_mes(libro, desde, hasta):
+    """{mes: mayor} de [desde, hasta]. El primer y el último mes se recortan
+    al periodo cuando éste no empieza o no termina en un límite de mes."""
+    mensual = libro.mayor_mensual(desde, hasta)
+    for mes in list(mensual):
+        inicio, fin = np.datetime64(mes.start_time, 'D'), np.datetime64(mes.end_time, 'D')
+        if (desde is not None and desde > inicio) or (hasta is not None and hasta < fin):
+            mensual[mes] = libro.mayor(inicio if desde is None else max(desde, inicio),
+                                       fin if hasta is None else min(hasta, fin))
+    return mensual
+
+def _con_movimientos(mayor):
+    return {c: (s["debe"], s["haber"]) for c, s in mayor.items() if s["debe"] or s["haber"]}
+
+def exportar_estado_pdf(libro, destino, desde=None, hasta=None, empresa=None):
+    """Estado de Resultados del periodo en PDF tamaño carta: el estado con sus
+    totales y el detalle por mes, paginado con encabezados repetidos y número
+    de página."""
+    try:
+        from fpdf import FPDF
+    except ImportError:
+        raise ImportError("Para exportar a PDF instale fpdf2 (pip install fpdf2)")
+    # Las fechas del CLI llegan como "dd/mm/aaaa": se convierten una sola vez
+    desde = None if desde is None else _a_fecha(desde)
+    hasta = None if hasta is None else _a_fecha(hasta)
+    mayor = libro.mayor(desde, hasta)
+    estado = generar_estado_resultados(mayor)
+    mensual = _mayor_por_mes(libro, desde, hasta)
+    if mensual and _con_movimientos(sumar_mayores(mensual.values())) != _con_movimientos(mayor):
+        raise RuntimeError("El detalle mensual no suma los totales del estado del periodo")
+    texto = {f: pd.Timestamp(f).strftime("%d/%m/%Y") for f in (desde, hasta) if f is not None}
+    if desde is not None and hasta is not None:
+        periodo = f"Del {texto[desde]} al {texto[hasta]}"
+    elif desde is not None:
+        periodo = f"Desde el {texto[desde]}"
+    elif hasta is not None:
+        periodo = f"Hasta el {texto[hasta]}"
+    else:
+        periodo = "Todo el libro"
+
+    class Documento(FPDF):
+        def header(self):
+            self.set_font("helvetica", "B", 14)
+            if empresa:
+                self.cell(0, 8, empresa, align="C", new_x="LMARGIN", new_y="NEXT")
+            self.cell(0, 8, "Estado de Resultados", align="C", new_x="LMARGIN", new_y="NEXT")
+            self.set_font("helvetica", "", 10)
+            self.cell(0, 6, periodo, align="C", new_x="LMARGIN", new_y="NEXT")
+            self.ln(4)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font("helvetica", "I", 8)
+            self.cell(0, 10, f"Generado el {datetime.now():%d/%m/%Y %H:%M} · "
+                             f"Página {self.page_no()} de {{nb}}", align="C")
+
+    pdf = Documento(format="letter")
+    pdf.set_auto_page_break(True, margin=20)
+    pdf.add_page()
+    pdf.set_font("helvetica", "", 11)
+    for clave, etiqueta in ETIQUETAS_ESTADO.items():
+        total = clave in RENGLONES_TOTAL
+        pdf.set_font("helvetica", "B" if total else "", 11)
+        pdf.cell(120, 8, etiqueta, border="T" if total else 0)
+        pdf.cell(0, 8, formato_pesos(estado[clave]), border="T" if total else 0, align="R",
+                 new_x="LMARGIN", new_y="NEXT")
+
+    if mensual:
+        pdf.ln(6)
+        pdf.set_font("helvetica", "B", 12)
+        pdf.cell(0, 8, "Detalle mensual", new_x="LMARGIN", new_y="NEXT")
+        anchos = [27] + [42] * len(COLUMNAS_MENSUAL)
+
+        def encabezado():
+            pdf.set_font("helvetica", "B", 9)
+            pdf.cell(anchos[0], 7, "Mes", border="B")
+            for ancho, clave in zip(anchos[1:], COLUMNAS_MENSUAL):
+                pdf.cell(ancho, 7, ETIQUETAS_ESTADO[clave], border="B", align="R")
+            pdf.ln()
+            pdf.set_font("helvetica", "", 9)
+
+        encabezado()
+        for mes, mayor in mensual.items():
+            if pdf.will_page_break(7):
+                pdf.add_page()
+                encabezado()
+            valores = generar_estado_resultados(mayor)
+            pdf.cell(anchos[0], 7, str(mes))
+            for ancho, clave in zip(anchos[1:], COLUMNAS_MENSUAL):
+                pdf.cell(ancho, 7, formato_pesos(valores[clave]), align="R")
+            pdf.ln()
+        # Los meses suman el mayor del periodo (verificado arriba); los totales
+        # son los del estado, porque el costo de ventas se redondea por periodo
+        pdf.set_font("helvetica", "B", 9)
+        pdf.cell(anchos[0], 7, "Totales", border="T")
+        for ancho, clave in zip(anchos[1:], COLUMNAS_MENSUAL):
+            pdf.cell(ancho, 7, formato_pesos(estado[clave]), border="T", align="R")
+        pdf.ln()
+
+    contenido = pdf.output()
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, "wb") as f:
+            f.write(contenido)
+    else:
+        destino.write(contenido)
@@ -0,0 +1,145 @@
+"""Liquidación mensual del IVA a partir de un índice por periodo.
+
+Al registrar cada asiento, sus líneas de IVA Trasladado e IVA Acreditable se
+suman a una celda (mes, concepto) del índice. El concepto identifica el tipo
+de transacción de la regla que generó el asiento, así que la liquidación de
+cualquier mes y su desglose por tipo salen del índice sin recorrer el diario.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .asientos import REGLAS_CONTABLES, TIPOS_TRANSACCION
+
+CUENTA_TRASLADADO = "IVA Trasladado"
+CUENTA_ACREDITABLE = "IVA Acreditable"
+CUENTAS_IVA = (CUENTA_TRASLADADO, CUENTA_ACREDITABLE)
+
+TIPO_POR_CONCEPTO = {regla["concepto"]: tipo for tipo, regla in REGLAS_CONTABLES.items()}
+
+COLUMNAS_LIQUIDACION = ["Mes", "IVA Trasladado", "IVA Acreditable", "IVA del Mes",
+                        "Saldo a Favor Anterior", "IVA por Pagar", "Saldo a Favor"]
+COLUMNAS_IVA_TIPO = ["Tipo", "IVA Trasladado", "IVA Acreditable", "IVA Neto"]
+
+def _mes(fecha):
+    """Periodo mensual de "dd/mm/aaaa", "aaaa-mm", date o pd.Period."""
+    if isinstance(fecha, pd.Period):
+        return fecha
+    if isinstance(fecha, str) and "/" in fecha:
+        fecha = datetime.strptime(fecha, "%d/%m/%Y")
+    return pd.Period(fecha, "M")
+
+def montos_iva(cuenta, debe, haber):
+    """(trasladado, acreditable) por línea en centavos: lo que cada línea suma
+    al IVA trasladado (abonos menos cargos) o al acreditable (cargos menos
+    abonos); cero en las demás cuentas."""
+    cuenta = np.asarray(cuenta, dtype=object)
+    neto = np.asarray(debe, dtype=np.int64) - np.asarray(haber, dtype=np.int64)
+    return (np.where(cuenta == CUENTA_TRASLADADO, -neto, 0),
+            np.where(cuenta == CUENTA_ACREDITABLE, neto, 0))
+
+class IndiceIVA:
+    """IVA trasladado y acreditable por (mes, concepto), acumulado al
+    registrar. Cada línea de IVA suma en una sola celda del índice."""
+
+    def __init__(self):
+        self._fila = {}            # mes (entero, meses desde 1970) -> fila
+        self._columna = {}         # concepto -> columna
+        self.conceptos = []
+        self.trasladado = np.zeros((16, 0), dtype=np.int64)
+        self.acreditable = np.zeros((16, 0), dtype=np.int64)
+
+    def _reservar(self, meses, num_conceptos):
+        filas, cols = self.trasladado.shape
+        if meses <= filas and num_conceptos <= cols:
+            return
+        nuevas = filas
+        while nuevas < meses:
+            nuevas *= 2
+        for attr in ('trasladado', 'acreditable'):
+            nuevo = np.zeros((nuevas, max(cols, num_conceptos)), dtype=np.int64)
+            nuevo[:filas, :cols] = getattr(self, attr)
+            setattr(self, attr, nuevo)
+
+    def _columna_de(self, concepto):
+        col = self._columna.get(concepto)
+        if col is None:
+            col = self._columna[concepto] = len(self.conceptos)
+            self.conceptos.append(concepto)
+        return col
+
+    def agregar(self, fecha, concepto, cuenta, debe, haber):
+        """Suma las líneas de las cuentas de IVA e ignora las demás. `fecha` y
+        `concepto` son uno por línea o escalares (un solo asiento)."""
+        trasladado, acreditable = montos_iva(cuenta, debe, haber)
+        sel = np.flatnonzero((trasladado != 0) | (acreditable != 0))
+        if not len(sel):
+            return
+        n = len(trasladado)
+        meses = np.broadcast_to(np.asarray(fecha, dtype='datetime64[M]').astype(np.int64), (n,))[sel]
+        conceptos = np.broadcast_to(np.asarray(concepto, dtype=object), (n,))[sel]
+        unicos, inversa = np.unique(meses, return_inverse=True)
+        filas = np.array([self._fila.setdefault(int(m), len(self._fila)) for m in unicos])[inversa]
+        # factorize agrupa por hash: más rápido que ordenar cadenas
+        inversa, unicos = pd.factorize(conceptos)
+        cols = np.array([self._columna_de(c) for c in unicos])[inversa]
+        self._reservar(len(self._fila), len(self.conceptos))
+        np.add.at(self.trasladado, (filas, cols), trasladado[sel])
+        np.add.at(self.acreditable, (filas, cols), acreditable[sel])
+
+    def meses(self):
+        """Meses con movimientos de IVA, en orden."""
+        return sorted(self._fila)
+
+    def iva_mensual(self, desde=None, hasta=None):
+        """{pd.Period mensual: {concepto: (trasladado, acreditable)}} para cada
+        mes de [desde, hasta]; los meses sin IVA quedan vacíos."""
+        if not self._fila:
+            return {}
+        todos = self.meses()
+        desde = _mes(desde) if desde is not None else pd.Period(np.datetime64(todos[0], 'M'), "M")
+        hasta = _mes(hasta) if hasta is not None else pd.Period(np.datetime64(todos[-1], 'M'), "M")
+        resultado = {}
+        for periodo in pd.period_range(desde, hasta, freq="M"):
+            fila = self._fila.get(int(np.datetime64(periodo.start_time, 'M').astype(np.int64)))
+            if fila is None:
+                resultado[periodo] = {}
+                continue
+            t, a = self.trasladado[fila], self.acreditable[fila]
+            resultado[periodo] = {
+                self.conceptos[col]: (int(t[col]), int(a[col]))
+                for col in np.flatnonzero((t != 0) | (a != 0))
+            }
+        return resultado
+
+def liquidacion_iva(libro, desde=None, hasta=None):
+    """Liquidación mensual en centavos (COLUMNAS_LIQUIDACION), un renglón por
+    mes de [desde, hasta]. El IVA del mes es el trasladado menos el
+    acreditable; el saldo a favor de un mes se acredita en los siguientes y se
+    arrastra desde el primer mes del libro aunque `desde` sea posterior."""
+    desde = None if desde is None else _mes(desde)
+    filas, remanente = [], 0
+    for periodo, conceptos in libro.iva_mensual(hasta=None if hasta is None else _mes(hasta)).items():
+        trasladado = sum(t for t, _ in conceptos.values())
+        acreditable = sum(a for _, a in conceptos.values())
+        anterior = remanente
+        saldo = trasladado - acreditable - anterior
+        remanente = max(-saldo, 0)
+        if desde is None or periodo >= desde:
+            filas.append((str(periodo), trasladado, acreditable, trasladado - acreditable,
+                          anterior, max(saldo, 0), remanente))
+    return pd.DataFrame(filas, columns=COLUMNAS_LIQUIDACION)
+
+def iva_por_tipo(libro, mes):
+    """IVA de un mes por tipo de transacción, en centavos (COLUMNAS_IVA_TIPO),
+    en el orden de las reglas contables. Los asientos con un concepto que no
+    es de ninguna regla aparecen con su concepto."""
+    mes, totales = _mes(mes), {}
+    for concepto, (t, a) in libro.iva_mensual(mes, mes).get(mes, {}).items():
+        tipo = TIPO_POR_CONCEPTO.get(concepto, concepto)
+        anterior = totales.get(tipo, (0, 0))
+        totales[tipo] = (anterior[0] + t, anterior[1] + a)
+    orden = [t for t in TIPOS_TRANSACCION if t in totales] + sorted(t for t in totales if t not in REGLAS_CONTABLES)
+    return pd.DataFrame([(tipo, *totales[tipo], totales[tipo][0] - totales[tipo][1]) for tipo in orden],
+                        columns=COLUMNAS_IVA_TIPO)
@@ -0,0 +1,1081 @@
+"""Libro diario en memoria (columnar) y en SQLite, con sus índices."""
+import copy
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .cadena import SEMILLA, CadenaHash, eslabon
+from .dinero import sumar_por
+from .iva import CUENTAS_IVA, IndiceIVA, montos_iva
+
+# Libro diario columnar
+def _a_fecha(fecha):
+    """Convierte "dd/mm/aaaa", date o datetime a datetime64[D]."""
+    if isinstance(fecha, str):
+        fecha = datetime.strptime(fecha, "%d/%m/%Y").date()
+    elif isinstance(fecha, datetime):
+        fecha = fecha.date()
+    return np.datetime64(fecha, 'D')
+
+def _a_mes(fecha):
+    """Periodo mensual de "dd/mm/aaaa", date, datetime o pd.Period."""
+    return fecha if isinstance(fecha, pd.Period) else pd.Period(_a_fecha(fecha), "M")
+
+class IndiceFechas:
+    """Índice de fechas ordenadas con sumas acumuladas de Debe y Haber por
+    cuenta: la fila k tiene los totales de los primeros k días del índice.
+    El mayor de cualquier periodo es la resta de dos filas."""
+
+    def __init__(self):
+        self._dias = 0
+        self._fechas = np.empty(64, dtype='datetime64[D]')
+        self._acum_debe = np.zeros((65, 0), dtype=np.int64)
+        self._acum_haber = np.zeros((65, 0), dtype=np.int64)
+        self.vigente = True
+
+    @property
+    def fechas(self):
+        return self._fechas[:self._dias]
+
+    def reconstruir(self, fecha, cuenta, debe, haber, num_cuentas):
+        """Recalcula el índice completo a partir de las columnas del libro."""
+        fechas, dia = np.unique(fecha, return_inverse=True)
+        forma = (len(fechas) + 1, num_cuentas)
+        plano = (dia + 1) * num_cuentas + cuenta
+        self._fechas = fechas
+        self._dias = len(fechas)
+        self._acum_debe = sumar_por(plano, debe, forma[0] * forma[1]).reshape(forma).cumsum(axis=0)
+        self._acum_haber = sumar_por(plano, haber, forma[0] * forma[1]).reshape(forma).cumsum(axis=0)
+        self.vigente = True
+
+    def _reservar(self, dias, num_cuentas):
+        filas, cols = self._acum_debe.shape
+        if dias + 1 <= filas and num_cuentas <= cols:
+            return
+        nuevas = filas
+        while nuevas < dias + 1:
+            nuevas *= 2
+        fechas = np.empty(nuevas - 1, dtype='datetime64[D]')
+        fechas[:self._dias] = self.fechas
+        self._fechas = fechas
+        for attr in ('_acum_debe', '_acum_haber'):
+            viejo = getattr(self, attr)
+            nuevo = np.zeros((nuevas, max(cols, num_cuentas)), dtype=np.int64)
+            nuevo[:self._dias + 1, :cols] = viejo[:self._dias + 1]
+            setattr(self, attr, nuevo)
+
+    def agregar(self, fecha, ids, debe, haber, num_cuentas):
+        """Suma líneas ordenadas por fecha. Si empiezan antes del último día
+        del índice, el índice queda para reconstruir en la siguiente consulta."""
+        if not self.vigente:
+            return
+        fecha = np.asarray(fecha, dtype='datetime64[D]')
+        if fecha.ndim == 0:
+            fecha = np.full(len(ids), fecha)
+        if len(fecha) == 0:
+            return
+        if (self._dias and fecha[0] < self._fechas[self._dias - 1]) or np.any(fecha[1:] < fecha[:-1]):
+            self.vigente = False
+            return
+        dias, dia = np.unique(fecha, return_inverse=True)
+        mismo_dia = bool(self._dias) and dias[0] == self._fechas[self._dias - 1]
+        self._reservar(self._dias + len(dias), num_cuentas)
+        plano = dia * num_cuentas + np.asarray(ids)
+        # La fila self._dias tiene el acumulado del último día; el lote parte de ahí
+        inicio = self._dias if mismo_dia else self._dias + 1
+        for attr, montos in (('_acum_debe', debe), ('_acum_haber', haber)):
+            acum = getattr(self, attr)
+            delta = sumar_por(plano, montos, len(dias) * num_cuentas) \
+                .reshape(len(dias), num_cuentas).cumsum(axis=0)
+            acum[inicio:inicio + len(dias), :num_cuentas] = acum[self._dias, :num_cuentas] + delta
+        nuevos = dias[1:] if mismo_dia else dias
+        self._fechas[self._dias:self._dias + len(nuevos)] = nuevos
+        self._dias += len(nuevos)
+
+    def saldos_acumulados(self, ids):
+        """Saldo (debe - haber) al cierre de cada día del índice para las
+        cuentas `ids`; una columna por cuenta (ceros si la cuenta no existe)."""
+        saldos = np.zeros((self._dias, len(ids)), dtype=np.int64)
+        for k, cid in enumerate(ids):
+            if cid is not None and cid < self._acum_debe.shape[1]:
+                saldos[:, k] = self._acum_debe[1:self._dias + 1, cid] - self._acum_haber[1:self._dias + 1, cid]
+        return saldos
+
+    def periodo(self, desde=None, hasta=None):
+        """Totales (debe, haber) por cuenta entre dos fechas, inclusive."""
+        i = 0 if desde is None else np.searchsorted(self.fechas, desde, side='left')
+        j = self._dias if hasta is None else np.searchsorted(self.fechas, hasta, side='right')
+        return self._acum_debe[j] - self._acum_debe[i], self._acum_haber[j] - self._acum_haber[i]
+
+class CuboMensual:
+    """Totales de Debe y Haber por (mes, cuenta), acumulados al registrar.
+    Cada línea nueva suma en una sola celda del cubo."""
+
+    def __init__(self):
+        self._fila = {}            # mes (entero, meses desde 1970) -> fila
+        self.debe = np.zeros((16, 0), dtype=np.int64)
+        self.haber = np.zeros((16, 0), dtype=np.int64)
+
+    def _reservar(self, meses, num_cuentas):
+        filas, cols = self.debe.shape
+        if meses <= filas and num_cuentas <= cols:
+            return
+        nuevas = filas
+        while nuevas < meses:
+            nuevas *= 2
+        for attr in ('debe', 'haber'):
+            nuevo = np.zeros((nuevas, max(cols, num_cuentas)), dtype=np.int64)
+            nuevo[:filas, :cols] = getattr(self, attr)
+            setattr(self, attr, nuevo)
+
+    def agregar(self, fecha, ids, debe, haber, num_cuentas):
+        meses = np.asarray(fecha, dtype='datetime64[M]').astype(np.int64)
+        if meses.ndim == 0:
+            meses = np.full(len(ids), meses)
+        unicos, inversa = np.unique(meses, return_inverse=True)
+        filas = np.array([self._fila.setdefault(int(m), len(self._fila)) for m in unicos])[inversa]
+        self._reservar(len(self._fila), num_cuentas)
+        np.add.at(self.debe, (filas, ids), debe)
+        np.add.at(self.haber, (filas, ids), haber)
+
+    def meses(self):
+        """Meses con movimientos, en orden."""
+        return sorted(self._fila)
+
+    def saldos_acumulados(self, ids):
+        """(meses, saldos): saldo (debe - haber) al cierre de cada mes con
+        movimientos para las cuentas `ids`, una columna por cuenta."""
+        meses = self.meses()
+        filas = [self._fila[m] for m in meses]
+        saldos = np.zeros((len(meses), len(ids)), dtype=np.int64)
+        for k, cid in enumerate(ids):
+            if cid is not None and cid < self.debe.shape[1]:
+                saldos[:, k] = np.cumsum(self.debe[filas, cid] - self.haber[filas, cid])
+        return np.array(meses, dtype='datetime64[M]'), saldos
+
+    def mayor_mensual(self, nombres, desde=None, hasta=None):
+        """{pd.Period mensual: mayor} para cada mes de [desde, hasta]; los meses
+        sin movimientos quedan con el mayor vacío."""
+        if not self._fila:
+            return {}
+        todos = self.meses()
+        desde = _a_mes(desde) if desde is not None else pd.Period(np.datetime64(todos[0], 'M'), "M")
+        hasta = _a_mes(hasta) if hasta is not None else pd.Period(np.datetime64(todos[-1], 'M'), "M")
+        resultado = {}
+        for periodo in pd.period_range(desde, hasta, freq="M"):
+            fila = self._fila.get(int(np.datetime64(periodo.start_time, 'M').astype(np.int64)))
+            if fila is None:
+                resultado[periodo] = {}
+                continue
+            d, h = self.debe[fila], self.haber[fila]
+            resultado[periodo] = {
+                nombres[cid]: {"debe": int(d[cid]), "haber": int(h[cid])}
+                for cid in np.flatnonzero((d[:len(nombres)] != 0) | (h[:len(nombres)] != 0))
+            }
+        return resultado
+
+class LibroDiario:
+    """Libro diario en columnas tipadas: una fila por línea de asiento con
+    (asiento, fecha, cuenta, debe, haber), con los montos en centavos. Las
+    cuentas se guardan como id entero y los conceptos una sola vez por asiento."""
+
+    CAPACIDAD_INICIAL = 1024
+    BASE_ASIENTO = 1    # los asientos se guardan desde 0 y se muestran desde 1, como en SQLite
+
+    def __init__(self):
+        self._n = 0
+        self.version = 0           # aumenta con cada asiento o lote registrado
+        self._asiento = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int64)
+        self._fecha   = np.empty(self.CAPACIDAD_INICIAL, dtype='datetime64[D]')
+        self._cuenta  = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int32)
+        self._debe    = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int64)
+        self._haber   = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int64)
+        self.nombres_cuenta = []   # id -> nombre
+        self._id_cuenta = {}       # nombre -> id
+        self.conceptos = []        # uno por asiento
+        self.fechas_asiento = []   # uno por asiento
+        # Libro mayor incremental: totales por id de cuenta
+        self.total_debe  = []
+        self.total_haber = []
+        self.indice_fechas = IndiceFechas()
+        self.cubo = CuboMensual()
+        self.indice_iva = IndiceIVA()
+        self.cadena = CadenaHash()
+        self.verificacion = {"eslabones": 0}    # eslabones ya verificados, compartido con instantáneas
+        self.solo_lectura = False
+
+    # --- catálogo de cuentas ---
+    def id_cuenta(self, nombre):
+        """Devuelve el id entero de la cuenta, registrándola si es nueva."""
+        cid = self._id_cuenta.get(nombre)
+        if cid is None:
+            cid = len(self.nombres_cuenta)
+            self._id_cuenta[nombre] = cid
+            self.nombres_cuenta.append(nombre)
+            self.total_debe.append(0)
+            self.total_haber.append(0)
+        return cid
+
+    def buscar_cuenta(self, nombre):
+        """Id de la cuenta o None si nunca se ha usado."""
+        return self._id_cuenta.get(nombre)
+
+    def ids_cuentas(self):
+        """{nombre: id} de las cuentas usadas."""
+        return dict(self._id_cuenta)
+
+    def _lineas_iva(self, ids):
+        """Posiciones de las líneas de `ids` en cuentas de IVA."""
+        return np.flatnonzero(np.isin(ids, [self._id_cuenta[c] for c in CUENTAS_IVA if c in self._id_cuenta]))
+
+    # --- escritura ---
+    def _reservar(self, extra):
+        necesario = self._n + extra
+        capacidad = len(self._asiento)
+        if necesario <= capacidad:
+            return
+        while capacidad < necesario:
+            capacidad *= 2
+        for attr in ('_asiento', '_fecha', '_cuenta', '_debe', '_haber'):
+            viejo = getattr(self, attr)
+            nuevo = np.empty(capacidad, dtype=viejo.dtype)
+            nuevo[:self._n] = viejo[:self._n]
+            setattr(self, attr, nuevo)
+
+    def _verificar_escritura(self):
+        if self.solo_lectura:
+            raise RuntimeError("La instantánea del libro es de sólo lectura")
+
+    def append(self, asiento):
+        """Agrega un asiento generado por generar_asiento_contable."""
+        self._verificar_escritura()
+        cuentas = asiento['Cuentas']
+        k = len(cuentas)
+        self._reservar(k)
+        i, j = self._n, self._n + k
+        num = len(self.conceptos)
+        fecha = _a_fecha(asiento['Fecha'])
+        ids = [self.id_cuenta(c) for c in cuentas]
+        self._asiento[i:j] = num
+        self._fecha[i:j]   = fecha
+        self._cuenta[i:j]  = ids
+        self._debe[i:j]    = asiento['Debe']
+        self._haber[i:j]   = asiento['Haber']
+        self._n = j
+        # Actualizar el mayor al momento de registrar
+        for cid, d, h in zip(ids, asiento['Debe'], asiento['Haber']):
+            self.total_debe[cid]  += d
+            self.total_haber[cid] += h
+        self.indice_fechas.agregar(fecha, ids, asiento['Debe'], asiento['Haber'],
+                                   len(self.nombres_cuenta))
+        self.cubo.agregar(fecha, ids, asiento['Debe'], asiento['Haber'], len(self.nombres_cuenta))
+        self.indice_iva.agregar(fecha, asiento['Concepto'], cuentas, asiento['Debe'], asiento['Haber'])
+        self.cadena.agregar(j, self.columnas(i, j))
+        self.conceptos.append(asiento['Concepto'])
+        self.fechas_asiento.append(fecha)
+        self.version += 1
+        return num
+
+    def append_lote(self, lote):
+        """Agrega muchos asientos a la vez. `lote` tiene arreglos por asiento
+        ('Fecha', 'Concepto') y por línea ('Asiento' relativo al lote, 'Cuentas',
+        'Debe', 'Haber'), con las líneas ordenadas por asiento."""
+        self._verificar_escritura()
+        k = len(lote['Cuentas'])
+        base = len(self.conceptos)
+        nombres, inversa = np.unique(np.asarray(lote['Cuentas'], dtype=object), return_inverse=True)
+        ids = np.array([self.id_cuenta(c) for c in nombres], dtype=np.int32)[inversa]
+        self._reservar(k)
+        i, j = self._n, self._n + k
+        fechas = np.asarray(lote['Fecha'], dtype='datetime64[D]')
+        rel = np.asarray(lote['Asiento'], dtype=np.int64)
+        self._asiento[i:j] = base + rel
+        self._fecha[i:j]   = fechas[rel]
+        self._cuenta[i:j]  = ids
+        self._debe[i:j]    = lote['Debe']
+        self._haber[i:j]   = lote['Haber']
+        self._n = j
+        self.conceptos.extend(lote['Concepto'])
+        self.fechas_asiento.extend(fechas)
+        # Mayor incremental: una suma por cuenta tocada en el lote
+        n = len(self.nombres_cuenta)
+        debe  = sumar_por(ids, self._debe[i:j],  n)
+        haber = sumar_por(ids, self._haber[i:j], n)
+        for cid in np.unique(ids):
+            self.total_debe[cid]  += int(debe[cid])
+            self.total_haber[cid] += int(haber[cid])
+        # Un lote en orden cronológico a partir del último día se acumula
+        # directo; si no, el índice se reconstruye al consultarlo
+        self.indice_fechas.agregar(self._fecha[i:j], ids, self._debe[i:j], self._haber[i:j], n)
+        self.cubo.agregar(self._fecha[i:j], ids, self._debe[i:j], self._haber[i:j], n)
+        iva = self._lineas_iva(ids)
+        self.indice_iva.agregar(fechas[rel[iva]], np.asarray(lote['Concepto'], dtype=object)[rel[iva]],
+                                np.asarray(lote['Cuentas'], dtype=object)[iva],
+                                self._debe[i:j][iva], self._haber[i:j][iva])
+        self.cadena.agregar(j, self.columnas(i, j))
+        self.version += 1
+        return len(fechas)
+
+    def instantanea(self):
+        """Copia de sólo lectura del estado actual. Comparte las columnas, porque
+        las filas ya escritas no cambian y al crecer la capacidad se crean
+        arreglos nuevos. Copia las listas por asiento y por cuenta y los índices,
+        que sí se modifican en sitio."""
+        copia = copy.copy(self)
+        copia.nombres_cuenta = list(self.nombres_cuenta)
+        copia._id_cuenta = dict(self._id_cuenta)
+        copia.conceptos = list(self.conceptos)
+        copia.fechas_asiento = list(self.fechas_asiento)
+        copia.total_debe = list(self.total_debe)
+        copia.total_haber = list(self.total_haber)
+        copia.indice_fechas = copy.deepcopy(self.indice_fechas)
+        copia.cubo = copy.deepcopy(self.cubo)
+        copia.indice_iva = copy.deepcopy(self.indice_iva)
+        copia.solo_lectura = True
+        return copia
+
+    def terminar_lectura(self):
+        """Las instantáneas en memoria no retienen nada al terminar el run."""
+
+    # --- lectura ---
+    def __len__(self):
+        """Número de asientos registrados."""
+        return len(self.conceptos)
+
+    @property
+    def num_lineas(self):
+        return self._n
+
+    @property
+    def asiento(self):
+        return self._asiento[:self._n]
+
+    @property
+    def fecha(self):
+        return self._fecha[:self._n]
+
+    @property
+    def cuenta(self):
+        return self._cuenta[:self._n]
+
+    @property
+    def debe(self):
+        return self._debe[:self._n]
+
+    @property
+    def haber(self):
+        return self._haber[:self._n]
+
+    def columnas(self, i=0, j=None):
+        """Columnas asiento, fecha, cuenta, debe y haber de las líneas [i, j)."""
+        j = self._n if j is None else j
+        return {"asiento": self._asiento[i:j], "fecha": self._fecha[i:j], "cuenta": self._cuenta[i:j],
+                "debe": self._debe[i:j], "haber": self._haber[i:j]}
+
+    def eslabones(self, desde=0):
+        """[(líneas, hash)] de la cadena de escrituras a partir del eslabón `desde`."""
+        return self.cadena.eslabones(desde, self._n)
+
+    def columna_cuentas(self):
+        """Columna de cuentas como Categorical (sin repetir los nombres)."""
+        return pd.Categorical.from_codes(self.cuenta, categories=self.nombres_cuenta)
+
+    def diario_df(self):
+        """DataFrame [Fecha, Cuenta, Debe, Haber] con una fila por línea."""
+        return pd.DataFrame({
+            "Fecha":  self.fecha,
+            "Cuenta": self.columna_cuentas(),
+            "Debe":   self.debe,
+            "Haber":  self.haber
+        })
+
+    def totales(self):
+        """(total debe, total haber) de todo el libro, en centavos."""
+        return int(self.debe.sum()), int(self.haber.sum())
+
+    def cuentas(self):
+        return list(self.nombres_cuenta)
+
+    def consultar_diario(self, desde=None, hasta=None, cuenta=None, concepto=None,
+                         pagina=0, tam_pagina=50):
+        """Filtra las líneas del diario y devuelve sólo la página pedida junto con
+        el número de líneas y los totales de todo el filtro:
+        (df_pagina, num_lineas, total_debe, total_haber)."""
+        mascara = np.ones(self._n, dtype=bool)
+        if desde is not None:
+            mascara &= self.fecha >= _a_fecha(desde)
+        if hasta is not None:
+            mascara &= self.fecha <= _a_fecha(hasta)
+        if cuenta is not None:
+            cid = self.buscar_cuenta(cuenta)
+            if cid is None:
+                mascara[:] = False
+            else:
+                mascara &= self.cuenta == cid
+        if concepto:
+            por_asiento = pd.Series(self.conceptos, dtype=object).str.contains(
+                concepto, case=False, regex=False).to_numpy(dtype=bool)
+            mascara &= por_asiento[self.asiento]
+
+        idx = np.flatnonzero(mascara)
+        total_debe = int(self.debe[idx].sum())
+        total_haber = int(self.haber[idx].sum())
+        idx = idx[pagina * tam_pagina:(pagina + 1) * tam_pagina]
+        asientos = self.asiento[idx]
+        df = pd.DataFrame({
+            "Asiento":  asientos + self.BASE_ASIENTO,
+            "Fecha":    self.fecha[idx],
+            "Cuenta":   [self.nombres_cuenta[c] for c in self.cuenta[idx]],
+            "Debe":     self.debe[idx],
+            "Haber":    self.haber[idx],
+            "Concepto": [self.conceptos[a] for a in asientos],
+        })
+        return df, int(mascara.sum()), total_debe, total_haber
+
+    def bloques_diario(self, desde=None, hasta=None, tam_bloque=50_000):
+        """Recorre el diario (o un periodo) en DataFrames de hasta `tam_bloque`
+        líneas con las columnas de consultar_diario; sólo un bloque a la vez
+        vive en memoria."""
+        n = self._n
+        desde = None if desde is None else _a_fecha(desde)
+        hasta = None if hasta is None else _a_fecha(hasta)
+        nombres = np.array(self.nombres_cuenta, dtype=object)
+        for i in range(0, n, tam_bloque):
+            j = min(i + tam_bloque, n)
+            fechas = self._fecha[i:j]
+            mascara = np.ones(j - i, dtype=bool)
+            if desde is not None:
+                mascara &= fechas >= desde
+            if hasta is not None:
+                mascara &= fechas <= hasta
+            if not mascara.any():
+                continue
+            asientos = self._asiento[i:j][mascara]
+            yield pd.DataFrame({
+                "Asiento":  asientos + self.BASE_ASIENTO,
+                "Fecha":    fechas[mascara],
+                "Cuenta":   nombres[self._cuenta[i:j][mascara]],
+                "Debe":     self._debe[i:j][mascara],
+                "Haber":    self._haber[i:j][mascara],
+                "Concepto": [self.conceptos[a] for a in asientos],
+            })
+
+    def bloques_mayor(self, desde=None, hasta=None, tam_bloque=50_000):
+        """Líneas del periodo con las columnas de consultar_diario, ordenadas por
+        cuenta y dentro de cada cuenta por fecha y orden de registro. Ordena
+        sólo las posiciones de las líneas; las filas se arman por bloque."""
+        mascara = np.ones(self._n, dtype=bool)
+        if desde is not None:
+            mascara &= self.fecha >= _a_fecha(desde)
+        if hasta is not None:
+            mascara &= self.fecha <= _a_fecha(hasta)
+        idx = np.flatnonzero(mascara)
+        idx = idx[np.lexsort((self.fecha[idx], self.cuenta[idx]))]
+        nombres = np.array(self.nombres_cuenta, dtype=object)
+        for i in range(0, len(idx), tam_bloque):
+            bloque = idx[i:i + tam_bloque]
+            asientos = self.asiento[bloque]
+            yield pd.DataFrame({
+                "Asiento":  asientos + self.BASE_ASIENTO,
+                "Fecha":    self.fecha[bloque],
+                "Cuenta":   nombres[self.cuenta[bloque]],
+                "Debe":     self.debe[bloque],
+                "Haber":    self.haber[bloque],
+                "Concepto": [self.conceptos[a] for a in asientos],
+            })
+
+    def saldo(self, cuenta):
+        """Saldo actual (debe - haber) en centavos, leído de los totales que
+        se mantienen al registrar; no recorre el diario."""
+        cid = self.buscar_cuenta(cuenta)
+        if cid is None:
+            return 0
+        return self.total_debe[cid] - self.total_haber[cid]
+
+    def _indice_vigente(self):
+        if not self.indice_fechas.vigente:
+            self.indice_fechas.reconstruir(self.fecha, self.cuenta, self.debe, self.haber,
+                                           len(self.nombres_cuenta))
+        return self.indice_fechas
+
+    def serie_saldos(self, cuentas, frecuencia="D"):
+        """DataFrame con el saldo (debe - haber, centavos) de cada cuenta al
+        cierre de cada día ("D") o mes ("M") con movimientos. Se lee de los
+        acumulados del índice de fechas o del cubo mensual."""
+        ids = [self.buscar_cuenta(c) for c in cuentas]
+        if frecuencia == "M":
+            meses, saldos = self.cubo.saldos_acumulados(ids)
+            indice = pd.DatetimeIndex(meses.astype('datetime64[D]'), name="Fecha")
+        else:
+            fechas = self._indice_vigente()
+            saldos = fechas.saldos_acumulados(ids)
+            indice = pd.DatetimeIndex(fechas.fechas, name="Fecha")
+        return pd.DataFrame(saldos, index=indice, columns=list(cuentas))
+
+    def mayor(self, desde=None, hasta=None):
+        """Dict {cuenta: {"debe", "haber"}} en centavos. Sin fechas usa los totales
+        incrementales; con un periodo, dos lecturas del índice de fechas."""
+        if desde is None and hasta is None:
+            return {
+                cuenta: {"debe": d, "haber": h}
+                for cuenta, d, h in zip(self.nombres_cuenta, self.total_debe, self.total_haber)
+            }
+        debe, haber = self._indice_vigente().periodo(
+            None if desde is None else _a_fecha(desde),
+            None if hasta is None else _a_fecha(hasta)
+        )
+        return {
+            self.nombres_cuenta[cid]: {"debe": int(debe[cid]), "haber": int(haber[cid])}
+            for cid in np.flatnonzero((debe != 0) | (haber != 0))
+        }
+
+    def mayor_registrado(self):
+        """Totales por cuenta mantenidos al registrar (los que auditar compara
+        contra las líneas)."""
+        return self.mayor()
+
+    def mayor_mensual(self, desde=None, hasta=None):
+        """{mes: mayor} leído del cubo mensual, sin recorrer líneas."""
+        return self.cubo.mayor_mensual(self.nombres_cuenta, desde, hasta)
+
+    def iva_mensual(self, desde=None, hasta=None):
+        """{mes: {concepto: (trasladado, acreditable)}} leído del índice de IVA."""
+        return self.indice_iva.iva_mensual(desde, hasta)
+
+    def recalcular_mayor(self):
+        """Recalcula los totales por cuenta recorriendo todas las líneas."""
+        n = len(self.nombres_cuenta)
+        return sumar_por(self.cuenta, self.debe, n), sumar_por(self.cuenta, self.haber, n)
+
+    def verificar_mayor(self):
+        """Compara el mayor incremental contra un recálculo completo y devuelve
+        la lista de cuentas con diferencias (vacía si es consistente)."""
+        debe, haber = self.recalcular_mayor()
+        dif = (debe != np.asarray(self.total_debe, dtype=np.int64)) | \
+              (haber != np.asarray(self.total_haber, dtype=np.int64))
+        return [self.nombres_cuenta[i] for i in np.flatnonzero(dif)]
+
+    def resumen_asientos(self):
+        """Un renglón por asiento con sus totales de Debe y Haber."""
+        n = len(self)
+        return pd.DataFrame({
+            'Asiento':  np.arange(n) + self.BASE_ASIENTO,
+            'Fecha':    np.array(self.fechas_asiento, dtype='datetime64[D]'),
+            'Concepto': self.conceptos,
+            'Debe':     sumar_por(self.asiento, self.debe, n),
+            'Haber':    sumar_por(self.asiento, self.haber, n),
+        })
+
+# Libro diario persistente en SQLite
+class LibroSQLite:
+    """Libro diario guardado en un archivo SQLite (modo WAL). Expone la misma
+    interfaz de lectura que LibroDiario, pero las agregaciones se resuelven
+    con GROUP BY en la base y sólo se traen a pandas las filas de resultado."""
+
+    BASE_ASIENTO = 0    # los ids de la tabla asientos ya empiezan en 1
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS cuentas (
+            id     INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS asientos (
+            id       INTEGER PRIMARY KEY,
+            fecha    TEXT NOT NULL,
+            concepto TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS lineas (
+            asiento INTEGER NOT NULL REFERENCES asientos(id),
+            fecha   TEXT    NOT NULL,
+            cuenta  INTEGER NOT NULL REFERENCES cuentas(id),
+            debe    INTEGER NOT NULL,   -- centavos
+            haber   INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_lineas_fecha  ON lineas(fecha);
+        CREATE INDEX IF NOT EXISTS idx_lineas_cuenta ON lineas(cuenta, fecha);
+        CREATE TABLE IF NOT EXISTS rollup_mensual (
+            mes    TEXT    NOT NULL,
+            cuenta INTEGER NOT NULL REFERENCES cuentas(id),
+            debe   INTEGER NOT NULL,
+            haber  INTEGER NOT NULL,
+            PRIMARY KEY (mes, cuenta)
+        );
+        CREATE TABLE IF NOT EXISTS saldos (
+            cuenta INTEGER PRIMARY KEY REFERENCES cuentas(id),
+            debe   INTEGER NOT NULL,
+            haber  INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS iva_mensual (
+            mes         TEXT    NOT NULL,
+            concepto    TEXT    NOT NULL,
+            trasladado  INTEGER NOT NULL,   -- centavos
+            acreditable INTEGER NOT NULL,
+            PRIMARY KEY (mes, concepto)
+        );
+        CREATE TABLE IF NOT EXISTS cadena (
+            lineas INTEGER PRIMARY KEY,     -- líneas del libro al cerrar el eslabón
+            hash   BLOB    NOT NULL
+        );
+    """
+
+    def __init__(self, ruta, solo_lectura=False):
+        self.ruta = ruta
+        self._lectores = threading.local()
+        self.verificacion = {"eslabones": 0}
+        if solo_lectura:
+            # Sin esquema ni migraciones: sólo lee lo que otro proceso escribió
+            self.con = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True, check_same_thread=False)
+            self._id_cuenta = dict(
+                (nombre, cid) for cid, nombre in self.con.execute("SELECT id, nombre FROM cuentas")
+            )
+            return
+        # Streamlit puede ejecutar cada rerun en un hilo distinto
+        self.con = sqlite3.connect(ruta, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        existia = self.con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lineas'").fetchone()
+        if existia and self.con.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._migrar_a_centavos()
+        self.con.executescript(self.ESQUEMA)
+        self.con.execute("PRAGMA user_version = 1")
+        with self.con:
+            # Bases creadas antes del cubo mensual: llenarlo una sola vez
+            if self.con.execute("SELECT NOT EXISTS (SELECT 1 FROM rollup_mensual) "
+                                "AND EXISTS (SELECT 1 FROM lineas)").fetchone()[0]:
+                self.con.execute(
+                    """INSERT INTO rollup_mensual (mes, cuenta, debe, haber)
+                       SELECT substr(fecha, 1, 7), cuenta, SUM(debe), SUM(haber)
+                       FROM lineas GROUP BY 1, 2"""
+                )
+            if self.con.execute("SELECT NOT EXISTS (SELECT 1 FROM saldos) "
+                                "AND EXISTS (SELECT 1 FROM lineas)").fetchone()[0]:
+                self.con.execute(
+                    """INSERT INTO saldos (cuenta, debe, haber)
+                       SELECT cuenta, SUM(debe), SUM(haber) FROM lineas GROUP BY cuenta"""
+                )
+            # Bases creadas antes del índice de IVA: llenarlo una sola vez
+            if self.con.execute("SELECT NOT EXISTS (SELECT 1 FROM iva_mensual) "
+                                "AND EXISTS (SELECT 1 FROM lineas)").fetchone()[0]:
+                self.con.execute(
+                    """INSERT INTO iva_mensual (mes, concepto, trasladado, acreditable)
+                       SELECT substr(l.fecha, 1, 7), a.concepto,
+                              SUM(CASE WHEN c.nombre = ? THEN l.haber - l.debe ELSE 0 END),
+                              SUM(CASE WHEN c.nombre = ? THEN l.debe - l.haber ELSE 0 END)
+                       FROM lineas l JOIN cuentas c ON c.id = l.cuenta
+                                     JOIN asientos a ON a.id = l.asiento
+                       WHERE c.nombre IN (?, ?) GROUP BY 1, 2""",
+                    CUENTAS_IVA + CUENTAS_IVA
+                )
+            # Bases creadas antes de la cadena de hashes: un eslabón sella lo existente
+            if self.con.execute("SELECT NOT EXISTS (SELECT 1 FROM cadena) "
+                                "AND EXISTS (SELECT 1 FROM lineas)").fetchone()[0]:
+                self._encadenar(self.columnas())
+        self._id_cuenta = dict(
+            (nombre, cid) for cid, nombre in self.con.execute("SELECT id, nombre FROM cuentas")
+        )
+
+    def _migrar_a_centavos(self):
+        """Bases anteriores guardaban pesos en columnas REAL: se copian las
+        líneas a centavos enteros y el cubo mensual se vuelve a llenar."""
+        self.con.executescript("""
+            BEGIN;
+            DROP INDEX IF EXISTS idx_lineas_fecha;
+            DROP INDEX IF EXISTS idx_lineas_cuenta;
+            DROP TABLE IF EXISTS rollup_mensual;
+            DROP TABLE IF EXISTS saldos;
+            ALTER TABLE lineas RENAME TO lineas_pesos;
+        """ + self.ESQUEMA + """
+            INSERT INTO lineas (asiento, fecha, cuenta, debe, haber)
+            SELECT asiento, fecha, cuenta,
+                   CAST(ROUND(debe * 100) AS INTEGER), CAST(ROUND(haber * 100) AS INTEGER)
+            FROM lineas_pesos ORDER BY rowid;
+            DROP TABLE lineas_pesos;
+            COMMIT;
+        """)
+
+    @property
+    def version(self):
+        # El libro sólo crece: la última línea identifica el contenido, también
+        # para otras conexiones y procesos que escriben en el mismo archivo
+        return self.con.execute("SELECT COALESCE(MAX(rowid), 0) FROM lineas").fetchone()[0]
+
+    def version_confirmada(self):
+        """Versión confirmada en el archivo, leída con una conexión de sólo
+        lectura propia del hilo y fuera de toda transacción: en modo WAL no
+        espera a la escritura en curso ni usa la conexión del escritor."""
+        con = getattr(self._lectores, "version", None)
+        if con is None:
+            con = self._lectores.version = sqlite3.connect(f"file:{self.ruta}?mode=ro", uri=True,
+                                                           check_same_thread=False)
+        return con.execute("SELECT COALESCE(MAX(rowid), 0) FROM lineas").fetchone()[0]
+
+    def instantanea(self):
+        """Lector de sólo lectura con conexión propia por hilo. Abre una
+        transacción de lectura: en modo WAL todas sus consultas ven el mismo
+        estado confirmado hasta la siguiente instantánea, sin bloquear al escritor."""
+        lector = getattr(self._lectores, "libro", None)
+        if lector is None:
+            lector = copy.copy(self)
+            lector.con = sqlite3.connect(f"file:{self.ruta}?mode=ro", uri=True, check_same_thread=False)
+            self._lectores.libro = lector
+        if lector.con.in_transaction:
+            lector.con.rollback()
+        lector.con.execute("BEGIN")
+        lector._id_cuenta = dict(
+            (nombre, cid) for cid, nombre in lector.con.execute("SELECT id, nombre FROM cuentas")
+        )
+        return lector
+
+    def terminar_lectura(self):
+        """Termina la transacción de lectura de la instantánea. Un lector
+        abierto fija su marca en el WAL y los checkpoints no pueden reciclarlo,
+        así que se llama al terminar cada run o tarea en segundo plano."""
+        if self.con.in_transaction:
+            self.con.rollback()
+
+    def id_cuenta(self, nombre):
+        cid = self._id_cuenta.get(nombre)
+        if cid is None:
+            cid = self.con.execute("INSERT INTO cuentas (nombre) VALUES (?)", (nombre,)).lastrowid
+            self._id_cuenta[nombre] = cid
+        return cid
+
+    def _acumular_rollup(self, meses, ids, debe, haber):
+        """Suma las líneas al cubo mensual y a los saldos por cuenta dentro de
+        la transacción en curso."""
+        df = pd.DataFrame({"mes": meses, "cuenta": ids, "debe": debe, "haber": haber}) \
+            .groupby(["mes", "cuenta"], as_index=False).sum()
+        self.con.executemany(
+            """INSERT INTO rollup_mensual (mes, cuenta, debe, haber) VALUES (?, ?, ?, ?)
+               ON CONFLICT (mes, cuenta) DO UPDATE
+               SET debe = debe + excluded.debe, haber = haber + excluded.haber""",
+            df.itertuples(index=False, name=None)
+        )
+        self.con.executemany(
+            """INSERT INTO saldos (cuenta, debe, haber) VALUES (?, ?, ?)
+               ON CONFLICT (cuenta) DO UPDATE
+               SET debe = debe + excluded.debe, haber = haber + excluded.haber""",
+            df.groupby("cuenta", as_index=False)[["debe", "haber"]].sum()
+              .itertuples(index=False, name=None)
+        )
+
+    def _acumular_iva(self, meses, conceptos, cuentas, debe, haber):
+        """Suma las líneas de IVA al índice por (mes, concepto) dentro de la
+        transacción en curso."""
+        trasladado, acreditable = montos_iva(cuentas, debe, haber)
+        df = pd.DataFrame({"mes": meses, "concepto": conceptos,
+                           "trasladado": trasladado, "acreditable": acreditable})
+        df = df[(df["trasladado"] != 0) | (df["acreditable"] != 0)]
+        self.con.executemany(
+            """INSERT INTO iva_mensual (mes, concepto, trasladado, acreditable) VALUES (?, ?, ?, ?)
+               ON CONFLICT (mes, concepto) DO UPDATE
+               SET trasladado = trasladado + excluded.trasladado,
+                   acreditable = acreditable + excluded.acreditable""",
+            df.groupby(["mes", "concepto"], as_index=False).sum().itertuples(index=False, name=None)
+        )
+
+    def _encadenar(self, columnas):
+        """Cierra el eslabón de las líneas recién insertadas, dentro de la
+        transacción en curso."""
+        anterior = self.con.execute("SELECT hash FROM cadena ORDER BY lineas DESC LIMIT 1").fetchone()
+        lineas = self.version
+        self.con.execute("INSERT INTO cadena (lineas, hash) VALUES (?, ?)",
+                         (lineas, eslabon(anterior[0] if anterior else SEMILLA, lineas, columnas)))
+
+    def append(self, asiento):
+        fecha = str(_a_fecha(asiento['Fecha']))
+        with self.con:
+            num = self.con.execute(
+                "INSERT INTO asientos (fecha, concepto) VALUES (?, ?)",
+                (fecha, asiento['Concepto'])
+            ).lastrowid
+            ids = [self.id_cuenta(c) for c in asiento['Cuentas']]
+            self.con.executemany(
+                "INSERT INTO lineas (asiento, fecha, cuenta, debe, haber) VALUES (?, ?, ?, ?, ?)",
+                [(num, fecha, cid, d, h)
+                 for cid, d, h in zip(ids, asiento['Debe'], asiento['Haber'])]
+            )
+            self._acumular_rollup([fecha[:7]] * len(ids), ids, asiento['Debe'], asiento['Haber'])
+            self._acumular_iva([fecha[:7]] * len(ids), [asiento['Concepto']] * len(ids),
+                               asiento['Cuentas'], asiento['Debe'], asiento['Haber'])
+            self._encadenar({"asiento": [num] * len(ids), "fecha": np.full(len(ids), fecha, dtype='datetime64[D]'),
+                             "cuenta": ids, "debe": asiento['Debe'], "haber": asiento['Haber']})
+        return num
+
+    def append_lote(self, lote):
+        fechas = [str(f) for f in np.asarray(lote['Fecha'], dtype='datetime64[D]')]
+        rel = np.asarray(lote['Asiento'], dtype=np.int64)
+        with self.con:
+            base = self.con.execute("SELECT COALESCE(MAX(id), 0) FROM asientos").fetchone()[0] + 1
+            self.con.executemany(
+                "INSERT INTO asientos (id, fecha, concepto) VALUES (?, ?, ?)",
+                zip(range(base, base + len(fechas)), fechas, lote['Concepto'])
+            )
+            ids = [self.id_cuenta(c) for c in lote['Cuentas']]
+            self.con.executemany(
+                "INSERT INTO lineas (asiento, fecha, cuenta, debe, haber) VALUES (?, ?, ?, ?, ?)",
+                zip((base + rel).tolist(), [fechas[r] for r in rel], ids,
+                    np.asarray(lote['Debe'], dtype=np.int64).tolist(),
+                    np.asarray(lote['Haber'], dtype=np.int64).tolist())
+            )
+            self._acumular_rollup([fechas[r][:7] for r in rel], ids, lote['Debe'], lote['Haber'])
+            iva = np.flatnonzero(np.isin(ids, [self._id_cuenta[c] for c in CUENTAS_IVA if c in self._id_cuenta]))
+            self._acumular_iva([fechas[r][:7] for r in rel[iva]],
+                               np.asarray(lote['Concepto'], dtype=object)[rel[iva]],
+                               np.asarray(lote['Cuentas'], dtype=object)[iva],
+                               np.asarray(lote['Debe'], dtype=np.int64)[iva],
+                               np.asarray(lote['Haber'], dtype=np.int64)[iva])
+            self._encadenar({"asiento": base + rel,
+                             "fecha": np.asarray(lote['Fecha'], dtype='datetime64[D]')[rel],
+                             "cuenta": ids, "debe": lote['Debe'], "haber": lote['Haber']})
+        return len(fechas)
+
+    def __len__(self):
+        return self.con.execute("SELECT COUNT(*) FROM asientos").fetchone()[0]
+
+    @property
+    def num_lineas(self):
+        return self.con.execute("SELECT COUNT(*) FROM lineas").fetchone()[0]
+
+    def diario_df(self):
+        df = pd.read_sql_query(
+            """SELECT l.fecha AS Fecha, c.nombre AS Cuenta, l.debe AS Debe, l.haber AS Haber
+               FROM lineas l JOIN cuentas c ON c.id = l.cuenta
+               ORDER BY l.rowid""",
+            self.con
+        )
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+        df["Cuenta"] = df["Cuenta"].astype("category")
+        return df
+
+    def resumen_asientos(self):
+        df = pd.read_sql_query(
+            """SELECT a.id AS Asiento, a.fecha AS Fecha, a.concepto AS Concepto,
+                      SUM(l.debe) AS Debe, SUM(l.haber) AS Haber
+               FROM asientos a JOIN lineas l ON l.asiento = a.id
+               GROUP BY a.id ORDER BY a.id""",
+            self.con
+        )
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+        return df
+
+    def totales(self):
+        debe, haber = self.con.execute(
+            "SELECT COALESCE(SUM(debe), 0), COALESCE(SUM(haber), 0) FROM lineas"
+        ).fetchone()
+        return int(debe), int(haber)
+
+    def cuentas(self):
+        return [nombre for nombre, in self.con.execute("SELECT nombre FROM cuentas ORDER BY id")]
+
+    def ids_cuentas(self):
+        return dict(self.con.execute("SELECT nombre, id FROM cuentas"))
+
+    def columnas(self, i=0, j=None):
+        """Columnas asiento, fecha, cuenta, debe y haber de las líneas [i, j)
+        en orden de escritura."""
+        # La fecha se trae como días desde 1970 para armar un solo arreglo entero
+        filas = np.array(self.con.execute(
+            """SELECT asiento, CAST(julianday(fecha) - 2440587.5 AS INTEGER), cuenta, debe, haber
+               FROM lineas WHERE rowid > ? AND rowid <= ? ORDER BY rowid""",
+            (i, self.version if j is None else j)
+        ).fetchall(), dtype=np.int64).reshape(-1, 5)
+        return {"asiento": filas[:, 0], "fecha": filas[:, 1].astype('datetime64[D]'), "cuenta": filas[:, 2],
+                "debe": filas[:, 3], "haber": filas[:, 4]}
+
+    def eslabones(self, desde=0):
+        return self.con.execute("SELECT lineas, hash FROM cadena ORDER BY lineas LIMIT -1 OFFSET ?",
+                                (desde,)).fetchall()
+
+    def consultar_diario(self, desde=None, hasta=None, cuenta=None, concepto=None,
+                         pagina=0, tam_pagina=50):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("l.fecha >= ?")
+            params.append(str(_a_fecha(desde)))
+        if hasta is not None:
+            condiciones.append("l.fecha <= ?")
+            params.append(str(_a_fecha(hasta)))
+        if cuenta is not None:
+            condiciones.append("l.cuenta = ?")
+            params.append(self._id_cuenta.get(cuenta, -1))
+        if concepto:
+            condiciones.append("instr(lower(a.concepto), lower(?)) > 0")
+            params.append(concepto)
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+
+        num, debe, haber = self.con.execute(
+            """SELECT COUNT(*), COALESCE(SUM(l.debe), 0), COALESCE(SUM(l.haber), 0)
+               FROM lineas l JOIN asientos a ON a.id = l.asiento """ + where,
+            params
+        ).fetchone()
+        df = pd.read_sql_query(
+            """SELECT l.asiento AS Asiento, l.fecha AS Fecha, c.nombre AS Cuenta,
+                      l.debe AS Debe, l.haber AS Haber, a.concepto AS Concepto
+               FROM lineas l
+               JOIN asientos a ON a.id = l.asiento
+               JOIN cuentas  c ON c.id = l.cuenta """ + where
+            + " ORDER BY l.rowid LIMIT ? OFFSET ?",
+            self.con, params=params + [tam_pagina, pagina * tam_pagina]
+        )
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+        return df, num, int(debe), int(haber)
+
+    def bloques_diario(self, desde=None, hasta=None, tam_bloque=50_000):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("l.fecha >= ?")
+            params.append(str(_a_fecha(desde)))
+        if hasta is not None:
+            condiciones.append("l.fecha <= ?")
+            params.append(str(_a_fecha(hasta)))
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        for df in pd.read_sql_query(
+            """SELECT l.asiento AS Asiento, l.fecha AS Fecha, c.nombre AS Cuenta,
+                      l.debe AS Debe, l.haber AS Haber, a.concepto AS Concepto
+               FROM lineas l
+               JOIN asientos a ON a.id = l.asiento
+               JOIN cuentas  c ON c.id = l.cuenta """ + where + " ORDER BY l.rowid",
+            self.con, params=params, chunksize=tam_bloque
+        ):
+            df["Fecha"] = pd.to_datetime(df["Fecha"])
+            yield df
+
+    def bloques_mayor(self, desde=None, hasta=None, tam_bloque=50_000):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("l.fecha >= ?")
+            params.append(str(_a_fecha(desde)))
+        if hasta is not None:
+            condiciones.append("l.fecha <= ?")
+            params.append(str(_a_fecha(hasta)))
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        # El orden sigue el índice (cuenta, fecha)
+        for df in pd.read_sql_query(
+            """SELECT l.asiento AS Asiento, l.fecha AS Fecha, c.nombre AS Cuenta,
+                      l.debe AS Debe, l.haber AS Haber, a.concepto AS Concepto
+               FROM lineas l
+               JOIN asientos a ON a.id = l.asiento
+               JOIN cuentas  c ON c.id = l.cuenta """ + where + " ORDER BY l.cuenta, l.fecha, l.rowid",
+            self.con, params=params, chunksize=tam_bloque
+        ):
+            df["Fecha"] = pd.to_datetime(df["Fecha"])
+            yield df
+
+    def saldo(self, cuenta):
+        fila = self.con.execute(
+            """SELECT s.debe - s.haber FROM saldos s JOIN cuentas c ON c.id = s.cuenta
+               WHERE c.nombre = ?""", (cuenta,)
+        ).fetchone()
+        return int(fila[0]) if fila else 0
+
+    def mayor(self, desde=None, hasta=None):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("l.fecha >= ?")
+            params.append(str(_a_fecha(desde)))
+        if hasta is not None:
+            condiciones.append("l.fecha <= ?")
+            params.append(str(_a_fecha(hasta)))
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        filas = self.con.execute(
+            """SELECT c.nombre, SUM(l.debe), SUM(l.haber)
+               FROM lineas l JOIN cuentas c ON c.id = l.cuenta """ + where + """
+               GROUP BY l.cuenta ORDER BY l.cuenta""",
+            params
+        )
+        return {cuenta: {"debe": d, "haber": h} for cuenta, d, h in filas}
+
+    def mayor_registrado(self):
+        filas = self.con.execute(
+            "SELECT c.nombre, s.debe, s.haber FROM saldos s JOIN cuentas c ON c.id = s.cuenta ORDER BY s.cuenta"
+        )
+        return {cuenta: {"debe": d, "haber": h} for cuenta, d, h in filas}
+
+    def serie_saldos(self, cuentas, frecuencia="D"):
+        ids = {self._id_cuenta[c]: c for c in cuentas if c in self._id_cuenta}
+        marcas = ",".join("?" * len(ids))
+        if frecuencia == "M":
+            sql = f"""SELECT mes || '-01', cuenta, debe - haber FROM rollup_mensual
+                      WHERE cuenta IN ({marcas})"""
+        else:
+            sql = f"""SELECT fecha, cuenta, SUM(debe) - SUM(haber) FROM lineas
+                      WHERE cuenta IN ({marcas}) GROUP BY fecha, cuenta"""
+        df = pd.DataFrame(self.con.execute(sql, list(ids)).fetchall() if ids else [],
+                          columns=["Fecha", "cuenta", "neto"])
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+        serie = df.pivot_table(index="Fecha", columns="cuenta", values="neto", aggfunc="sum", fill_value=0) \
+            .rename(columns=ids).rename_axis(columns=None).cumsum()
+        return serie.reindex(columns=list(cuentas), fill_value=0).astype(np.int64)
+
+    def mayor_mensual(self, desde=None, hasta=None):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("r.mes >= ?")
+            params.append(str(_a_mes(desde)))
+        if hasta is not None:
+            condiciones.append("r.mes <= ?")
+            params.append(str(_a_mes(hasta)))
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        filas = self.con.execute(
+            """SELECT r.mes, c.nombre, r.debe, r.haber
+               FROM rollup_mensual r JOIN cuentas c ON c.id = r.cuenta """ + where,
+            params
+        ).fetchall()
+        if not filas:
+            return {}
+        meses = [pd.Period(m, "M") for m, _, _, _ in filas]
+        desde = _a_mes(desde) if desde is not None else min(meses)
+        hasta = _a_mes(hasta) if hasta is not None else max(meses)
+        resultado = {p: {} for p in pd.period_range(desde, hasta, freq="M")}
+        for periodo, (_, cuenta, d, h) in zip(meses, filas):
+            resultado[periodo][cuenta] = {"debe": d, "haber": h}
+        return resultado
+
+    def iva_mensual(self, desde=None, hasta=None):
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("mes >= ?")
+            params.append(str(_a_mes(desde)))
+        if hasta is not None:
+            condiciones.append("mes <= ?")
+            params.append(str(_a_mes(hasta)))
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        filas = self.con.execute(
+            "SELECT mes, concepto, trasladado, acreditable FROM iva_mensual " + where, params
+        ).fetchall()
+        if not filas:
+            return {}
+        meses = [pd.Period(m, "M") for m, _, _, _ in filas]
+        desde = _a_mes(desde) if desde is not None else min(meses)
+        hasta = _a_mes(hasta) if hasta is not None else max(meses)
+        resultado = {p: {} for p in pd.period_range(desde, hasta, freq="M")}
+        for periodo, (_, concepto, t, a) in zip(meses, filas):
+            if t or a:
+                resultado[periodo][concepto] = (t, a)
+        return resultado
+
+    def verificar_mayor(self):
+        """Compara los saldos mantenidos al registrar contra la suma de las
+        líneas y devuelve la lista de cuentas con diferencias (vacía si es
+        consistente)."""
+        guardados = {c: (s["debe"], s["haber"]) for c, s in self.mayor_registrado().items()}
+        lineas = {c: (s["debe"], s["haber"]) for c, s in self.mayor().items()}
+        return [c for c in self.cuentas()
+                if guardados.get(c, (0, 0)) != lineas.get(c, (0, 0))]
+
+def crear_libro(ruta=None, solo_lectura=False):
+    """Libro en memoria sin archivo; con un archivo .bitacora, libro en memoria
+    respaldado por la bitácora binaria; con cualquier otro, libro SQLite.
+    `solo_lectura` abre el archivo sin modificarlo, para leer un libro que
+    otro proceso está escribiendo."""
+    if not ruta:
+        return LibroDiario()
+    if ruta.lower().endswith(".bitacora"):
+        from .bitacora import LibroBitacora
+        return LibroBitacora(ruta, solo_lectura=solo_lectura)
+    return LibroSQLite(ruta, solo_lectura=solo_lectura)
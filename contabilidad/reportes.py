@@ -0,0 +1,79 @@
+"""Balanza de comprobación y estado de resultados a partir del mayor."""
+import pandas as pd
+
+from .dinero import dividir_redondeando
+
+# Generar balanza de comprobación
+def generar_balanza(mayor):
+    balanza = []
+    total_debe = 0
+    total_haber = 0
+    
+    for cuenta, saldos in mayor.items():
+        saldo_deudor = max(saldos['debe'] - saldos['haber'], 0)
+        saldo_acreedor = max(saldos['haber'] - saldos['debe'], 0)
+        
+        balanza.append({
+            'Cuenta': cuenta,
+            'Debe': saldos['debe'],
+            'Haber': saldos['haber'],
+            'Saldo Deudor': saldo_deudor,
+            'Saldo Acreedor': saldo_acreedor
+        })
+        
+        total_debe += saldo_deudor
+        total_haber += saldo_acreedor
+    
+    return balanza, total_debe, total_haber
+
+ETIQUETAS_ESTADO = {
+    'ventas_netas': 'Ventas Netas',
+    'compras_totales': 'Compras Totales',
+    'compras_netas': 'Compras Netas',
+    'total_mercancia': 'Total Mercancía',
+    'costo_ventas': 'Costo de Ventas',
+    'utilidad_bruta': 'Utilidad Bruta',
+    'perdida_operacion': 'Resultado Operativo'
+}
+
+def generar_estado_resultados(mayor):
+    # Extraer valores reales del mayor (centavos)
+    ventas = mayor.get('Ventas', {'haber': 0})['haber']
+    descuentos_ventas = mayor.get('Descuentos s/ventas', {'debe': 0})['debe']
+    devoluciones_ventas = mayor.get('Devoluciones s/ventas', {'debe': 0})['debe']
+    rebajas_ventas = mayor.get('Rebajas s/ventas', {'debe': 0})['debe']
+    
+    compras = mayor.get('Compras', {'debe': 0})['debe']
+    descuentos_compras = mayor.get('Descuentos s/compras', {'haber': 0})['haber']
+    devoluciones_compras = mayor.get('Devoluciones s/compras', {'haber': 0})['haber']
+    rebajas_compras = mayor.get('Rebajas s/compras', {'haber': 0})['haber']
+
+    # Cálculos según especificación
+    ventas_netas = ventas + descuentos_ventas + devoluciones_ventas + rebajas_ventas
+    compras_totales = compras
+    compras_netas = compras + descuentos_compras + devoluciones_compras + rebajas_compras
+    total_mercancia = compras_netas
+    costo_ventas = compras_netas + dividir_redondeando(compras_netas * 3, 10_000)  # 0.03%
+    utilidad_bruta = ventas_netas - costo_ventas
+    perdida_operacion = utilidad_bruta
+
+    return {
+        'ventas_netas': ventas_netas,
+        'compras_totales': compras_totales,
+        'compras_netas': compras_netas,
+        'total_mercancia': total_mercancia,
+        'costo_ventas': costo_ventas,
+        'utilidad_bruta': utilidad_bruta,
+        'perdida_operacion': perdida_operacion
+    }
+
+def generar_estado_comparativo(libro, num_meses):
+    """Estado de resultados de los últimos `num_meses` meses con movimientos,
+    leído del cubo mensual. Devuelve un DataFrame con un renglón por concepto
+    y una columna por mes, en centavos."""
+    mensual = libro.mayor_mensual()
+    periodos = list(mensual)[-num_meses:]
+    df = pd.DataFrame({
+        str(p): generar_estado_resultados(mensual[p]) for p in periodos
+    })
+    return df.rename(index=ETIQUETAS_ESTADO)
@@ -0,0 +1,74 @@
+"""Series de saldos reducidas en el servidor para graficarlas.
+
+Una serie diaria de varios años tiene miles de puntos por cuenta; la gráfica
+sólo necesita unos cientos. Largest-Triangle-Three-Buckets (LTTB) elige en
+cada tramo el punto que más cambia la forma de la curva, así que se conservan
+picos y caídas aunque se envíen pocos puntos.
+"""
+import numpy as np
+import pandas as pd
+
+PUNTOS_GRAFICA = 600    # puntos por serie que se envían al navegador
+
+# Series predefinidas: {nombre: {cuenta: signo}} sobre el saldo deudor (debe - haber)
+SERIES_SALDOS = {
+    "Caja": {"Caja": 1},
+    "Bancos": {"Bancos": 1},
+    "IVA por pagar": {"IVA Trasladado": -1, "IVA Acreditable": -1},
+}
+
+def series_saldos(libro, nombres, frecuencia="D"):
+    """Saldo al cierre de cada día ("D") o mes ("M") de las series `nombres`
+    (de SERIES_SALDOS o nombres de cuenta), en centavos, con una columna por
+    serie. Sale de los acumulados del libro, no de recorrer el diario."""
+    composicion = {n: SERIES_SALDOS.get(n, {n: 1}) for n in nombres}
+    cuentas = sorted({c for partes in composicion.values() for c in partes})
+    saldos = libro.serie_saldos(cuentas, frecuencia)
+    return pd.DataFrame({
+        n: sum(saldos[c] * signo for c, signo in partes.items()) for n, partes in composicion.items()
+    }, index=saldos.index).astype(np.int64)
+
+def lttb(x, y, puntos):
+    """Índices de los `puntos` puntos de (x, y) que elige LTTB, en orden. Se
+    conservan siempre el primero y el último."""
+    n = len(y)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Tramos para los puntos interiores 1..n-2; el "siguiente" del último es el punto final
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(puntos - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        sig_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        mx, my = x[fin:sig_fin].mean(), y[fin:sig_fin].mean()
+        area = np.abs((x[a] - mx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (my - y[a]))
+        a = ini + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+def reducir_serie(serie, desde=None, hasta=None, puntos=PUNTOS_GRAFICA):
+    """Recorta `serie` (DataFrame con índice de fechas y una columna por
+    cuenta) a [desde, hasta] y reduce cada columna a `puntos` con LTTB. El
+    saldo vigente al inicio de la ventana se agrega como primer punto.
+    Devuelve un DataFrame largo [Fecha, Cuenta, Saldo] y los puntos originales
+    de la ventana."""
+    desde = serie.index.min() if desde is None else pd.Timestamp(desde)
+    hasta = serie.index.max() if hasta is None else pd.Timestamp(hasta)
+    ventana = serie.loc[desde:hasta]
+    anterior = serie.loc[:desde - pd.Timedelta(days=1)]
+    if len(anterior) and (ventana.empty or ventana.index[0] > desde):
+        inicio = anterior.iloc[[-1]].set_axis(pd.DatetimeIndex([desde], name=serie.index.name))
+        ventana = pd.concat([inicio, ventana])
+    x = ventana.index.to_numpy().astype("datetime64[D]").astype(np.int64)
+    partes = []
+    for cuenta in ventana.columns:
+        y = ventana[cuenta].to_numpy()
+        idx = lttb(x, y, puntos)
+        partes.append(pd.DataFrame({"Fecha": ventana.index[idx], "Cuenta": cuenta, "Saldo": y[idx]}))
+    largo = pd.concat(partes, ignore_index=True) if partes else \
+        pd.DataFrame(columns=["Fecha", "Cuenta", "Saldo"])
+    return largo, len(ventana)
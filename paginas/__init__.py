@@ -0,0 +1,21 @@
+"""Páginas de la aplicación. Cada una es un módulo con una función mostrar()
+que se importa sólo cuando se visita, junto con sus dependencias pesadas
+(Plotly únicamente en las páginas con gráficas)."""
+import importlib
+
+PAGINAS = {
+    "Inicio": "inicio",
+    "Libro Diario": "libro_diario",
+    "Mayor y Balanza": "mayor_balanza",
+    "Estado de Resultados": "estado_resultados",
+    "Estado Comparativo": "estado_comparativo",
+    "Evolución de Saldos": "evolucion_saldos",
+    "Liquidación de IVA": "liquidacion_iva",
+    "Arqueo de Caja": "arqueo",
+    "Consolidación": "consolidacion",
+    "Auditoría": "auditoria",
+}
+
+def cargar(nombre):
+    """Módulo de la página; Python lo guarda en caché tras la primera carga."""
+    return importlib.import_module(f"{__name__}.{PAGINAS[nombre]}")
@@ -0,0 +1,68 @@
+"""Arqueo de Caja de una o varias cajas."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from contabilidad import DENOMINACIONES, a_centavos, arqueo_lote, formato_pesos
+from .comun import obtener_saldo
+from .perfil import etapa
+
+def mostrar():
+    st.markdown('<div class="section-header">Arqueo de Caja</div>', unsafe_allow_html=True)
+
+    metodo = st.radio("Selecciona método de monto:", [
+        "Ingresar manualmente",
+        "Usar último saldo de Caja"
+    ])
+    if metodo == "Usar último saldo de Caja":
+        monto = max(obtener_saldo("Caja"), 0)
+        st.markdown(f"**Usando último saldo de Caja:** {formato_pesos(monto)}")
+    else:
+        monto = a_centavos(st.number_input("Monto total en efectivo:", min_value=0.0, step=0.5, format="%.2f"))
+
+    opciones = [formato_pesos(d) for d in DENOMINACIONES]
+    elegidas = st.multiselect("Denominaciones disponibles", opciones, default=opciones)
+    disponibles = np.isin(opciones, elegidas)
+    minimo_uno = st.checkbox("Al menos una unidad de cada denominación", value=True)
+
+    if monto > 0:
+        with etapa("arqueo"):
+            conteos, faltante = arqueo_lote([monto], disponibles, minimo_uno)
+        desglose = {int(d): int(c) for d, c in zip(DENOMINACIONES, conteos[0]) if c}
+        monedas = {d: c for d, c in desglose.items() if d < 2_000}
+        billetes= {d: c for d, c in desglose.items() if d >= 2_000}
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("### Monedas")
+            for d, c in sorted(monedas.items()):
+                st.write(f"{c} × {formato_pesos(d)} = {formato_pesos(c*d)}")
+            total_m = sum(d*c for d, c in monedas.items())
+            st.markdown(f"**Total Monedas:** {formato_pesos(total_m)}")
+        with col2:
+            st.markdown("### Billetes")
+            for d, c in sorted(billetes.items()):
+                st.write(f"{c} × {formato_pesos(d)} = {formato_pesos(c*d)}")
+            total_b = sum(d*c for d, c in billetes.items())
+            st.markdown(f"**Total Billetes:** {formato_pesos(total_b)}")
+
+        # Verificación final
+        total_calc = total_m + total_b
+        st.markdown(f"**Total Arqueo:** {formato_pesos(total_calc)}")
+        if faltante[0] == 0:
+            st.success("✅ Arqueo correcto, sin discrepancias.")
+        else:
+            st.error(f"❌ Discrepancia de {formato_pesos(faltante[0])}: no se completa con las denominaciones disponibles")
+
+    # Cierre de turno: todas las cajas en una sola pasada
+    with st.expander("Arqueo de varias cajas"):
+        cajas = st.data_editor(
+            pd.DataFrame({"Caja": ["Caja 1", "Caja 2"], "Monto": [0.0, 0.0]}),
+            num_rows="dynamic", use_container_width=True, hide_index=True, key="cajas_arqueo",
+            column_config={"Monto": st.column_config.NumberColumn(min_value=0.0, format="%.2f")},
+        ).dropna()
+        if len(cajas):
+            conteos, faltante = arqueo_lote(a_centavos(cajas["Monto"].to_numpy()), disponibles, minimo_uno)
+            resultado = pd.DataFrame(conteos, columns=opciones, index=cajas["Caja"])
+            resultado["Faltante"] = [formato_pesos(f) for f in faltante]
+            st.dataframe(resultado, use_container_width=True)
@@ -0,0 +1,49 @@
+"""Auditoría de integridad del libro: cuadre, cuentas, fechas y cadena de hashes."""
+import streamlit as st
+
+from contabilidad import auditar, formato_pesos
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown('<div class="section-header">Auditoría del Libro</div>', unsafe_allow_html=True)
+
+    libro = st.session_state.transacciones
+    if not libro:
+        st.warning("No hay transacciones registradas")
+        return
+
+    st.caption("Revisa cada asiento (cuadre, montos, cuentas y fechas), el mayor contra las líneas "
+               "y la cadena de hashes de las escrituras. La cadena sólo se recalcula desde la "
+               "última verificación correcta, salvo que se pida la verificación completa.")
+    completo = st.checkbox("Verificar la cadena completa")
+    if not st.button("Auditar libro", type="primary"):
+        return
+
+    with etapa("auditoría") as e:
+        resultado = auditar(libro, completo=completo)
+        anotar(e, resultado["hallazgos"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Líneas revisadas", f"{resultado['lineas']:,}")
+    col2.metric("Asientos", f"{resultado['asientos']:,}")
+    col3.metric("Tiempo", f"{resultado['segundos']:.2f} s")
+    debe, haber = libro.totales()
+    st.caption(f"Totales del diario: Debe {formato_pesos(debe)} · Haber {formato_pesos(haber)}")
+
+    cadena = resultado["cadena"]
+    if cadena["roto"] is None:
+        st.caption(f"Cadena de hashes: {cadena['eslabones']:,} eslabones, "
+                   f"{cadena['verificados']:,} recalculados en esta revisión")
+
+    resumen = resultado["resumen"]
+    errores = resumen[resumen["Gravedad"] == "error"]
+    if resumen.empty:
+        st.success("✅ Sin hallazgos: el libro cuadra y la cadena está íntegra")
+    elif errores.empty:
+        st.info(f"Sin errores; {int(resumen['Casos'].sum()):,} avisos por revisar")
+    else:
+        st.error(f"❌ {int(errores['Casos'].sum()):,} errores de integridad")
+    if not resumen.empty:
+        st.dataframe(resumen, hide_index=True, use_container_width=True)
+        with etapa("render hallazgos"):
+            st.dataframe(resultado["hallazgos"], hide_index=True, use_container_width=True)
@@ -0,0 +1,156 @@
+"""Utilidades compartidas por las páginas: empresas, libros compartidos, caché
+de reportes (también en segundo plano) y selector de periodo."""
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from contabilidad import (
+    FORMATOS_EXPORTACION, CacheReportes, LibroCompartido, cargar_empresas, crear_libro, crear_pool,
+)
+from .perfil import etapa, anotar
+
+@st.cache_resource
+def empresas():
+    """{nombre: ruta del libro} de las empresas del despliegue (S4AI_EMPRESAS)."""
+    return cargar_empresas()
+
+def empresa_activa():
+    """Empresa elegida en la barra lateral (la primera si aún no se elige)."""
+    return st.session_state.get("empresa") or next(iter(empresas()))
+
+@st.cache_resource
+def _libro_empresa(empresa):
+    return LibroCompartido(crear_libro(empresas()[empresa]))
+
+def libro_compartido(empresa=None):
+    """Libro de la empresa (por omisión, la activa), compartido por todas las
+    sesiones del proceso."""
+    return _libro_empresa(empresa or empresa_activa())
+
+@st.cache_resource
+def cache_compartida(empresa=None):
+    """Caché de reportes del proceso para una empresa: las sesiones que ven la
+    misma versión de su libro reutilizan los mismos reportes."""
+    return CacheReportes()
+
+@st.cache_resource
+def trabajador_reportes():
+    """Hilo del proceso que calcula los reportes pesados (Mayor, Balanza,
+    Estado de Resultados) sin detener los reruns."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="reportes")
+
+@st.cache_resource
+def pool_consolidacion():
+    """Pool de procesos del despliegue para consolidar empresas."""
+    return crear_pool()
+
+def leer_libro():
+    """Deja en la sesión la instantánea del libro para este run y anota su versión."""
+    terminar_lectura()
+    libro = libro_compartido().instantanea()
+    st.session_state.transacciones = libro
+    st.session_state.version_vista = libro.version
+
+def terminar_lectura():
+    """Cierra la lectura de la instantánea de la sesión al terminar un run o un
+    fragmento: con SQLite, una transacción abierta impide reciclar el WAL."""
+    libro = st.session_state.get("transacciones")
+    if libro is not None:
+        libro.terminar_lectura()
+
+def registrar(escribir):
+    """Aplica `escribir(libro)` sobre el libro compartido (un escritor a la vez)
+    y refresca la instantánea de la sesión. Devuelve lo que devuelva `escribir`."""
+    resultado = escribir(libro_compartido())
+    leer_libro()
+    return resultado
+
+def reporte_en_cache(nombre, calcular, params=()):
+    """Devuelve el reporte de la versión actual del libro, calculándolo sólo
+    si el libro cambió desde la última vez. `params` distingue variantes del
+    mismo reporte (por ejemplo, el periodo)."""
+    libro = st.session_state.transacciones
+    return st.session_state.cache_reportes.obtener(nombre, libro.version, calcular, params)
+
+def reporte_en_segundo_plano(nombre, calcular, params=()):
+    """Reporte `calcular(libro)` calculado en el trabajador con su propia
+    instantánea del libro. Mientras se calcula el de la versión actual se
+    devuelve el anterior con un aviso de desactualizado (None si nunca se ha
+    calculado) y el vigilante de la barra lateral vuelve a ejecutar la página
+    cuando termina."""
+    compartido = libro_compartido()    # el hilo del trabajador no ve la sesión
+    version_actual = st.session_state.transacciones.version
+
+    def tarea():
+        libro = compartido.instantanea()
+        try:
+            return libro.version, calcular(libro)
+        finally:
+            libro.terminar_lectura()
+    version, valor = st.session_state.cache_reportes.en_segundo_plano(
+        nombre, version_actual, tarea, params, trabajador_reportes())
+    if version is None or version < version_actual:
+        st.session_state.reportes_pendientes = True
+    if version is None:
+        st.info("Calculando el reporte en segundo plano…")
+    elif version < version_actual:
+        st.caption("⏳ Desactualizado: se muestra el reporte anterior mientras se calcula "
+                   "el que incluye los asientos nuevos")
+    return valor
+
+def obtener_df_diario():
+    """Construye un DataFrame con columnas [Fecha, Cuenta, Debe, Haber]
+        (montos en centavos), directamente del libro."""
+    return reporte_en_cache("diario", st.session_state.transacciones.diario_df)
+
+
+def procesar_mayor_mejorado(desde=None, hasta=None):
+    """Devuelve un dict con saldos por cuenta (incremental en memoria o GROUP BY
+    en SQLite), opcionalmente sólo de un periodo."""
+    libro = st.session_state.transacciones
+    if not libro:
+        return {}
+    with etapa("mayor") as e:
+        return anotar(e, reporte_en_cache("mayor", lambda: libro.mayor(desde, hasta), (desde, hasta)))
+
+
+def boton_descarga(etiqueta, nombre_archivo, escribir, key=None):
+    """Botón de descarga que genera el archivo sólo al hacer clic, en un hilo
+    aparte y con su propia instantánea del libro. `escribir(libro, destino)`
+    escribe en un archivo temporal, no en memoria."""
+    empresa = empresa_activa()    # el hilo de la descarga no ve la sesión
+
+    def generar():
+        destino = tempfile.TemporaryFile()
+        libro = libro_compartido(empresa).instantanea()
+        try:
+            escribir(libro, destino)
+        finally:
+            libro.terminar_lectura()
+        destino.seek(0)
+        return destino
+    formato = nombre_archivo.rsplit(".", 1)[-1]
+    st.download_button(etiqueta, generar, file_name=nombre_archivo,
+                       mime=FORMATOS_EXPORTACION[formato], on_click="ignore", key=key)
+
+def selector_periodo():
+    """Widgets para elegir el periodo de un reporte. Devuelve (desde, hasta)
+    como date, o (None, None) para todo el libro."""
+    opcion = st.radio("Periodo", ["Todo el libro", "Mes", "Trimestre", "Personalizado"],
+                      horizontal=True)
+    if opcion == "Todo el libro":
+        return None, None
+    if opcion == "Personalizado":
+        rango = st.date_input("Rango de fechas del reporte", value=[])
+        if len(rango) == 0:
+            return None, None
+        return rango[0], rango[-1]
+    dia = pd.Timestamp(st.date_input("Cualquier día del periodo"))
+    periodo = dia.to_period("M" if opcion == "Mes" else "Q")
+    return periodo.start_time.date(), periodo.end_time.date()
+
+def obtener_saldo(cuenta):
+    """Saldo vigente de una cuenta en centavos, del índice de saldos del libro."""
+    return st.session_state.transacciones.saldo(cuenta)
@@ -0,0 +1,103 @@
+"""Consolidación de las empresas del despliegue con eliminaciones entre ellas."""
+import pandas as pd
+import streamlit as st
+
+from contabilidad import (
+    a_centavos, consolidar, eliminacion, en_pesos, formato_pesos, tabla_consolidacion,
+)
+from .comun import (
+    cache_compartida, empresa_activa, empresas, libro_compartido, pool_consolidacion, selector_periodo,
+)
+from .perfil import etapa, anotar
+
+COLUMNAS_ELIMINACION = ["Concepto", "Cargo a", "Abono a", "Monto"]
+MONTOS_BALANZA = ["Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"]
+
+def balanza_df(balanza):
+    return en_pesos(pd.DataFrame(balanza, columns=["Cuenta"] + MONTOS_BALANZA), MONTOS_BALANZA)
+
+def reglas_eliminacion(editadas):
+    """Reglas a partir de las filas del editor; Monto vacío elimina saldos recíprocos."""
+    reglas = []
+    for fila in editadas.to_dict("records"):
+        if not fila["Cargo a"] or not fila["Abono a"]:
+            continue
+        monto = None if pd.isna(fila["Monto"]) else a_centavos(float(fila["Monto"]))
+        reglas.append(eliminacion(fila["Concepto"] or "Eliminación", fila["Cargo a"], fila["Abono a"], monto))
+    return reglas
+
+def mostrar():
+    st.markdown('<div class="section-header">Consolidación</div>', unsafe_allow_html=True)
+
+    rutas = empresas()
+    if len(rutas) == 1:
+        st.info("Hay una sola empresa. Configure S4AI_EMPRESAS=\"Empresa A=a.db;Empresa B=b.db\" "
+                "para consolidar varias.")
+    desde, hasta = selector_periodo()
+
+    # Una instantánea por empresa; la de la empresa activa es la del run, que
+    # se cierra al terminar la página, y las demás se cierran aquí
+    activa = empresa_activa()
+    libros = {n: st.session_state.transacciones if n == activa else libro_compartido(n).instantanea()
+              for n in rutas}
+    try:
+        # Los libros con archivo se leen en el pool; los que sólo están en memoria, aquí
+        entidades = {n: r or libros[n] for n, r in rutas.items()}
+        cuentas = sorted({c for libro in libros.values() for c in libro.cuentas()})
+    finally:
+        for n, libro in libros.items():
+            if n != activa:
+                libro.terminar_lectura()
+
+    st.markdown("### Eliminaciones entre compañías")
+    st.caption("Cada renglón es un asiento de eliminación. Deje el monto vacío para eliminar "
+               "saldos recíprocos: el menor entre el saldo acreedor de la cuenta cargada y el "
+               "deudor de la abonada.")
+    editadas = st.data_editor(
+        pd.DataFrame({c: pd.Series(dtype=float if c == "Monto" else object) for c in COLUMNAS_ELIMINACION}),
+        num_rows="dynamic", hide_index=True, use_container_width=True, key="eliminaciones",
+        column_config={
+            "Cargo a": st.column_config.SelectboxColumn(options=cuentas),
+            "Abono a": st.column_config.SelectboxColumn(options=cuentas),
+            "Monto": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+        },
+    )
+    reglas = reglas_eliminacion(editadas)
+
+    # Versión de cada libro, que también cambia con escrituras de otros procesos
+    versiones = tuple(libro_compartido(n).version_libro() for n in rutas)
+    clave_reglas = tuple(tuple(r.values()) for r in reglas)
+    with etapa("consolidación") as e:
+        resultado = cache_compartida("__consolidacion__").obtener(
+            "consolidacion", versiones,
+            lambda: consolidar(entidades, reglas, desde, hasta, pool_consolidacion()),
+            (desde, hasta, clave_reglas)
+        )
+        tabla = anotar(e, tabla_consolidacion(resultado))
+
+    st.markdown("### Estado de Resultados consolidado")
+    with etapa("render consolidado"):
+        st.dataframe((tabla / 100).style.format("${:,.2f}"), use_container_width=True)
+
+    if resultado["eliminaciones"]:
+        st.markdown("### Asientos de eliminación aplicados")
+        st.dataframe(pd.DataFrame([
+            {"Concepto": a["Concepto"], "Cargo a": a["Cuentas"][0], "Abono a": a["Cuentas"][1],
+             "Monto": formato_pesos(a["Debe"][0])}
+            for a in resultado["eliminaciones"]
+        ]), hide_index=True, use_container_width=True)
+
+    balanza, total_debe, total_haber = resultado["consolidado"]["balanza"]
+    st.markdown("### Balanza de Comprobación consolidada")
+    st.dataframe(balanza_df(balanza), use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Deudor", formato_pesos(total_debe))
+    with col2:
+        st.metric("Total Acreedor", formato_pesos(total_haber))
+
+    with st.expander("Balanza por empresa"):
+        for nombre, r in resultado["entidades"].items():
+            filas, debe, haber = r["balanza"]
+            st.markdown(f"**{nombre}** · Deudor {formato_pesos(debe)} · Acreedor {formato_pesos(haber)}")
+            st.dataframe(balanza_df(filas), use_container_width=True, hide_index=True)
@@ -0,0 +1,42 @@
+"""Estado de Resultados comparativo por mes."""
+import numpy as np
+import streamlit as st
+import plotly.express as px
+
+from contabilidad import a_pesos, generar_estado_comparativo
+from .comun import reporte_en_cache
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown('<div class="section-header">Estado de Resultados Comparativo</div>', unsafe_allow_html=True)
+
+    if st.session_state.transacciones:
+        num_meses = st.slider("Meses a comparar", min_value=3, max_value=36, value=12)
+        with etapa("comparativo") as e:
+            comparativo = anotar(e, reporte_en_cache(
+                "estado_comparativo", lambda: generar_estado_comparativo(st.session_state.transacciones, num_meses), (num_meses,)
+            ))
+        comparativo = a_pesos(comparativo)
+        variacion = comparativo.diff(axis=1).iloc[:, 1:]
+        variacion_pct = (comparativo.pct_change(axis=1, fill_method=None) * 100).iloc[:, 1:]
+
+        tab1, tab2, tab3 = st.tabs(["Estado comparativo", "Variación $", "Variación %"])
+        with etapa("render tablas"):
+            with tab1:
+                st.dataframe(comparativo.style.format("${:,.2f}"), use_container_width=True)
+            with tab2:
+                st.dataframe(variacion.style.format("${:,.2f}", na_rep="—"), use_container_width=True)
+            with tab3:
+                st.dataframe(variacion_pct.replace([np.inf, -np.inf], np.nan)
+                             .style.format("{:,.1f}%", na_rep="—"), use_container_width=True)
+
+        with etapa("gráfica") as e:
+            tendencia = comparativo.loc[['Ventas Netas', 'Costo de Ventas', 'Utilidad Bruta']].T
+            fig = anotar(e, px.line(
+                tendencia, x=tendencia.index, y=tendencia.columns, markers=True,
+                title='Tendencia mensual', labels={'x': 'Mes', 'value': 'Monto', 'variable': 'Concepto'}
+            ))
+        with etapa("render gráfica"):
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("No hay transacciones registradas")
@@ -0,0 +1,71 @@
+"""Estado de Resultados de todo el libro o de un periodo."""
+import streamlit as st
+import plotly.express as px
+
+from contabilidad import a_pesos, exportar_estado_pdf, formato_pesos, generar_estado_resultados
+from .comun import boton_descarga, empresa_activa, reporte_en_segundo_plano, selector_periodo
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown('<div class="section-header">Estado de Resultados</div>', unsafe_allow_html=True)
+    
+    if st.session_state.transacciones:
+        desde, hasta = selector_periodo()
+        empresa = empresa_activa()
+        with etapa("estado de resultados") as e:
+            estado = reporte_en_segundo_plano(
+                "estado_resultados",
+                lambda libro: generar_estado_resultados(libro.mayor(desde, hasta)),
+                (desde, hasta)
+            )
+            if estado is None:
+                return
+            anotar(e, estado)
+        if desde is not None:
+            st.caption(f"Periodo: {desde:%d/%m/%Y} al {hasta:%d/%m/%Y}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown('<div class="result-box">', unsafe_allow_html=True)
+            st.markdown(f"### {empresa_activa()}")
+            st.markdown("### Estado de Resultados")
+            st.markdown("---")
+            
+            st.markdown("**Ventas Netas**")
+            st.write(formato_pesos(estado['ventas_netas']))
+            
+            st.markdown("**Compras Totales**")
+            st.write(formato_pesos(estado['compras_totales']))
+            
+            st.markdown("**Compras Netas**")
+            st.write(formato_pesos(estado['compras_netas']))
+            
+            st.markdown("**Total Mercancía**")
+            st.write(formato_pesos(estado['total_mercancia']))
+            
+            st.markdown("**Costo de Ventas**")
+            st.write(formato_pesos(estado['costo_ventas']))
+            
+            st.markdown("**Utilidad Bruta**")
+            st.write(formato_pesos(estado['utilidad_bruta']))
+            
+            st.markdown("**Resultado Operativo**")
+            st.write(formato_pesos(estado['perdida_operacion']))
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with col2:
+            with etapa("gráfica") as e:
+                fig = anotar(e, px.pie(
+                    names=['Ventas Netas', 'Costo Ventas', 'Utilidad Bruta'],
+                    values=[a_pesos(estado[k]) for k in ('ventas_netas', 'costo_ventas', 'utilidad_bruta')],
+                    title='Composición del Resultado'
+                ))
+            with etapa("render gráfica"):
+                st.plotly_chart(fig, use_container_width=True)
+
+        boton_descarga("Descargar Estado de Resultados (PDF)", "estado_de_resultados.pdf",
+                       lambda libro, destino: exportar_estado_pdf(libro, destino, desde, hasta, empresa))
+    else:
+        st.warning("No hay transacciones registradas")
@@ -0,0 +1,53 @@
+"""Evolución diaria o mensual de saldos, reducida en el servidor con LTTB."""
+import streamlit as st
+import plotly.express as px
+
+from contabilidad import PUNTOS_GRAFICA, SERIES_SALDOS, reducir_serie, series_saldos
+from .comun import reporte_en_cache
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown('<div class="section-header">Evolución de Saldos</div>', unsafe_allow_html=True)
+
+    libro = st.session_state.transacciones
+    if not libro:
+        st.warning("No hay transacciones registradas")
+        return
+
+    opciones = list(SERIES_SALDOS) + [c for c in libro.cuentas() if c not in SERIES_SALDOS]
+    nombres = st.multiselect("Series", opciones, default=list(SERIES_SALDOS))
+    frecuencia = st.radio("Frecuencia", ["Diaria", "Mensual"], horizontal=True)
+    if not nombres:
+        st.info("Elija al menos una serie")
+        return
+
+    clave = "D" if frecuencia == "Diaria" else "M"
+    with etapa("series") as e:
+        serie = anotar(e, reporte_en_cache(
+            "series_saldos", lambda: series_saldos(libro, nombres, clave), (tuple(nombres), clave)
+        ))
+    if serie.empty:
+        st.info("Las series elegidas no tienen movimientos")
+        return
+
+    # El acercamiento se elige con el rango: Streamlit no devuelve el zoom de Plotly
+    inicio, fin = serie.index[0].date(), serie.index[-1].date()
+    if inicio < fin:
+        desde, hasta = st.slider("Rango", min_value=inicio, max_value=fin, value=(inicio, fin),
+                                 format="DD/MM/YYYY")
+    else:
+        desde, hasta = inicio, fin
+
+    with etapa("reducción") as e:
+        puntos, total = reducir_serie(serie, desde, hasta, PUNTOS_GRAFICA)
+        puntos = anotar(e, puntos.assign(Saldo=puntos["Saldo"] / 100))
+    with etapa("gráfica") as e:
+        fig = anotar(e, px.line(
+            puntos, x="Fecha", y="Saldo", color="Cuenta",
+            line_shape="hv" if clave == "D" else "linear", markers=clave == "M",
+            labels={"Saldo": "Saldo", "Cuenta": "Serie"},
+        ))
+    with etapa("render gráfica"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(puntos) // len(nombres):,} de {total:,} puntos por serie en el rango "
+               f"(máximo {PUNTOS_GRAFICA:,})")
@@ -0,0 +1,47 @@
+"""Página de inicio: módulos disponibles y liquidez actual."""
+import html
+
+import streamlit as st
+import plotly.express as px
+
+from contabilidad import a_pesos, formato_pesos
+from .comun import empresa_activa, obtener_saldo
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown(f'<div class="section-header">Bienvenido al Sistema Contable de {html.escape(empresa_activa())}</div>',
+                unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.subheader("Módulos Disponibles")
+        st.write("• Libro Diario: Registro cronológico de transacciones")
+        st.write("• Mayor y Balanza: Agrupación de transacciones por cuenta")
+        st.write("• Estado de Resultados: Reporte de ingresos y gastos")
+        st.write("• Evolución de Saldos: Caja, Bancos e IVA en el tiempo")
+        st.write("• Liquidación de IVA: IVA por pagar o a favor de cada mes")
+        st.write("• Arqueo de Caja: Verificación física del efectivo")
+        st.write("• Consolidación: Estados combinados de todas las empresas")
+        st.write("• Auditoría: Integridad de asientos y cadena de hashes")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.subheader("Saldos Actuales")
+        saldo_caja, saldo_bancos = obtener_saldo("Caja"), obtener_saldo("Bancos")
+        st.metric("Saldo en Caja", formato_pesos(saldo_caja))
+        st.metric("Saldo en Bancos", formato_pesos(saldo_bancos))
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with etapa("gráfica") as e:
+        fig = anotar(e, px.bar(
+            x=['Caja', 'Bancos'],
+            y=[a_pesos(saldo_caja), a_pesos(saldo_bancos)],
+            title="Liquidez Actual",
+            labels={'x': 'Cuenta', 'y': 'Saldo'},
+            color=['Caja', 'Bancos']
+        ))
+    with etapa("render gráfica"):
+        st.plotly_chart(fig, use_container_width=True)
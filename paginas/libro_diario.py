@@ -0,0 +1,115 @@
+"""Libro Diario: registro, importación y consulta paginada."""
+import streamlit as st
+
+from contabilidad import (
+    REGLAS_CONTABLES, TIPOS_TRANSACCION, contabilizar, importar_transacciones,
+    exportar_reporte, en_pesos, formato_pesos,
+)
+from .comun import boton_descarga, registrar, terminar_lectura
+from .perfil import etapa, anotar
+
+# Módulo de transacciones: un fragmento, así registrar sólo vuelve a ejecutar
+# el formulario; el resto de la página se actualiza después desde el vigilante
+@st.fragment
+def modulo_transacciones_mejorado():
+    with st.expander("Registrar Transacción", expanded=True):
+        fecha = st.date_input("Fecha")
+        tipo = st.selectbox("Tipo de Transacción", TIPOS_TRANSACCION)
+        regla = REGLAS_CONTABLES[tipo]
+
+        monto = st.number_input(regla["etiqueta"], min_value=0.0)
+        monto2 = st.number_input(regla["etiqueta2"], min_value=0.0) if "etiqueta2" in regla else 0.0
+        if st.button("Registrar"):
+            asiento = contabilizar(tipo, fecha.strftime("%d/%m/%Y"), monto, monto2)
+            registrar(lambda libro: libro.append(asiento))
+            terminar_lectura()    # el fragmento no vuelve a leer; el run completo sí
+            st.toast(f"Asiento registrado: {asiento['Concepto']}", icon="✅")
+
+def modulo_importacion():
+    with st.expander("Importar transacciones (CSV / Parquet)"):
+        st.caption("Columnas: fecha (dd/mm/aaaa), tipo (igual que en el formulario), "
+                   "monto y, para Apertura de Cuentas, monto2 (Bancos).")
+        archivo = st.file_uploader("Archivo", type=["csv", "parquet"])
+        tam_bloque = st.number_input("Filas por bloque", min_value=1_000, value=50_000, step=1_000)
+        if archivo is not None and st.button("Importar"):
+            formato = "parquet" if archivo.name.lower().endswith(".parquet") else "csv"
+            estado = st.empty()
+            resumen = registrar(lambda libro: importar_transacciones(
+                libro, archivo, formato, int(tam_bloque),
+                progreso=lambda n: estado.write(f"{n:,} filas procesadas...")
+            ))
+            estado.empty()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Asientos importados", f"{resumen['asientos_importados']:,}")
+            with col2:
+                st.metric("Filas rechazadas", f"{resumen['filas_rechazadas']:,}")
+            with col3:
+                st.metric("Filas por segundo", f"{resumen['filas_por_segundo']:,.0f}")
+
+# Visualización del libro diario
+def mostrar_libro_diario_mejorado():
+    """Diario paginado: los filtros y totales se resuelven en el servidor y
+    sólo se envía al navegador la página visible."""
+    libro = st.session_state.transacciones
+    if not libro:
+        st.warning("No hay transacciones para mostrar en el Diario")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        rango = st.date_input("Rango de fechas", value=[])
+    with col2:
+        cuenta = st.selectbox("Cuenta", ["Todas"] + libro.cuentas())
+    with col3:
+        concepto = st.text_input("Concepto contiene")
+    desde = rango[0] if len(rango) > 0 else None
+    hasta = rango[1] if len(rango) > 1 else desde
+    cuenta = None if cuenta == "Todas" else cuenta
+
+    col1, col2 = st.columns(2)
+    with col1:
+        tam_pagina = st.selectbox("Líneas por página", [25, 50, 100, 500], index=1)
+    with col2:
+        pagina = st.number_input("Página", min_value=1, value=1, step=1)
+
+    with etapa("consulta diario") as e:
+        pagina_df, num_lineas, total_debe, total_haber = libro.consultar_diario(
+            desde, hasta, cuenta, concepto.strip() or None, int(pagina) - 1, tam_pagina
+        )
+        anotar(e, pagina_df)
+    num_paginas = max(1, -(-num_lineas // tam_pagina))
+    if pagina_df.empty and num_lineas:
+        st.warning(f"La página {pagina} no existe; hay {num_paginas} páginas")
+    else:
+        with etapa("render diario") as e:
+            st.dataframe(anotar(e, en_pesos(pagina_df, ["Debe", "Haber"])),
+                         use_container_width=True, hide_index=True)
+    st.caption(f"Página {min(int(pagina), num_paginas)} de {num_paginas} · {num_lineas:,} líneas en el filtro")
+
+    #Mostrar métricas de totales
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Debe",  formato_pesos(total_debe))
+    with col2:
+        st.metric("Total Haber", formato_pesos(total_haber))
+
+    #Balance (sólo tiene sentido sobre el libro completo)
+    if desde is None and cuenta is None and not concepto.strip():
+        if total_debe == total_haber:
+            st.success("✅ Libro balanceado")
+        else:
+            st.error(f"❌ Desbalance: {formato_pesos(abs(total_debe - total_haber))}")
+
+    with st.expander("Exportar Libro Diario"):
+        st.caption("Todas las líneas del rango de fechas elegido (sin filtros de cuenta ni "
+                   "concepto), con un renglón final de totales.")
+        formato = st.radio("Formato", ["csv", "xlsx"], horizontal=True, key="formato_diario")
+        boton_descarga(f"Descargar Libro Diario ({formato.upper()})", f"libro_diario.{formato}",
+                       lambda libro, destino: exportar_reporte(libro, "diario", formato, destino, desde, hasta))
+
+def mostrar():
+    st.markdown('<div class="section-header">Libro Diario</div>', unsafe_allow_html=True)
+    modulo_transacciones_mejorado()
+    modulo_importacion()
+    mostrar_libro_diario_mejorado()
@@ -0,0 +1,49 @@
+"""Liquidación mensual del IVA, leída del índice de IVA por periodo."""
+import streamlit as st
+
+from contabilidad import (
+    COLUMNAS_IVA_TIPO, COLUMNAS_LIQUIDACION, en_pesos, formato_pesos, iva_por_tipo, liquidacion_iva,
+)
+from .comun import reporte_en_cache
+from .perfil import etapa, anotar
+
+def mostrar():
+    st.markdown('<div class="section-header">Liquidación de IVA</div>', unsafe_allow_html=True)
+
+    libro = st.session_state.transacciones
+    if not libro:
+        st.warning("No hay transacciones registradas")
+        return
+
+    with etapa("liquidación") as e:
+        liquidacion = anotar(e, reporte_en_cache("liquidacion_iva", lambda: liquidacion_iva(libro)))
+    if liquidacion.empty:
+        st.info("No hay movimientos de IVA registrados")
+        return
+
+    meses = liquidacion["Mes"].tolist()
+    mes = st.selectbox("Mes", meses[::-1])
+    fila = liquidacion.iloc[meses.index(mes)]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("IVA Trasladado", formato_pesos(fila["IVA Trasladado"]))
+    col2.metric("IVA Acreditable", formato_pesos(fila["IVA Acreditable"]))
+    if fila["Saldo a Favor"]:
+        col3.metric("Saldo a Favor", formato_pesos(fila["Saldo a Favor"]))
+    else:
+        col3.metric("IVA por Pagar", formato_pesos(fila["IVA por Pagar"]))
+    if fila["Saldo a Favor Anterior"]:
+        st.caption(f"Se acredita un saldo a favor de meses anteriores de "
+                   f"{formato_pesos(fila['Saldo a Favor Anterior'])}")
+
+    st.markdown("### Desglose por tipo de transacción")
+    with etapa("iva por tipo") as e:
+        por_tipo = anotar(e, reporte_en_cache("iva_por_tipo", lambda: iva_por_tipo(libro, mes), (mes,)))
+    st.dataframe(en_pesos(por_tipo, COLUMNAS_IVA_TIPO[1:]).style.format("${:,.2f}", subset=COLUMNAS_IVA_TIPO[1:]),
+                 hide_index=True, use_container_width=True)
+
+    st.markdown("### Liquidación mensual")
+    with etapa("render liquidación"):
+        st.dataframe(en_pesos(liquidacion, COLUMNAS_LIQUIDACION[1:])
+                     .style.format("${:,.2f}", subset=COLUMNAS_LIQUIDACION[1:]),
+                     hide_index=True, use_container_width=True)
@@ -0,0 +1,115 @@
+"""Libro Mayor y Balanza de Comprobación."""
+import pandas as pd
+import streamlit as st
+
+from contabilidad import balanza_por_nivel, en_pesos, exportar_reporte, formato_pesos, generar_balanza
+from .comun import boton_descarga, procesar_mayor_mejorado, reporte_en_segundo_plano
+from .perfil import etapa, anotar
+
+COLUMNAS_MAYOR = ["Total Debe", "Total Haber", "Saldo Deudor", "Saldo Acreedor"]
+NIVELES_BALANZA = {"Cuenta": None, "Subgrupo": 2, "Grupo": 1}    # niveles del catálogo
+
+def mostrar_mayor_y_balanza():
+    mayor = procesar_mayor_mejorado()
+    if not mayor:
+        st.warning("No hay datos para Libro Mayor")
+        return
+    
+    #generar apariencia mayor
+    mayor_rows = []
+    for cuenta, sal in mayor.items():
+        mayor_rows.append({
+            "Cuenta": cuenta,
+            "Total Debe":   sal["debe"],
+            "Total Haber":  sal["haber"],
+            "Saldo Deudor": max(sal["debe"] - sal["haber"], 0),
+            "Saldo Acreedor": max(sal["haber"] - sal["debe"], 0)
+        })
+    mayor_df = pd.DataFrame(mayor_rows)
+    st.markdown("### Libro Mayor")
+    st.dataframe(en_pesos(mayor_df, COLUMNAS_MAYOR), use_container_width=True, hide_index=True)
+
+    # Generar la balanza de comprobación
+    balanza = mayor_df[["Cuenta", "Saldo Deudor", "Saldo Acreedor"]]
+    total_deudor  = int(balanza["Saldo Deudor"].sum())
+    total_acreedor= int(balanza["Saldo Acreedor"].sum())
+
+    st.markdown("### Balanza de Comprobación")
+    st.dataframe(en_pesos(balanza, ["Saldo Deudor", "Saldo Acreedor"]), use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Deudor",   formato_pesos(total_deudor))
+    with col2:
+        st.metric("Total Acreedor", formato_pesos(total_acreedor))
+    if total_deudor == total_acreedor:
+        st.success("✅ Balanza balanceada")
+    else:
+        st.error(f"❌ Desbalance en balanza: {formato_pesos(abs(total_deudor - total_acreedor))}")
+
+def mayor_y_balanza(libro, nivel):
+    mayor = libro.mayor()
+    return mayor, generar_balanza(mayor) if nivel is None else balanza_por_nivel(mayor, nivel)
+
+def mostrar():
+    st.markdown('<div class="section-header">Libro Mayor y Balanza</div>', unsafe_allow_html=True)
+
+    if st.session_state.transacciones:
+        # Mayor y balanza (por cuenta o por grupo del catálogo) se calculan
+        # juntos en segundo plano, de la misma instantánea del libro
+        nivel = NIVELES_BALANZA[st.radio("Nivel de la balanza", list(NIVELES_BALANZA), horizontal=True)]
+        with etapa("mayor y balanza") as e:
+            reporte = reporte_en_segundo_plano(
+                "mayor_balanza", lambda libro: mayor_y_balanza(libro, nivel), (nivel,)
+            )
+            if reporte is None:
+                return
+            mayor_dict, (balanza, total_debe, total_haber) = reporte
+            balanza_df = anotar(e, pd.DataFrame(balanza))
+
+        # Muestra ambas pestañas:
+        tab1, tab2 = st.tabs(["Libro Mayor", "Balanza"])
+        with tab1:
+            st.subheader("Libro Mayor")
+            with etapa("DataFrame mayor") as e:
+                mayor_rows = []
+                for cuenta, sal in mayor_dict.items():
+                    mayor_rows.append({
+                        "Cuenta": cuenta,
+                        "Total Debe":    sal["debe"],
+                        "Total Haber":   sal["haber"],
+                        "Saldo Deudor":  max(sal["debe"] - sal["haber"], 0),
+                        "Saldo Acreedor":max(sal["haber"] - sal["debe"], 0)
+                    })
+                mayor_df = anotar(e, en_pesos(pd.DataFrame(mayor_rows), COLUMNAS_MAYOR))
+            with etapa("render mayor"):
+                st.dataframe(mayor_df, use_container_width=True, hide_index=True)
+
+        with tab2:
+            st.subheader("Balanza de Comprobación")
+            with etapa("render balanza"):
+                st.dataframe(en_pesos(balanza_df, ["Debe", "Haber", "Saldo Deudor", "Saldo Acreedor"]),
+                             use_container_width=True, hide_index=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Deudor",   formato_pesos(total_debe))
+            with col2:
+                st.metric("Total Acreedor", formato_pesos(total_haber))
+
+        with st.expander("Exportar Mayor y Balanza"):
+            formato = st.radio("Formato", ["csv", "xlsx"], horizontal=True, key="formato_mayor")
+            col1, col2 = st.columns(2)
+            for col, reporte, titulo in ((col1, "mayor", "Libro Mayor"), (col2, "balanza", "Balanza")):
+                with col:
+                    boton_descarga(f"Descargar {titulo} ({formato.upper()})", f"{reporte}.{formato}",
+                                   lambda libro, destino, reporte=reporte:
+                                       exportar_reporte(libro, reporte, formato, destino))
+
+        if st.button("Verificar consistencia del mayor"):
+            diferencias = st.session_state.transacciones.verificar_mayor()
+            if diferencias:
+                st.error(f"❌ El mayor no coincide con el diario en: {', '.join(diferencias)}")
+            else:
+                st.success("✅ El mayor coincide con el recálculo del diario")
+
+    else:
+        st.warning("No hay datos para mostrar")
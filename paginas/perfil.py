@@ -0,0 +1,101 @@
+"""Perfilado opcional por run: tiempos por etapa, filas y tamaño de lo que
+se envía al navegador. Desactivado no mide nada."""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+MAX_TRAZAS = 50
+
+def activo():
+    return st.session_state.get("traza") is not None
+
+def iniciar(pagina):
+    """Abre la traza del run si el perfilado está activo."""
+    if st.session_state.get("perfil_activo"):
+        st.session_state.traza = {
+            "pagina": pagina,
+            "fecha": datetime.now().isoformat(timespec="milliseconds"),
+            "_inicio": time.perf_counter(),
+            "etapas": [],
+        }
+    else:
+        st.session_state.traza = None
+
+@contextmanager
+def etapa(nombre):
+    """Mide el bloque como una etapa. Entrega un dict donde se pueden anotar
+    filas y bytes con anotar(); indica además si la caché de reportes acertó."""
+    traza = st.session_state.get("traza")
+    registro = {"etapa": nombre}
+    if traza is None:
+        yield registro
+        return
+    cache = st.session_state.cache_reportes
+    aciertos, fallos = cache.aciertos, cache.fallos
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        registro["inicio_ms"] = round((inicio - traza["_inicio"]) * 1000, 3)
+        # El tiempo de medir filas y bytes no cuenta como parte de la etapa
+        medicion = registro.pop("_medicion", 0.0)
+        registro["ms"] = round((time.perf_counter() - inicio - medicion) * 1000, 3)
+        if cache.fallos != fallos:
+            registro["cache"] = "fallo"
+        elif cache.aciertos != aciertos:
+            registro["cache"] = "acierto"
+        traza["etapas"].append(registro)
+
+def _puntos(serie):
+    for atributo in ("x", "values"):
+        valores = getattr(serie, atributo, None)
+        if valores is not None:
+            return len(valores)
+    return 0
+
+def anotar(registro, objeto):
+    """Guarda filas y bytes de `objeto` (DataFrame, figura de Plotly, dict o
+    lista) en el registro de la etapa y devuelve el objeto sin cambios."""
+    if not activo():
+        return objeto
+    inicio = time.perf_counter()
+    if isinstance(objeto, pd.DataFrame):
+        registro["filas"] = len(objeto)
+        registro["bytes"] = int(objeto.memory_usage(deep=True).sum())
+    elif hasattr(objeto, "to_plotly_json"):
+        registro["filas"] = sum(_puntos(t) for t in objeto.data)
+        registro["bytes"] = len(objeto.to_json())
+    else:
+        registro["filas"] = len(objeto)
+        registro["bytes"] = len(json.dumps(objeto, default=str))
+    registro["_medicion"] = registro.get("_medicion", 0.0) + time.perf_counter() - inicio
+    return objeto
+
+def finalizar(ms_total):
+    """Cierra la traza del run y la agrega al historial de la sesión."""
+    traza = st.session_state.get("traza")
+    if traza is None:
+        return
+    traza.pop("_inicio")
+    traza["total_ms"] = round(ms_total, 3)
+    st.session_state.trazas = (st.session_state.get("trazas", []) + [traza])[-MAX_TRAZAS:]
+
+def mostrar_panel():
+    """Panel de depuración en la barra lateral con la última traza."""
+    st.sidebar.checkbox("Perfilado (depuración)", key="perfil_activo")
+    trazas = st.session_state.get("trazas", [])
+    if not st.session_state.get("perfil_activo") or not trazas:
+        return
+    ultima = trazas[-1]
+    with st.sidebar.expander(f"Perfil: {ultima['pagina']} · {ultima['total_ms']:,.1f} ms", expanded=True):
+        st.dataframe(pd.DataFrame(ultima["etapas"]), hide_index=True)
+        st.download_button(
+            "Exportar traza JSON",
+            json.dumps({"trazas": trazas}, ensure_ascii=False, indent=2),
+            file_name=f"traza_s4ai_{datetime.now():%Y%m%d_%H%M%S}.json",
+            mime="application/json",
+        )
@@ -0,0 +1,49 @@
+"""Desglose del arqueo contra una búsqueda exhaustiva."""
+import itertools
+
+import numpy as np
+import pytest
+
+from contabilidad.arqueo import DENOMINACIONES, arqueo_caja, arqueo_lote
+
+def _pesos(conteos):
+    return {int(d) // 100: int(c) for d, c in zip(DENOMINACIONES, conteos) if c}
+
+def test_denominaciones_sin_greedy_exacto():
+    # Sólo billetes de 50 y 20: el greedy toma un 50 y deja 10 sin cubrir
+    conteos, faltante = arqueo_lote([6_000], np.isin(DENOMINACIONES, [5_000, 2_000]), minimo_uno=False)
+    assert _pesos(conteos[0]) == {20: 3} and faltante[0] == 0
+
+def test_unidades_limitadas():
+    disponibles = np.where(DENOMINACIONES == 5_000, 1, np.where(DENOMINACIONES == 2_000, 5, 0))
+    conteos, faltante = arqueo_lote([8_000], disponibles, minimo_uno=False)
+    assert _pesos(conteos[0]) == {20: 4} and faltante[0] == 0
+
+def test_monto_negativo():
+    with pytest.raises(ValueError):
+        arqueo_lote([-100])
+
+def test_faltante_menor_que_la_denominacion_minima():
+    montos = np.random.default_rng(1).integers(0, 10**7, 1_000)
+    conteos, faltante = arqueo_lote(montos)
+    assert (conteos @ DENOMINACIONES + faltante == montos).all()
+    assert (faltante == montos % 50).all()
+
+def test_arqueo_caja_unidad_minima():
+    desglose = arqueo_caja(400_000)
+    assert sum(d * c for d, c in desglose.items()) == 400_000
+    assert set(desglose) == {int(d) for d in DENOMINACIONES}
+
+def test_contra_busqueda_exhaustiva():
+    rng = np.random.default_rng(0)
+    denominaciones = np.array([500, 200, 100, 50, 20], dtype=np.int64) * 100
+    for _ in range(400):
+        limite = rng.integers(0, 4, len(denominaciones))
+        monto = int(rng.integers(0, 2_000)) * 100
+        sumas = (int(np.dot(c, denominaciones))
+                 for c in itertools.product(*(range(n + 1) for n in limite)))
+        mejor = max(s for s in sumas if s <= monto)
+        conteos, faltante = arqueo_lote([monto], limite, False, denominaciones)
+        assert (conteos[0] <= limite).all()
+        assert conteos[0] @ denominaciones + faltante[0] == monto
+        assert faltante[0] == monto - mejor
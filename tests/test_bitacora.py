@@ -0,0 +1,115 @@
+"""Bitácora binaria: cola cortada, punto de control y cadena de hashes."""
+import os
+
+import numpy as np
+import pytest
+
+from contabilidad import LibroBitacora, LibroDiario, REGISTRO, TIPOS_TRANSACCION, auditar, contabilizar
+from contabilidad.auditoria import verificar_cadena
+from contabilidad.bitacora import _control
+
+def _asientos(n, dia=1):
+    return [contabilizar(TIPOS_TRANSACCION[k % len(TIPOS_TRANSACCION)], f"{dia + k % 20:02d}/03/2025",
+                         100 + 17 * k, 10) for k in range(n)]
+
+def _con_movimientos(mayor):
+    # Los nombres se guardan antes que los registros: una escritura descartada
+    # puede dejar una cuenta nueva sin líneas
+    return {c: s for c, s in mayor.items() if s["debe"] or s["haber"]}
+
+def _iguales(esperado, libro):
+    assert len(libro) == len(esperado) and libro.num_lineas == esperado.num_lineas
+    assert _con_movimientos(libro.mayor()) == _con_movimientos(esperado.mayor())
+    assert libro.mayor_mensual() == esperado.mayor_mensual()
+    assert libro.resumen_asientos().equals(esperado.resumen_asientos())
+    assert libro.verificar_mayor() == []
+
+def _errores(libro):
+    hallazgos = auditar(libro, completo=True)["hallazgos"]
+    return set(hallazgos.loc[hallazgos["Gravedad"] == "error", "Tipo"])
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "libro.bitacora")
+
+def test_cola_cortada_a_medio_registro(ruta):
+    esperado, libro = LibroDiario(), LibroBitacora(ruta, sincronizar=False)
+    asientos = _asientos(8)
+    for asiento in asientos[:-1]:
+        esperado.append(asiento)
+        libro.append(asiento)
+    libro.append(asientos[-1])
+    libro.cerrar(punto_control=False)
+    # El último registro queda a medias: su escritura completa se descarta
+    os.truncate(ruta, os.path.getsize(ruta) - REGISTRO.itemsize // 2)
+
+    reabierto = LibroBitacora(ruta, sincronizar=False)
+    assert os.path.getsize(ruta) == esperado.num_lineas * REGISTRO.itemsize
+    _iguales(esperado, reabierto)
+    assert _errores(reabierto) == set()
+
+    # Se puede seguir escribiendo después de la cola descartada
+    for asiento in _asientos(3, dia=21):
+        esperado.append(asiento)
+        reabierto.append(asiento)
+    reabierto.cerrar(punto_control=False)
+    _iguales(esperado, LibroBitacora(ruta, solo_lectura=True))
+
+def test_solo_lectura_no_trunca(ruta):
+    libro = LibroBitacora(ruta, sincronizar=False)
+    for asiento in _asientos(3):
+        libro.append(asiento)
+    libro.cerrar(punto_control=False)
+    with open(ruta, "ab") as f:
+        f.write(b"\x01" * (REGISTRO.itemsize + 5))
+    tam = os.path.getsize(ruta)
+    assert len(LibroBitacora(ruta, solo_lectura=True)) == 3
+    assert os.path.getsize(ruta) == tam
+
+def test_punto_de_control(ruta):
+    esperado, libro = LibroDiario(), LibroBitacora(ruta, sincronizar=False)
+    for asiento in _asientos(6):
+        esperado.append(asiento)
+        libro.append(asiento)
+    libro.cerrar()
+
+    reabierto = LibroBitacora(ruta, sincronizar=False)
+    assert reabierto._lineas_punto == reabierto.num_lineas
+    _iguales(esperado, reabierto)
+    # Cola después del punto de control: se reproduce al abrir
+    for asiento in _asientos(4, dia=21):
+        esperado.append(asiento)
+        reabierto.append(asiento)
+    reabierto.cerrar(punto_control=False)
+    _iguales(esperado, LibroBitacora(ruta, sincronizar=False))
+
+def test_byte_alterado_rompe_la_cadena(ruta):
+    libro = LibroBitacora(ruta, sincronizar=False)
+    for asiento in _asientos(5):
+        libro.append(asiento)
+    libro.cerrar()
+    assert _errores(LibroBitacora(ruta, solo_lectura=True)) == set()
+
+    # Un byte del haber de la línea 3, con su valor de control recalculado
+    # para que el registro parezca escrito completo
+    registros = np.memmap(ruta, dtype=REGISTRO, mode="r+")
+    registros["haber"][2] ^= 1 << 8
+    registros["control"][2] = _control(registros[2:3])[0]
+    registros.flush()
+    del registros
+
+    alterado = LibroBitacora(ruta, solo_lectura=True)
+    assert "Cadena de hashes rota" in _errores(alterado)
+    assert verificar_cadena(alterado, completo=True)["lineas_roto"][0] <= 2
+
+def test_verificacion_incremental(ruta):
+    libro = LibroBitacora(ruta, sincronizar=False)
+    for asiento in _asientos(4):
+        libro.append(asiento)
+    primera = verificar_cadena(libro)
+    assert primera["roto"] is None and primera["verificados"] == 4
+    libro.append(_asientos(1, dia=21)[0])
+    # Sólo se recalcula el eslabón nuevo
+    segunda = verificar_cadena(libro)
+    assert segunda["roto"] is None and segunda["verificados"] == 1 and segunda["eslabones"] == 5
+    libro.cerrar()
@@ -0,0 +1,33 @@
+"""Reportes de la línea de comandos sobre libros en archivo."""
+import pandas as pd
+import pytest
+
+from contabilidad import contabilizar, crear_libro
+from contabilidad.cli import main
+from contabilidad.exportacion import COLUMNAS_MAYOR
+
+@pytest.fixture(params=["libro.db", "libro.bitacora"])
+def ruta_libro(request, tmp_path):
+    ruta = str(tmp_path / request.param)
+    libro = crear_libro(ruta)
+    libro.append(contabilizar("Venta al Contado", "15/01/2025", 1160))
+    libro.append(contabilizar("Compra de Mercancía", "20/02/2025", 580))
+    return ruta
+
+def test_mayor_con_periodo_sin_lineas(ruta_libro, tmp_path):
+    salida = tmp_path / "mayor.csv"
+    assert main([ruta_libro, "mayor", "--desde", "01/01/2030", "--salida", str(salida)]) == 0
+    df = pd.read_csv(salida)
+    assert list(df.columns) == COLUMNAS_MAYOR
+    assert df.empty
+
+def test_mayor_saldo_corrido(ruta_libro, tmp_path):
+    salida = tmp_path / "mayor.csv"
+    assert main([ruta_libro, "mayor", "--salida", str(salida)]) == 0
+    df = pd.read_csv(salida)
+    assert list(df.columns) == COLUMNAS_MAYOR
+    assert set(df["Asiento"]) == {1, 2}
+    # El último saldo corrido de cada cuenta es su debe - haber total
+    centavos = (df[["Debe", "Haber", "Saldo"]] * 100).round().astype(int)
+    por_cuenta = centavos.groupby(df["Cuenta"], sort=False)
+    assert (por_cuenta["Saldo"].last() == por_cuenta["Debe"].sum() - por_cuenta["Haber"].sum()).all()
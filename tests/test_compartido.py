@@ -0,0 +1,39 @@
+"""Libro compartido entre hilos y procesos."""
+import threading
+import time
+
+from contabilidad import LibroCompartido, contabilizar, crear_libro
+
+def test_version_libro_no_espera_al_escritor(tmp_path):
+    ruta = str(tmp_path / "libro.db")
+    compartido = LibroCompartido(crear_libro(ruta))
+    compartido.append(contabilizar("Venta al Contado", "15/01/2025", 1160))
+    inicial = compartido.version_libro()
+    escribiendo, terminar = threading.Event(), threading.Event()
+
+    def escritura_larga(libro):
+        # Transacción de escritura abierta y candado tomado hasta que se termine
+        libro.con.execute("BEGIN IMMEDIATE")
+        escribiendo.set()
+        terminar.wait(10)
+        libro.con.rollback()
+
+    hilo = threading.Thread(target=compartido._escribir, args=(lambda: escritura_larga(compartido._libro),))
+    hilo.start()
+    try:
+        assert escribiendo.wait(10)
+        inicio = time.perf_counter()
+        assert compartido.version_libro() == inicial
+        assert time.perf_counter() - inicio < 1
+    finally:
+        terminar.set()
+        hilo.join()
+
+def test_version_libro_ve_otros_procesos(tmp_path):
+    ruta = str(tmp_path / "libro.db")
+    compartido = LibroCompartido(crear_libro(ruta))
+    compartido.append(contabilizar("Venta al Contado", "15/01/2025", 1160))
+    inicial = compartido.version_libro()
+    # Otra conexión al mismo archivo, como la de otro proceso
+    crear_libro(ruta).append(contabilizar("Venta al Contado", "16/01/2025", 580))
+    assert compartido.version_libro() > inicial